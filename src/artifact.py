@@ -0,0 +1,144 @@
+"""
+Module for exporting a trained model together with the resolved config into a versioned artifact of memory-mappable
+arrays, and for loading it into a Search without importing sklearn, pandas or pyhocon.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+from src.compiled_config import ResolvedConfig
+from src.feature_engineering import FeatureEngineer
+from src.feature_extraction import FeatureExtractor
+from src.search import Search
+from src.tree_inference import CompiledModel
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FORMAT = "search_artifact"
+ARTIFACT_VERSION = 1
+MODEL_ARRAYS = ("features", "thresholds", "leaf_values")
+
+
+def export_artifact(model, config, path: Union[str, Path]) -> Path:
+    """
+    This method writes the model and the resolved config into an artifact directory:
+
+    - manifest.json: format and version of the artifact, the resolved config and the metadata of the model,
+    - one .npy file per array of the compiled trees, see CompiledModel.
+
+    Every file is written to a temporary file first and moved into place, so processes that have the previous
+    version of the artifact memory-mapped keep reading consistent data.
+
+    Args:
+        model: A fitted GradientBoostingClassifier (e.g. as returned by Trainer.load_model) or a CompiledModel.
+        config: The configuration settings, a ConfigTree or a ResolvedConfig.
+        path: Directory of the artifact. It is created if it does not exist.
+
+    Returns:
+        Path: The directory of the artifact.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    compiled_model = model if isinstance(model, CompiledModel) else CompiledModel.from_sklearn(model)
+    if compiled_model.feature_names != list(config.features):
+        raise ValueError("The features of the model do not match the features of the config")
+
+    arrays = {}
+    for name in MODEL_ARRAYS:
+        file_name = f"{name}.npy"
+        tmp_path = path / f"{name}.tmp.npy"
+        np.save(tmp_path, getattr(compiled_model, name))
+        arrays[name] = {"file": file_name, "sha256": _sha256(tmp_path)}
+        os.replace(tmp_path, path / file_name)
+
+    plain_config = config.as_plain_ordered_dict() if hasattr(config, "as_plain_ordered_dict") else dict(config)
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "version": ARTIFACT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": plain_config,
+        "model": {
+            "type": "gradient_boosted_trees",
+            "baseline": float(compiled_model.baseline),
+            "feature_names": compiled_model.feature_names,
+            "arrays": arrays,
+        },
+    }
+    tmp_path = path / "manifest.json.tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(tmp_path, path / "manifest.json")
+    logger.info(f"Exported model artifact to {path}")
+    return path
+
+
+def load_artifact(path: Union[str, Path], mmap: bool = True, verify: bool = False) -> (ResolvedConfig, CompiledModel):
+    """
+    This method loads an artifact written by export_artifact.
+
+    Args:
+        path: Directory of the artifact.
+        mmap: Whether the arrays are memory-mapped read-only instead of read into memory.
+        verify: Whether the checksums of the array files are verified.
+
+    Returns:
+        Tuple
+            ResolvedConfig: The config the model was exported with.
+            CompiledModel: The model.
+    """
+    path = Path(path)
+    with open(path / "manifest.json", "r") as file:
+        manifest = json.load(file)
+    if manifest.get("format") != ARTIFACT_FORMAT or manifest.get("version") != ARTIFACT_VERSION:
+        raise ValueError(
+            f"Unsupported artifact at {path}: format {manifest.get('format')!r}, version {manifest.get('version')!r}, "
+            f"expected {ARTIFACT_FORMAT!r}, version {ARTIFACT_VERSION}"
+        )
+
+    model_meta = manifest["model"]
+    arrays = {}
+    for name in MODEL_ARRAYS:
+        array_path = path / model_meta["arrays"][name]["file"]
+        if verify and _sha256(array_path) != model_meta["arrays"][name]["sha256"]:
+            raise ValueError(f"Checksum mismatch of {array_path}")
+        arrays[name] = np.load(array_path, mmap_mode="r" if mmap else None)
+
+    config = ResolvedConfig.from_plain(manifest["config"])
+    model = CompiledModel(
+        arrays["features"],
+        arrays["thresholds"],
+        arrays["leaf_values"],
+        model_meta["baseline"],
+        model_meta["feature_names"],
+    )
+    return config, model
+
+
+def create_search(path: Union[str, Path], **search_kwargs) -> Search:
+    """
+    This method creates a Search from an artifact, e.g. in a freshly started search worker.
+
+    Args:
+        path: Directory of the artifact.
+        search_kwargs: Further keyword arguments of Search, e.g. a job_feature_store.
+
+    Returns:
+        Search: A search scoring with the compiled model of the artifact.
+    """
+    config, model = load_artifact(path)
+    return Search(config, FeatureExtractor(config), FeatureEngineer(config), model, **search_kwargs)
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
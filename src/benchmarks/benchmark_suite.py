@@ -0,0 +1,225 @@
+"""
+Reproducible benchmark suite on synthetic data.
+
+Run from the repository root, e.g.
+    python -m src.benchmarks.benchmark_suite --sizes 100 1000 10000 --output bench.json
+    python -m src.benchmarks.benchmark_suite --sizes 100 1000 10000 --baseline bench.json
+
+The results are written as JSON. If a baseline file is given, every benchmark that got slower by more than the
+tolerance is reported as regression and the command exits with status 1.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import sklearn
+
+from src.create_config import create_config
+from src.feature_engineering import FeatureEngineer
+from src.feature_extraction import FeatureExtractor
+from src.search import Search
+from src.synthetic_data import SyntheticProfileGenerator
+from src.training import Trainer
+
+# Set up logging configuration
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+ROOT_PATH = Path(__file__).resolve().parents[2]
+BULK_JOBS = 100
+MAX_SINGLE_MATCHES = 1000
+
+
+def best_time(function: Callable, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+class BenchmarkSuite:
+    def __init__(self, seed: int = 42, skew: float = 1.0, repeats: int = 3) -> None:
+        """
+        Initialize a new instance of the BenchmarkSuite class.
+
+        Parameters:
+        - seed (int): Seed of the synthetic data.
+        - skew (float): Zipf exponent of the role popularity of the synthetic data.
+        - repeats (int): Every benchmark is repeated this often and the fastest run is reported.
+
+        Returns:
+        - None
+        """
+        self.seed = seed
+        self.skew = skew
+        self.repeats = repeats
+        self.config = create_config(ROOT_PATH / "config")
+        self.feature_extractor = FeatureExtractor(self.config)
+        self.feature_engineer = FeatureEngineer(self.config)
+        self.trainer = Trainer(self.config, self.feature_extractor, self.feature_engineer)
+        model = self.trainer.load_model(ROOT_PATH / "model" / "model.joblib")
+        self.search = Search(self.config, self.feature_extractor, self.feature_engineer, model)
+
+    def run(self, sizes: list[int]) -> dict:
+        results = []
+        for size in sizes:
+            generator = SyntheticProfileGenerator(self.config, seed=self.seed, skew=self.skew)
+            data = generator.training_data(size)
+            talents = [elem["talent"] for elem in data]
+            jobs = [elem["job"] for elem in data]
+            bulk_jobs = generator.jobs(BULK_JOBS)
+
+            results.append(
+                self._measure(
+                    "feature_extraction", size, size, lambda: self.feature_extractor.extract_batch(talents, jobs)
+                )
+            )
+            extracted_batch = self.feature_extractor.extract_batch(talents, jobs)
+            results.append(
+                self._measure(
+                    "feature_engineering", size, size, lambda: self.feature_engineer.engineer_batch(extracted_batch)
+                )
+            )
+            n_single = min(size, MAX_SINGLE_MATCHES)
+            results.append(
+                self._measure(
+                    "search_match",
+                    size,
+                    n_single,
+                    lambda: [
+                        self.search.match(talent, job) for talent, job in zip(talents[:n_single], jobs[:n_single])
+                    ],
+                )
+            )
+            results.append(
+                self._measure(
+                    "search_match_bulk",
+                    size,
+                    size * BULK_JOBS,
+                    lambda: self.search.match_bulk(talents, bulk_jobs, top_k=10, group_by="talent"),
+                )
+            )
+            results.append(self._measure_training(data))
+
+        return {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "sklearn": sklearn.__version__,
+                "platform": platform.platform(),
+                "seed": self.seed,
+                "skew": self.skew,
+                "repeats": self.repeats,
+            },
+            "results": results,
+        }
+
+    def _measure_training(self, data: list[dict]) -> dict:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_path = Path(tmp_dir) / "data.jsonl"
+            with open(data_path, "w") as file:
+                file.writelines(json.dumps(elem) + "\n" for elem in data)
+            trainer = Trainer(self.config, self.feature_extractor, self.feature_engineer)
+            return self._measure(
+                "training_pipeline",
+                len(data),
+                len(data),
+                lambda: trainer.training_pipeline(data_path, Path(tmp_dir) / "model.joblib"),
+            )
+
+    def _measure(self, name: str, size: int, n_items: int, function: Callable) -> dict:
+        """
+        Times a benchmark at the given suite size, where n_items is the number of rows, pairs or calls it processes.
+        """
+        seconds = best_time(function, self.repeats)
+        result = {
+            "benchmark": name,
+            "size": size,
+            "items": n_items,
+            "seconds": seconds,
+            "items_per_second": n_items / seconds if seconds > 0 else float("inf"),
+        }
+        logger.info(f"{name} size={result['size']}: {seconds:.4f} s, {result['items_per_second']:,.0f} items/s")
+        return result
+
+
+def compare_to_baseline(report: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """
+    This method compares the timings of a report with a baseline report.
+
+    Args:
+        report: The report of the current run.
+        baseline: A report of an earlier run.
+        tolerance: Relative slowdown that is still accepted, e.g. 0.2 for 20 %.
+
+    Returns:
+        list[dict]: One entry per benchmark found in both reports, with the ratio of the timings and a regression flag.
+    """
+    baseline_seconds = {(result["benchmark"], result["size"]): result["seconds"] for result in baseline["results"]}
+    comparison = []
+    for result in report["results"]:
+        key = (result["benchmark"], result["size"])
+        if key not in baseline_seconds:
+            continue
+        ratio = result["seconds"] / baseline_seconds[key]
+        comparison.append(
+            {
+                "benchmark": result["benchmark"],
+                "size": result["size"],
+                "baseline_seconds": baseline_seconds[key],
+                "seconds": result["seconds"],
+                "ratio": ratio,
+                "regression": ratio > 1 + tolerance,
+            }
+        )
+    return comparison
+
+
+def main(argv: list[str] = None) -> int:
+    """
+    Main function to run the benchmark suite and optionally compare it against a baseline.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="Numbers of examples")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the synthetic data")
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent of the role popularity")
+    parser.add_argument("--repeats", type=int, default=3, help="Repetitions per benchmark, the fastest is reported")
+    parser.add_argument("--output", type=Path, help="Path the JSON report is written to")
+    parser.add_argument("--baseline", type=Path, help="JSON report of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Accepted relative slowdown against the baseline")
+    args = parser.parse_args(argv)
+
+    report = BenchmarkSuite(seed=args.seed, skew=args.skew, repeats=args.repeats).run(args.sizes)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        logger.info(f"Wrote benchmark report to {args.output}")
+
+    if args.baseline is None:
+        return 0
+    with open(args.baseline, "r") as file:
+        baseline = json.load(file)
+    comparison = compare_to_baseline(report, baseline, args.tolerance)
+    for entry in comparison:
+        status = "REGRESSION" if entry["regression"] else "ok"
+        logger.info(
+            f"{entry['benchmark']} size={entry['size']}: {entry['baseline_seconds']:.4f} s -> {entry['seconds']:.4f} s "
+            f"({entry['ratio']:.2f}x) {status}"
+        )
+    return 1 if any(entry["regression"] for entry in comparison) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Benchmark of the early-exit threshold filtering of Search.match_bulk(min_score=...) against scoring every tree of every
+pair, on synthetic profiles that follow the value distributions of the config.
+
+Run from the repository root: python -m src.benchmarks.early_exit_benchmark
+"""
+
+import logging
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.create_config import create_config
+from src.feature_engineering import FeatureEngineer
+from src.feature_extraction import FeatureExtractor
+from src.metrics import MetricsRegistry
+from src.search import Search
+from src.synthetic_data import SyntheticProfileGenerator
+from src.training import Trainer
+from src.tree_inference import CompiledModel
+
+# Set up logging configuration
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+ROOT_PATH = Path(__file__).resolve().parents[2]
+N_TALENTS = 500
+N_JOBS = 1000
+MIN_SCORES = [0.1, 0.5, 0.8, 0.95]
+
+
+def main():
+    """
+    Main function to compare the full and the early-exit bulk scoring for several thresholds.
+    """
+    config = create_config(ROOT_PATH / "config")
+    feature_extractor = FeatureExtractor(config)
+    feature_engineer = FeatureEngineer(config)
+    model = Trainer(config, feature_extractor, feature_engineer).load_model(ROOT_PATH / "model" / "model.joblib")
+    metrics = MetricsRegistry()
+    search = Search(config, feature_extractor, feature_engineer, CompiledModel.from_sklearn(model), metrics=metrics)
+    generator = SyntheticProfileGenerator(config)
+    talents, jobs = generator.talents(N_TALENTS), generator.jobs(N_JOBS)
+    n_pairs = N_TALENTS * N_JOBS
+
+    start = time.perf_counter()
+    full_results = search.match_bulk(talents, jobs, columnar=True)
+    full_seconds = time.perf_counter() - start
+    logger.info(f"Full scoring of {n_pairs} pairs: {full_seconds:.2f} s")
+
+    for min_score in MIN_SCORES:
+        metrics.reset()
+        start = time.perf_counter()
+        results = search.match_bulk(talents, jobs, columnar=True, min_score=min_score)
+        seconds = time.perf_counter() - start
+        counters = metrics.to_dict()["counters"]
+        n_saved = counters["search.tree_evaluations_saved"]
+        n_evaluations = counters["search.tree_evaluations"] + n_saved
+        expected = full_results.filter(min_score=min_score)
+        if not all(
+            np.array_equal(getattr(results, name), getattr(expected, name))
+            for name in ("talent_idx", "job_idx", "scores")
+        ):
+            raise AssertionError(f"Results with min_score={min_score} differ from the filtered full results")
+        logger.info(
+            f"min_score={min_score}: {len(results)} of {n_pairs} pairs kept, {n_saved / n_evaluations:.1%} of "
+            f"{n_evaluations} tree evaluations saved, {seconds:.2f} s, speedup {full_seconds / seconds:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
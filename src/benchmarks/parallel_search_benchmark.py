@@ -0,0 +1,153 @@
+"""
+Scaling benchmark of ParallelSearch over the number of worker processes and the size of the workload.
+
+For every number of talents, the serial Search.match_bulk and the ParallelSearch.match_bulk with 1 to --max-workers
+workers are timed (the fastest of --repeats runs). The pool overhead is the time the pool with a single worker takes
+longer than the serial search: starting and tearing down the pool and sending the shards and their top-k results
+between the processes. Workers beyond the number of CPUs only add overhead, so with a single CPU no speedup is
+possible and the overhead is all that is measured.
+
+Results with top_k=10 per talent and 500 jobs on 1 CPU, fastest of 3 runs:
+
+==========  ========  ================  =================
+pairs       serial    1 worker          2 workers
+==========  ========  ================  =================
+50,000      0.20 s    0.23 s (0.86x)    0.20 s (0.99x)
+500,000     1.85 s    1.69 s (1.09x)    1.63 s (1.13x)
+2,000,000   6.87 s    7.71 s (0.89x)    9.30 s (0.74x)
+8,000,000   30.9 s    32.4 s (0.95x)    37.7 s (0.82x)
+==========  ========  ================  =================
+
+The 500,000 pairs are a single shard in every column, so that row shows the run-to-run noise of about 10%. Starting
+the pool costs about 30 ms, and shipping the shards and their top-k results adds another 5 to 12% of the serial time,
+so on a single CPU the pool is slower than the search for every workload, and more workers than CPUs are slower
+still. With n CPUs the pool takes about 30 ms + 1.1 * serial time / min(n, shards), so it is only faster from about
+20,000 pairs and 2 shards on, i.e. at least 2 * talents_per_task talents. parallel_search.min_pairs defaults to
+100,000 to leave a margin for the noise. Scaling across more than one CPU has not been measured.
+
+Run from the repository root:
+
+    python -m src.benchmarks.parallel_search_benchmark
+    python -m src.benchmarks.parallel_search_benchmark --talents 100 1000 10000 --jobs 500 --output parallel.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Callable
+
+from src.create_config import create_config
+from src.feature_engineering import FeatureEngineer
+from src.feature_extraction import FeatureExtractor
+from src.parallel_search import ParallelSearch
+from src.search import Search
+from src.synthetic_data import SyntheticProfileGenerator
+from src.training import Trainer
+from src.tree_inference import CompiledModel
+
+# Set up logging configuration
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+ROOT_PATH = Path(__file__).resolve().parents[2]
+TOP_K = 10
+
+
+def _fastest(function: Callable[[], object], repeats: int) -> float:
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+    return min(seconds)
+
+
+def run(n_talents_options: list[int], n_jobs: int, max_workers: int, repeats: int) -> dict:
+    """
+    Returns:
+        dict: The environment and per number of talents the serial and per number of workers the parallel seconds,
+        throughput and speedup.
+    """
+    config = create_config(ROOT_PATH / "config")
+    feature_extractor = FeatureExtractor(config)
+    feature_engineer = FeatureEngineer(config)
+    model = Trainer(config, feature_extractor, feature_engineer).load_model(ROOT_PATH / "model" / "model.joblib")
+    search = Search(config, feature_extractor, feature_engineer, CompiledModel.from_sklearn(model))
+    generator = SyntheticProfileGenerator(config)
+    jobs = generator.jobs(n_jobs)
+    all_talents = generator.talents(max(n_talents_options))
+
+    results = []
+    for n_talents in n_talents_options:
+        talents = all_talents[:n_talents]
+        n_pairs = n_talents * n_jobs
+        serial_seconds = _fastest(lambda: search.match_bulk(talents, jobs, top_k=TOP_K, group_by="talent"), repeats)
+        logger.info(f"{n_talents} x {n_jobs}: serial {serial_seconds:.3f} s, {n_pairs / serial_seconds:,.0f} pairs/s")
+        parallel = []
+        for n_workers in range(1, max_workers + 1):
+            parallel_search = ParallelSearch(search, n_workers=n_workers, min_pairs=0)
+            seconds = _fastest(
+                lambda: parallel_search.match_bulk(talents, jobs, top_k=TOP_K, group_by="talent"), repeats
+            )
+            parallel.append(
+                {
+                    "n_workers": n_workers,
+                    "seconds": seconds,
+                    "pairs_per_second": n_pairs / seconds,
+                    "speedup": serial_seconds / seconds,
+                }
+            )
+            logger.info(
+                f"{n_talents} x {n_jobs}: n_workers={n_workers} {seconds:.3f} s, {n_pairs / seconds:,.0f} pairs/s, "
+                f"speedup {serial_seconds / seconds:.2f}x"
+            )
+        results.append(
+            {
+                "n_talents": n_talents,
+                "n_jobs": n_jobs,
+                "n_pairs": n_pairs,
+                "serial_seconds": serial_seconds,
+                "pool_overhead_seconds": parallel[0]["seconds"] - serial_seconds,
+                "parallel": parallel,
+            }
+        )
+    return {
+        "cpu_count": os.cpu_count(),
+        "talents_per_task": ParallelSearch(search).talents_per_task,
+        "results": results,
+    }
+
+
+def main(argv: list[str] = None) -> int:
+    """
+    Main function to time the serial and the parallel match_bulk for several workloads and numbers of workers.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--talents", type=int, nargs="+", default=[100, 1000, 4000, 16000], help="Numbers of talents")
+    parser.add_argument("--jobs", type=int, default=500, help="Number of jobs")
+    parser.add_argument(
+        "--max-workers", type=int, default=os.cpu_count() or 1, help="Largest number of workers, defaults to the CPUs"
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="Repetitions per measurement, the fastest is reported")
+    parser.add_argument("--output", type=Path, help="Path the JSON report is written to")
+    args = parser.parse_args(argv)
+
+    report = run(args.talents, args.jobs, args.max_workers, args.repeats)
+    for result in report["results"]:
+        faster = [entry["n_workers"] for entry in result["parallel"] if entry["speedup"] > 1]
+        logger.info(
+            f"{result['n_pairs']} pairs: pool overhead {result['pool_overhead_seconds']:.3f} s, "
+            f"faster than serial with {faster or 'no number of'} workers"
+        )
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        logger.info(f"Wrote benchmark report to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,164 @@
+"""
+Benchmark of the memory of N concurrently running search workers that match talents against a job catalogue:
+
+- private: every worker loads model.joblib, parses the jobs and extracts their side arrays itself,
+- shared: every worker attaches to a deployment published by src.shared_deployment.publish_deployment.
+
+All workers of a mode run at the same time, so the proportional set size (PSS) splits the shared pages among them.
+The shared workers are then switched to a newly published version without a restart and measured again.
+
+Run from the repository root: python -m src.benchmarks.shared_memory_benchmark
+"""
+
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from src.create_config import create_config
+from src.feature_engineering import FeatureEngineer
+from src.feature_extraction import FeatureExtractor
+from src.shared_deployment import publish_deployment
+from src.synthetic_data import SyntheticProfileGenerator
+from src.training import Trainer
+
+# Set up logging configuration
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+ROOT_PATH = Path(__file__).resolve().parents[2]
+N_WORKERS = 4
+N_JOBS = 50_000
+N_TALENTS = 20
+TOP_K = 10
+MEMORY_KEYS = ["rss", "pss", "private"]
+
+PRIVATE_WORKER = """
+import json
+from src.create_config import create_config
+from src.feature_engineering import FeatureEngineer
+from src.feature_extraction import FeatureExtractor
+from src.search import Search
+from src.training import Trainer
+
+config = create_config("{root}/config")
+feature_extractor, feature_engineer = FeatureExtractor(config), FeatureEngineer(config)
+model = Trainer(config, feature_extractor, feature_engineer).load_model("{root}/model/model.joblib")
+search = Search(config, feature_extractor, feature_engineer, model)
+with open("{jobs}", "r") as file:
+    jobs = json.load(file)
+job_data = feature_extractor.extract_job_batch(jobs)
+
+
+def match_bulk(talents):
+    score_blocks = search.iter_extracted_score_blocks(search.extract_talents(talents), job_data)
+    return search.rank(talents, jobs, score_blocks, {top_k}, "talent", True)
+
+
+def report():
+    return {{"version": None}}
+"""
+
+SHARED_WORKER = """
+from src.shared_deployment import SharedDeployment
+
+deployment = SharedDeployment("{deployment}", check_interval_seconds=0)
+
+
+def match_bulk(talents):
+    return deployment.match_bulk(talents, top_k={top_k}, group_by="talent", columnar=True)
+
+
+def report():
+    return {{"version": deployment.version}}
+"""
+
+SNIPPET = """
+import json, sys
+{setup}
+from src.shared_deployment import memory_usage
+from test_data.test_data import talents
+
+talents = (talents * {n_talents})[:{n_talents}]
+# score, report the memory and wait for the next line on stdin, until stdin is closed
+while True:
+    results = match_bulk(talents)
+    print(json.dumps({{**report(), "results": len(results), **memory_usage()}}), flush=True)
+    if not sys.stdin.readline():
+        break
+"""
+
+
+def start_workers(setup: str) -> list[subprocess.Popen]:
+    code = SNIPPET.format(setup=setup, n_talents=N_TALENTS)
+    return [
+        subprocess.Popen(
+            [sys.executable, "-c", code], cwd=ROOT_PATH, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+        )
+        for _ in range(N_WORKERS)
+    ]
+
+
+def read_reports(workers: list[subprocess.Popen]) -> list[dict]:
+    return [json.loads(worker.stdout.readline()) for worker in workers]
+
+
+def stop_workers(workers: list[subprocess.Popen]) -> None:
+    for worker in workers:
+        worker.stdin.close()
+    for worker in workers:
+        worker.wait()
+
+
+def summarize(name: str, reports: list[dict]) -> dict:
+    summary = {key: statistics.mean(report[key] for report in reports) for key in MEMORY_KEYS}
+    logger.info(
+        f"{name}: per worker "
+        + ", ".join(f"{key} {summary[key] / 2**20:.1f} MiB" for key in MEMORY_KEYS)
+        + f", versions {sorted({str(report['version']) for report in reports})}"
+    )
+    return summary
+
+
+def main():
+    """
+    Main function to compare the memory per worker of the private and the shared mode.
+    """
+    config = create_config(ROOT_PATH / "config")
+    trainer = Trainer(config, FeatureExtractor(config), FeatureEngineer(config))
+    model = trainer.load_model(ROOT_PATH / "model" / "model.joblib")
+    jobs = SyntheticProfileGenerator(config).jobs(N_JOBS)
+    logger.info(f"Measuring {N_WORKERS} concurrent workers matching {N_TALENTS} talents against {N_JOBS} jobs")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        jobs_path = Path(tmp_dir) / "jobs.json"
+        with open(jobs_path, "w") as file:
+            json.dump(jobs, file)
+        workers = start_workers(PRIVATE_WORKER.format(root=ROOT_PATH, jobs=jobs_path, top_k=TOP_K))
+        private = summarize("private", read_reports(workers))
+        stop_workers(workers)
+
+        deployment_path = Path(tmp_dir) / "deployment"
+        publish_deployment(model, config, jobs, deployment_path)
+        workers = start_workers(SHARED_WORKER.format(deployment=deployment_path, top_k=TOP_K))
+        shared = summarize("shared", read_reports(workers))
+
+        publish_deployment(model, config, jobs, deployment_path)
+        for worker in workers:
+            worker.stdin.write("\n")
+            worker.stdin.flush()
+        summarize("shared after switching to a new version", read_reports(workers))
+        stop_workers(workers)
+
+    for key in MEMORY_KEYS:
+        logger.info(
+            f"Saving of {key}: {(private[key] - shared[key]) / 2**20:.1f} MiB per worker, "
+            f"{(private[key] - shared[key]) * N_WORKERS / 2**20:.1f} MiB for {N_WORKERS} workers"
+        )
+
+
+if __name__ == "__main__":
+    main()
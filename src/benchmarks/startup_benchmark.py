@@ -0,0 +1,118 @@
+"""
+Benchmark of the cold start of a search worker: the current path (parse COMMON.conf, unpickle model.joblib) against
+the artifact path (load the memory-mapped artifact written by src.artifact.export_artifact).
+
+Every measurement starts a fresh interpreter, imports what the path needs, builds a Search and scores one pair.
+
+Run from the repository root: python -m src.benchmarks.startup_benchmark
+"""
+
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.artifact import export_artifact
+from src.create_config import create_config
+from src.feature_engineering import FeatureEngineer
+from src.feature_extraction import FeatureExtractor
+from src.training import Trainer
+
+# Set up logging configuration
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+ROOT_PATH = Path(__file__).resolve().parents[2]
+REPEATS = 5
+HEAVY_MODULES = ["pandas", "sklearn", "pyhocon", "joblib"]
+
+CURRENT_PATH = """
+from src.create_config import create_config
+from src.feature_engineering import FeatureEngineer
+from src.feature_extraction import FeatureExtractor
+from src.search import Search
+from src.training import Trainer
+
+config = create_config("{root}/config")
+feature_extractor, feature_engineer = FeatureExtractor(config), FeatureEngineer(config)
+model = Trainer(config, feature_extractor, feature_engineer).load_model("{root}/model/model.joblib")
+search = Search(config, feature_extractor, feature_engineer, model)
+"""
+
+ARTIFACT_PATH = """
+from src.artifact import create_search
+
+search = create_search("{artifact}")
+"""
+
+SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+{setup}
+ready = time.perf_counter()
+from test_data.test_data import jobs, talents
+search.match_pairs(talents[:1], jobs[:1])
+print(json.dumps({{
+    "ready_seconds": ready - start,
+    "first_score_seconds": time.perf_counter() - start,
+    "heavy_modules": [name for name in {heavy_modules} if name in sys.modules],
+}}))
+"""
+
+
+def measure(setup: str) -> dict:
+    """
+    Runs the setup code in a fresh interpreter REPEATS times.
+
+    Returns:
+        dict: Median of the wall time of the whole process, of the time until the search is ready and until the first
+        pair is scored, and the heavy modules that were imported.
+    """
+    code = SNIPPET.format(setup=setup, heavy_modules=HEAVY_MODULES)
+    runs = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", code], cwd=ROOT_PATH, capture_output=True, text=True, check=True)
+        run = json.loads(output.stdout.strip().splitlines()[-1])
+        run["process_seconds"] = time.perf_counter() - start
+        runs.append(run)
+    return {
+        "process_seconds": statistics.median(run["process_seconds"] for run in runs),
+        "ready_seconds": statistics.median(run["ready_seconds"] for run in runs),
+        "first_score_seconds": statistics.median(run["first_score_seconds"] for run in runs),
+        "heavy_modules": runs[0]["heavy_modules"],
+    }
+
+
+def main():
+    """
+    Main function to compare the cold start of both paths.
+    """
+    config = create_config(ROOT_PATH / "config")
+    trainer = Trainer(config, FeatureExtractor(config), FeatureEngineer(config))
+    model = trainer.load_model(ROOT_PATH / "model" / "model.joblib")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        artifact_path = export_artifact(model, config, Path(tmp_dir) / "artifact")
+        results = {
+            "current": measure(CURRENT_PATH.format(root=ROOT_PATH)),
+            "artifact": measure(ARTIFACT_PATH.format(artifact=artifact_path)),
+        }
+
+    for name, result in results.items():
+        logger.info(
+            f"{name}: process {result['process_seconds'] * 1e3:.0f} ms, ready after {result['ready_seconds'] * 1e3:.0f} "
+            f"ms, first score after {result['first_score_seconds'] * 1e3:.0f} ms, heavy modules {result['heavy_modules']}"
+        )
+    logger.info(
+        f"Speedup of the time to the first score: "
+        f"{results['current']['first_score_seconds'] / results['artifact']['first_score_seconds']:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
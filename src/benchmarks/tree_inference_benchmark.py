@@ -0,0 +1,76 @@
+"""
+Benchmark of the compiled tree ensemble against sklearn's predict_proba.
+
+Run from the repository root: python -m src.benchmarks.tree_inference_benchmark
+"""
+
+import logging
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.create_config import create_config
+from src.feature_engineering import FeatureEngineer
+from src.feature_extraction import FeatureExtractor
+from src.training import Trainer
+from src.tree_inference import CompiledModel
+
+# Set up logging configuration
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+ROOT_PATH = Path(__file__).resolve().parents[2]
+BATCH_SIZES = [1, 100, 1_000_000]
+
+
+def sample_features(model, n_rows: int, seed: int = 42) -> np.ndarray:
+    """
+    Draws feature rows uniformly between the smallest and largest split threshold of every feature, so that all
+    branches of the trees are exercised.
+    """
+    rng = np.random.default_rng(seed)
+    splits = [estimator.tree_ for estimator in model.estimators_[:, 0]]
+    low = np.zeros(model.n_features_in_)
+    high = np.ones(model.n_features_in_)
+    for feature in range(model.n_features_in_):
+        thresholds = np.concatenate([tree.threshold[tree.feature == feature] for tree in splits])
+        if len(thresholds):
+            low[feature], high[feature] = thresholds.min() - 1, thresholds.max() + 1
+    return rng.uniform(low, high, size=(n_rows, model.n_features_in_))
+
+
+def best_time(function, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    """
+    Main function to compare sklearn and the compiled model at several batch sizes.
+    """
+    config = create_config(ROOT_PATH / "config")
+    trainer = Trainer(config, FeatureExtractor(config), FeatureEngineer(config))
+    model = trainer.load_model(ROOT_PATH / "model" / "model.joblib")
+    compiled_model = CompiledModel.from_sklearn(model)
+
+    for batch_size in BATCH_SIZES:
+        X = sample_features(model, batch_size)
+        pdf_X = pd.DataFrame(X, columns=model.feature_names_in_)
+        repeats = 3 if batch_size >= 100_000 else 50
+        max_error = np.abs(model.predict_proba(pdf_X)[:, 1] - compiled_model.predict_score(X)).max()
+        sklearn_time = best_time(lambda: model.predict_proba(pdf_X), repeats)
+        compiled_time = best_time(lambda: compiled_model.predict_score(X), repeats)
+        logger.info(
+            f"batch_size={batch_size}: sklearn {sklearn_time * 1e3:.3f} ms, compiled {compiled_time * 1e3:.3f} ms, "
+            f"speedup {sklearn_time / compiled_time:.1f}x, max abs error {max_error:.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
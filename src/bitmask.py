@@ -0,0 +1,78 @@
+"""
+Module for packing sets of indices, e.g. the job roles of a profile, into rows of 64 bit words.
+"""
+
+from typing import Iterable
+
+import numpy as np
+
+WORD_BITS = 64
+
+
+def n_words(n_bits: int) -> int:
+    return max(1, -(-n_bits // WORD_BITS))
+
+
+def pack_indices(index_sets: Iterable[Iterable[int]], n_bits: int) -> np.ndarray:
+    """
+    This method packs one set of bit positions per row into a bitmask.
+
+    Args:
+        index_sets: One iterable of bit positions in [0, n_bits) per row.
+        n_bits: Size of the universe the positions refer to.
+
+    Returns:
+        np.ndarray: A (rows, n_words(n_bits)) uint64 matrix, where bit i % 64 of word i // 64 is set for position i.
+    """
+    rows = [sum(1 << idx for idx in set(indices)) for indices in index_sets]
+    masks = np.zeros((len(rows), n_words(n_bits)), dtype=np.uint64)
+    for word in range(masks.shape[1]):
+        masks[:, word] = np.array([(row >> (word * WORD_BITS)) & 0xFFFFFFFFFFFFFFFF for row in rows], dtype=np.uint64)
+    return masks
+
+
+def unpack(masks: np.ndarray, n_bits: int) -> np.ndarray:
+    """
+    Inverse of pack_indices.
+
+    Returns:
+        np.ndarray: A (rows, n_bits) boolean indicator matrix.
+    """
+    positions = np.arange(n_bits)
+    words = masks[:, positions // WORD_BITS]
+    return ((words >> (positions % WORD_BITS).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+
+def bit(masks: np.ndarray, idx: int) -> np.ndarray:
+    """
+    Returns:
+        np.ndarray: A (rows,) boolean array telling for every row whether the bit at position idx is set.
+    """
+    word, offset = divmod(idx, WORD_BITS)
+    return ((masks[:, word] >> np.uint64(offset)) & np.uint64(1)).astype(bool)
+
+
+def popcount(masks: np.ndarray) -> np.ndarray:
+    """
+    Returns:
+        np.ndarray: The number of set bits per row, summed over the words in the last axis.
+    """
+    return np.bitwise_count(masks).sum(axis=-1, dtype=np.int64)
+
+
+def overlap_count(left: np.ndarray, right: np.ndarray, cross: bool = False) -> np.ndarray:
+    """
+    This method counts the common bits of two bitmask matrices.
+
+    Args:
+        left: A (n, words) bitmask matrix.
+        right: A (n, words) bitmask matrix if cross is False, otherwise a (m, words) bitmask matrix.
+        cross: If False, the i-th row of left is compared with the i-th row of right. If True, every row of left is
+            compared with every row of right.
+
+    Returns:
+        np.ndarray: The counts of shape (n,) or, if cross is True, (n, m).
+    """
+    if cross:
+        return popcount(left[:, None, :] & right[None, :, :])
+    return popcount(left & right)
@@ -0,0 +1,207 @@
+"""
+Module for pruning implausible talent/job pairs before they are scored by the model.
+"""
+
+from __future__ import annotations
+
+import logging
+from functools import reduce
+from typing import TYPE_CHECKING, Iterable
+
+import numpy as np
+
+from src.bitmask import bit, overlap_count, unpack
+from src.compiled_config import CompiledConfig
+from src.feature_extraction import FeatureExtractor
+
+if TYPE_CHECKING:
+    from pyhocon import ConfigTree
+
+logger = logging.getLogger(__name__)
+
+
+class CandidateIndex:
+    def __init__(self, config: ConfigTree, feature_extractor: FeatureExtractor) -> None:
+        """
+        Initialize a new instance of the CandidateIndex class. The pruning rules are read from the candidate_pruning
+        section of the config:
+
+        - require_role_overlap: Only keep jobs that share at least one role with the talent (p_role_match > 0).
+        - max_must_have_language_discrepancy: Only keep jobs where the must-have rank of every language exceeds the
+          rank of the talent by at most this value. A talent that does not speak a language has rank 0.
+          null disables the rule.
+        - max_seniority_rank_distance: Only keep jobs that list at least one seniority whose rank differs from the
+          talent's seniority rank by at most this value. null disables the rule.
+
+        Parameters:
+        - config (ConfigTree): The configuration settings
+        - feature_extractor (FeatureExtractor): An instance of the FeatureExtractor class for extracting features.
+
+        Returns:
+        - None
+        """
+        self.config = config
+        self.feature_extractor = feature_extractor
+        self.require_role_overlap = self.config.get("candidate_pruning.require_role_overlap", True)
+        self.max_must_have_language_discrepancy = self.config.get(
+            "candidate_pruning.max_must_have_language_discrepancy", None
+        )
+        self.max_seniority_rank_distance = self.config.get("candidate_pruning.max_seniority_rank_distance", None)
+        self.seniority_rank_mapping = self.config.seniority_rank_mapping
+        self.compiled_config = CompiledConfig.of(self.config)
+        self.jobs = []
+        self.job_data = None
+        self.role_postings = []
+        self.must_have_buckets = []
+        self.seniority_buckets = {}
+        self.jobs_without_seniority = np.empty(0, dtype=np.int64)
+
+    def build(self, jobs: list[dict]) -> "CandidateIndex":
+        """
+        This method builds the inverted postings over the given jobs:
+
+        - one posting list of job ids per entry of the job_role_universe,
+        - one bucket of job ids per language and must-have rank (rank 0 holds the jobs without must-have requirement),
+        - one bucket of job ids per seniority listed by the jobs.
+
+        Args:
+            jobs: List of dicts representing jobs with relevant attributes
+
+        Returns:
+            CandidateIndex: The index itself.
+        """
+        self.jobs = jobs
+        self.job_data = self.feature_extractor.extract_job_batch(jobs)
+
+        self.role_postings = [
+            np.flatnonzero(bit(self.job_data["role_mask"], idx)) for idx in range(len(self.compiled_config.roles))
+        ]
+        self.must_have_buckets = [
+            {rank: np.flatnonzero(column == rank) for rank in np.unique(column)}
+            for column in self.job_data["languages_must_have"].T
+        ]
+
+        job_seniorities = self._seniority_matrix(jobs)
+        self.seniority_buckets = {
+            seniority: np.flatnonzero(job_seniorities[:, idx])
+            for idx, seniority in enumerate(self.seniority_rank_mapping)
+        }
+        self.jobs_without_seniority = np.flatnonzero(~job_seniorities.any(axis=1))
+        return self
+
+    def candidates(self, talent_data: dict, row: int) -> np.ndarray:
+        """
+        This method enumerates the plausible jobs of a single talent by intersecting the postings of every active rule.
+
+        Args:
+            talent_data: Talent side arrays as returned by FeatureExtractor.extract_talent_batch.
+            row: Row of the talent within talent_data.
+
+        Returns:
+            np.ndarray: The sorted ids of the plausible jobs, i.e. positions within the jobs the index was built on.
+        """
+        postings = []
+        if self.require_role_overlap:
+            talent_roles = np.flatnonzero(unpack(talent_data["role_mask"][row : row + 1], len(self.role_postings))[0])
+            postings.append(self._union(self.role_postings[role] for role in talent_roles))
+
+        if self.max_must_have_language_discrepancy is not None:
+            for language, buckets in enumerate(self.must_have_buckets):
+                max_rank = float(talent_data["languages"][row, language]) + self.max_must_have_language_discrepancy
+                if any(rank > max_rank for rank in buckets):
+                    postings.append(self._union(job_ids for rank, job_ids in buckets.items() if rank <= max_rank))
+
+        talent_seniority_rank = talent_data["maturity"]["seniority_rank_TALENT"][row]
+        if self.max_seniority_rank_distance is not None and not np.isnan(talent_seniority_rank):
+            postings.append(
+                self._union(
+                    [self.jobs_without_seniority]
+                    + [
+                        job_ids
+                        for seniority, job_ids in self.seniority_buckets.items()
+                        if abs(self.seniority_rank_mapping[seniority] - talent_seniority_rank)
+                        <= self.max_seniority_rank_distance
+                    ]
+                )
+            )
+
+        if not postings:
+            return np.arange(len(self.jobs))
+        return reduce(lambda left, right: np.intersect1d(left, right, assume_unique=True), postings)
+
+    def keep_pairs(self, talents: list[dict], jobs: list[dict]) -> np.ndarray:
+        """
+        This method evaluates the pruning rules for aligned pairs, i.e. the i-th talent with the i-th job, without
+        building postings.
+
+        Args:
+            talents: List of dicts representing talents with relevant attributes.
+            jobs: List of dicts representing jobs with relevant attributes, aligned with talents.
+
+        Returns:
+            np.ndarray: A boolean array that is True for every pair that survives the pruning.
+        """
+        extracted = self.feature_extractor.extract_batch(talents, jobs)
+        talent_data, job_data = extracted["talent_info"], extracted["job_info"]
+        keep = np.ones(len(talents), dtype=bool)
+
+        if self.require_role_overlap:
+            keep &= overlap_count(talent_data["role_mask"], job_data["role_mask"]) > 0
+
+        if self.max_must_have_language_discrepancy is not None:
+            discrepancy = job_data["languages_must_have"].astype(np.float64) - talent_data["languages"]
+            keep &= (discrepancy <= self.max_must_have_language_discrepancy).all(axis=1)
+
+        if self.max_seniority_rank_distance is not None:
+            talent_seniority_rank = talent_data["maturity"]["seniority_rank_TALENT"]
+            seniority_ranks = self.compiled_config.ranks["seniority"]
+            job_seniorities = self._seniority_matrix(jobs)
+            in_reach = (
+                np.abs(seniority_ranks[None, :] - talent_seniority_rank[:, None]) <= self.max_seniority_rank_distance
+            )
+            keep &= (
+                np.isnan(talent_seniority_rank)
+                | ~job_seniorities.any(axis=1)
+                | (in_reach & job_seniorities).any(axis=1)
+            )
+
+        return keep
+
+    def recall_check(self, data: list[dict]) -> dict:
+        """
+        This method measures how many labeled examples the pruning would drop.
+
+        Args:
+            data: List of training examples, each a dict with the keys talent, job and label.
+
+        Returns:
+            dict: Number of positives and negatives, how many of them are dropped, and the recall on the positives.
+        """
+        labels = np.array([elem["label"] for elem in data], dtype=bool)
+        keep = self.keep_pairs([elem["talent"] for elem in data], [elem["job"] for elem in data])
+        positives = int(labels.sum())
+        dropped_positives = int((labels & ~keep).sum())
+        report = {
+            "positives": positives,
+            "dropped_positives": dropped_positives,
+            "negatives": int((~labels).sum()),
+            "dropped_negatives": int((~labels & ~keep).sum()),
+            "recall": (positives - dropped_positives) / positives if positives else 1.0,
+        }
+        logger.info(f"Candidate pruning recall check: {report}")
+        return report
+
+    def _seniority_matrix(self, jobs: list[dict]) -> np.ndarray:
+        seniority_index = self.compiled_config.indices["seniority"]
+        job_seniorities = np.zeros((len(jobs), len(seniority_index)), dtype=bool)
+        for row, job in enumerate(jobs):
+            columns = [seniority_index[seniority] for seniority in job["seniorities"] if seniority in seniority_index]
+            job_seniorities[row, columns] = True
+        return job_seniorities
+
+    @staticmethod
+    def _union(postings: Iterable[np.ndarray]) -> np.ndarray:
+        postings = list(postings)
+        if not postings:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(postings))
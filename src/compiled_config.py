@@ -0,0 +1,236 @@
+"""
+Module for the compiled config: lookup tables derived once from the config, and a disk cache of the parsed config.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import weakref
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+# Mappings of the config that are compiled into name -> index maps and rank arrays
+RANK_MAPPINGS = {
+    "seniority": "seniority_rank_mapping",
+    "degree": "degree_rank_mapping",
+    "rating": "language_rating_rank_mapping",
+}
+
+_compiled_configs = {}
+
+
+class ResolvedConfig(dict):
+    """
+    Plain dict counterpart of the ConfigTree returned by create_config. Like the ConfigTree it supports attribute
+    access (config.features) and dotted keys in get (config.get("serving.max_batch_size", 64)).
+    """
+
+    def __getattr__(self, key: str):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def get(self, key: str, default=None):
+        value = self
+        for part in key.split("."):
+            if not isinstance(value, dict) or part not in value:
+                return default
+            value = dict.__getitem__(value, part)
+        return value
+
+    @classmethod
+    def from_plain(cls, values: dict) -> "ResolvedConfig":
+        return cls({key: cls.from_plain(value) if isinstance(value, dict) else value for key, value in values.items()})
+
+
+class CompiledConfig:
+    def __init__(self, roles: list, languages: list, rank_mappings: dict, features: list) -> None:
+        """
+        Initialize a new instance of the CompiledConfig class, which holds the lookup tables the extraction and
+        engineering paths need: interned name -> index maps of roles, languages, seniorities, degrees and language
+        ratings, the rank of every seniority, degree and rating as array, and the column index of every feature.
+
+        Use CompiledConfig.of to get the compiled config of a config, which compiles every config only once.
+
+        Parameters:
+        - roles (list): The job_role_universe.
+        - languages (list): The job_language_universe.
+        - rank_mappings (dict): The name -> rank mapping per entry of RANK_MAPPINGS, e.g. rank_mappings["degree"].
+        - features (list): The features in the order the model expects them.
+
+        Returns:
+        - None
+        """
+        self.roles = [sys.intern(role) for role in roles]
+        self.role_index = {role: idx for idx, role in enumerate(self.roles)}
+        self.languages = [sys.intern(language) for language in languages]
+        self.language_index = {language: idx for idx, language in enumerate(self.languages)}
+        self.names = {}
+        self.indices = {}
+        self.ranks = {}
+        for kind, mapping in rank_mappings.items():
+            self.names[kind] = [sys.intern(name) for name in mapping]
+            self.indices[kind] = {name: idx for idx, name in enumerate(self.names[kind])}
+            self.ranks[kind] = np.array(list(mapping.values()), dtype=np.float64)
+        self.features = [sys.intern(feature) for feature in features]
+        self.feature_index = {feature: idx for idx, feature in enumerate(self.features)}
+        self.rating_rank_dtype = self._compact_dtype(self.ranks["rating"])
+        self._rank_lookup = {
+            kind: {name: float(rank) for name, rank in zip(self.names[kind], self.ranks[kind])} for kind in self.names
+        }
+
+    @classmethod
+    def from_config(cls, config) -> "CompiledConfig":
+        return cls(
+            config.job_role_universe,
+            config.job_language_universe,
+            {kind: dict(config.get(key)) for kind, key in RANK_MAPPINGS.items()},
+            config.features,
+        )
+
+    @classmethod
+    def of(cls, config) -> "CompiledConfig":
+        """
+        Returns the compiled config of the given config (a ConfigTree or a ResolvedConfig), compiling it on the first
+        call for this config object only.
+        """
+        entry = _compiled_configs.get(id(config))
+        if entry is not None and entry[0]() is config:
+            return entry[1]
+        compiled = getattr(config, "__dict__", {}).get("compiled_config") or cls.from_config(config)
+        try:
+            _compiled_configs[id(config)] = (weakref.ref(config), compiled)
+            weakref.finalize(config, _compiled_configs.pop, id(config), None)
+        except TypeError:
+            pass
+        return compiled
+
+    def to_dict(self) -> dict:
+        return {
+            "roles": self.roles,
+            "languages": self.languages,
+            "rank_mappings": {kind: self._rank_lookup[kind] for kind in self.names},
+            "features": self.features,
+        }
+
+    @classmethod
+    def from_dict(cls, values: dict) -> "CompiledConfig":
+        return cls(values["roles"], values["languages"], values["rank_mappings"], values["features"])
+
+    def rank(self, kind: str, name) -> Optional[float]:
+        """
+        Returns:
+            float: The rank of the seniority, degree or rating (depending on kind) with the given name, or None if
+            the name has no rank.
+        """
+        return self._rank_lookup[kind].get(name)
+
+    def ranks_by_name(self, kind: str) -> dict:
+        """
+        Returns:
+            dict: The name -> rank mapping of the seniorities, degrees or ratings, depending on kind.
+        """
+        return self._rank_lookup[kind]
+
+    @staticmethod
+    def _compact_dtype(ranks: np.ndarray) -> np.dtype:
+        """
+        Returns uint8 if all ranks are integers that fit into it, so rank matrices take one byte per entry,
+        and float64 otherwise.
+        """
+        if np.all((ranks == np.round(ranks)) & (ranks >= 0) & (ranks <= 255)):
+            return np.dtype(np.uint8)
+        return np.dtype(np.float64)
+
+
+def load_config(conf_path: Union[str, Path], cache_path: Optional[Union[str, Path]] = None) -> ResolvedConfig:
+    """
+    Cached counterpart of create_config. The parsed config and its compiled lookup tables are stored as JSON next to
+    the config files. The cache is used as long as the modification time and size of COMMON.conf are unchanged, or
+    its SHA-256 hash is unchanged if they differ, so neither pyhocon has to be imported nor the HOCON file parsed.
+
+    Args:
+        conf_path: Input directory of the config files.
+        cache_path: Path of the cache file. Defaults to .cache/compiled_config.json within conf_path.
+
+    Returns:
+        ResolvedConfig: The config, with its compiled config attached, see CompiledConfig.of.
+    """
+    common_config_file = Path(conf_path) / "COMMON.conf"
+    cache_path = Path(cache_path) if cache_path is not None else Path(conf_path) / ".cache" / "compiled_config.json"
+    stat = common_config_file.stat()
+    source = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    cache = _read_cache(cache_path)
+    if cache is None or any(cache["source"][key] != value for key, value in source.items()):
+        source["sha256"] = _sha256(common_config_file)
+        if cache is None or cache["source"]["sha256"] != source["sha256"]:
+            logger.info(f"Compiling config {common_config_file}")
+            from src.create_config import create_config
+
+            config_tree = create_config(conf_path)
+            cache = {
+                "version": CACHE_VERSION,
+                "config": config_tree.as_plain_ordered_dict(),
+                "compiled": CompiledConfig.from_config(config_tree).to_dict(),
+            }
+        cache["source"] = source
+        _write_cache(cache_path, cache)
+
+    config = ResolvedConfig.from_plain(cache["config"])
+    config.__dict__["compiled_config"] = CompiledConfig.from_dict(cache["compiled"])
+    return config
+
+
+def _read_cache(cache_path: Path) -> Optional[dict]:
+    """
+    Returns:
+        dict: The cache, or None if there is none or it cannot be used (unreadable, corrupt or of another version).
+    """
+    try:
+        with open(cache_path, "r") as file:
+            cache = json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as error:
+        logger.warning(f"Ignoring unreadable config cache {cache_path}: {error}")
+        return None
+    if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+        return None
+    if not {"source", "config", "compiled"} <= cache.keys():
+        logger.warning(f"Ignoring incomplete config cache {cache_path}")
+        return None
+    return cache
+
+
+def _write_cache(cache_path: Path, cache: dict) -> None:
+    """
+    Writes the cache to a temporary file of its own, which is then renamed, so concurrently starting processes never
+    read a partially written cache. The config is still returned if the cache cannot be written, e.g. on a
+    read-only filesystem.
+    """
+    tmp_path = None
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, prefix=f".{cache_path.name}.", suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            json.dump(cache, file)
+        os.replace(tmp_path, cache_path)
+    except OSError as error:
+        logger.warning(f"Could not write config cache {cache_path}: {error}")
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _sha256(path: Path) -> str:
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
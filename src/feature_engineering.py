@@ -2,10 +2,18 @@
 Module for feature engineering.
 """
 
+from __future__ import annotations
+
+from typing import Optional
+
 import numpy as np
-import pandas as pd
 
-pd.options.mode.chained_assignment = None
+from src.bitmask import bit, overlap_count, pack_indices, popcount
+from src.compiled_config import CompiledConfig
+from src.lazy_import import LazyModule
+
+# pandas is only needed by the per-pair path and imported on first use, so the batch path can run without it
+pd = LazyModule("pandas", on_import=lambda pandas: setattr(pandas.options.mode, "chained_assignment", None))
 
 
 class FeatureEngineer:
@@ -14,197 +22,156 @@ class FeatureEngineer:
         self.job_language_universe = self.config.job_language_universe
         self.job_role_universe = self.config.job_role_universe
         self.relevant_features = self.config.features
+        self.compiled_config = CompiledConfig.of(self.config)
 
     def engineer_features(self, extracted_features):
-        talent_data = extracted_features["talent_info"]
-        job_data = extracted_features["job_info"]
-        language_features = self._engineer_language_features(talent_data["pdf_languages"], job_data["pdf_languages"])
-        maturity_features = self._engineer_maturity_features(talent_data["maturity"], job_data["maturity"])
-        role_features = self._engineer_role_features(talent_data["pdf_roles"], job_data["pdf_roles"])
-        features = pd.concat([language_features, maturity_features, role_features], axis=1)
-        features = features[self.relevant_features]
-        return features
-
-    def _engineer_role_features(self, pdf_talent_data: pd.DataFrame, pdf_job_data: pd.DataFrame) -> pd.DataFrame:
         """
-        This method is responsible for engineering role-related features from the provided talent and job data.
+        This method engineers the features of a single (talent, job) pair from the output of
+        FeatureExtractor.extract_features. The extracted roles and languages are turned into the side arrays of the
+        batch path with the lookup maps of the compiled config, so both paths compute the features with the same
+        code.
 
         Args:
-            pdf_talent_data: A DataFrame containing talent data with columns 'job_role' and 'indicator'.
-            pdf_job_data: A DataFrame containing job data with columns 'job_role' and 'indicator'.
+            extracted_features: Dict with the talent_info and job_info of the pair.
 
         Returns:
-            pd.DataFrame: A DataFrame containing engineered role-related features.
-
-        Notes:
-            - It has been decided to use for the p_role_match feature the job role requirements as denominator.
-              It would also be possible to use the talent role requirements here, but the modeling results were considered
-              to be good enough using the current approach.
+            pd.DataFrame: A single row with the columns in the order of the features config.
         """
-        pdf_talent_data["index"] = 1
-        pdf_job_data["index"] = 1
-
-        pdf_talent_job_roles_wide = (
-            pdf_talent_data.pivot(index="index", columns="job_role", values="indicator").fillna(0).reset_index()
-        )
-        pdf_talent_job_roles_wide, rel_cols_talent = self._reformat_role_features(pdf_talent_job_roles_wide, "TALENT")
-
-        pdf_job_job_roles_wide = (
-            pdf_job_data.pivot(index="index", columns="job_role", values="indicator").fillna(0).reset_index()
-        )
+        talent_info = extracted_features["talent_info"]
+        job_info = extracted_features["job_info"]
+        talent_data = {
+            "role_mask": self._role_mask(talent_info["pdf_roles"]),
+            "languages": self._language_ranks(talent_info["pdf_languages"]),
+            "maturity": self._maturity(talent_info["maturity"]),
+        }
+        job_data = {
+            "role_mask": self._role_mask(job_info["pdf_roles"]),
+            "languages_must_have": self._language_ranks(job_info["pdf_languages"], must_have=True),
+            "languages_should_have": self._language_ranks(job_info["pdf_languages"], must_have=False),
+            "maturity": self._maturity(job_info["maturity"]),
+        }
+        columns = self._engineer_columns(talent_data, job_data, cross=False)
+        return pd.DataFrame(self._stack_columns(columns, (1,)), columns=self.relevant_features)
+
+    def engineer_batch(self, extracted_batch: dict) -> np.ndarray:
+        """
+        Batch counterpart of engineer_features, operating on the output of FeatureExtractor.extract_batch.
 
-        pdf_job_job_roles_wide, rel_cols_job = self._reformat_role_features(pdf_job_job_roles_wide, "JOB")
+        Args:
+            extracted_batch: Dict with the aligned talent_info and job_info arrays of n (talent, job) pairs.
 
-        pdf_job_roles = pd.concat([pdf_job_job_roles_wide, pdf_talent_job_roles_wide], axis=1)
+        Returns:
+            np.ndarray: A (n, len(features)) matrix with the columns in the order of the features config.
+        """
+        talent_data = extracted_batch["talent_info"]
+        job_data = extracted_batch["job_info"]
+        columns = self._engineer_columns(talent_data, job_data, cross=False)
+        return self._stack_columns(columns, (len(talent_data["role_mask"]),))
 
-        pdf_role_match = pd.DataFrame(
-            pdf_job_roles[rel_cols_talent].to_numpy() * pdf_job_roles[rel_cols_job].to_numpy(),
-            columns=self.job_role_universe,
-        )
+    def engineer_cross(self, talent_data: dict, job_data: dict) -> np.ndarray:
+        """
+        This method engineers the features of every (talent, job) combination by broadcasting the side arrays
+        against each other, so each talent and job only has to be extracted once.
 
-        pdf_job_roles["p_role_match"] = (
-            pdf_role_match.sum(axis=1).iloc[0] / pdf_job_roles[rel_cols_job].sum(axis=1).iloc[0]
-        )
+        Args:
+            talent_data: Talent side arrays of n talents as returned by FeatureExtractor.extract_talent_batch.
+            job_data: Job side arrays of m jobs as returned by FeatureExtractor.extract_job_batch.
 
-        return pdf_job_roles
+        Returns:
+            np.ndarray: A (n * m, len(features)) matrix, where row i * m + j holds the features of talent i and job j.
+        """
+        columns = self._engineer_columns(talent_data, job_data, cross=True)
+        return self._stack_columns(columns, (len(talent_data["role_mask"]), len(job_data["role_mask"])))
 
-    def _reformat_role_features(self, pdf: pd.DataFrame, identifier: str) -> (pd.DataFrame, list):
+    def _engineer_columns(self, talent_data: dict, job_data: dict, cross: bool) -> dict:
         """
-        This method reformats the role features DataFrame by filling missing columns, selecting relevant columns,
-        and renaming the columns by adding the identifier as suffix.
+        This method computes the features of the per-pair path as named arrays. The per-role indicator columns are
+        only computed for the roles that are listed in the features config.
 
         Args:
-            pdf: The DataFrame containing role features.
-            identifier: The identifier to be appended to the column names.
+            talent_data: Talent side arrays as returned by FeatureExtractor.extract_talent_batch.
+            job_data: Job side arrays as returned by FeatureExtractor.extract_job_batch.
+            cross: If False, the i-th talent is paired with the i-th job and every column has shape (n,).
+                If True, every talent is paired with every job and the columns broadcast to shape (n, m).
 
         Returns:
-            Tuple
-                pd.DataFrame: The reformatted DataFrame with missing columns filled, relevant columns selected,
-                             and renamed columns.
-                list: A list of the renamed column names.
-
-        Note:
-        - This method uses the _fill_frame method to fill missing columns.
-        - The relevant columns are selected based on the job_role_universe attribute.
-        - The renamed columns are formed by appending the identifier to the relevant job roles.
+            dict: Mapping of feature name to array. Talent- and job-only columns are not broadcast yet.
         """
-        pdf = self._fill_frame(pdf, self.job_role_universe)
-        pdf = pdf[self.job_role_universe]
-        rel_cols = [f"{rel_job}_{identifier}" for rel_job in self.job_role_universe]
-        pdf.columns = rel_cols
-        return pdf, rel_cols
-
-    def _engineer_language_features(
-        self, pdf_talent_languages: pd.DataFrame, pdf_job_languages: pd.DataFrame
-    ) -> pd.DataFrame:
-        pdf_talent_languages_wide = self._engineer_talent_language_features(pdf_talent_languages)
-        pdf_job_languages_wide = self._engineer_job_language_features(pdf_job_languages)
-        pdf_languages_wide = pd.concat([pdf_talent_languages_wide, pdf_job_languages_wide], axis=1)
-        pdf_languages_wide["German_must_have_discrepancy"] = (
-            pdf_languages_wide["German_must_have_JOB"] - pdf_languages_wide["German_TALENT"]
-        )
-        pdf_languages_wide["English_must_have_discrepancy"] = (
-            pdf_languages_wide["English_must_have_JOB"] - pdf_languages_wide["English_TALENT"]
-        )
-        pdf_languages_wide["German_should_have_discrepancy"] = (
-            pdf_languages_wide["German_should_have_JOB"] - pdf_languages_wide["German_TALENT"]
-        )
-        pdf_languages_wide["English_should_have_discrepancy"] = (
-            pdf_languages_wide["English_should_have_JOB"] - pdf_languages_wide["English_TALENT"]
-        )
-        return pdf_languages_wide
-
-    def _engineer_talent_language_features(self, pdf_talent_languages: pd.DataFrame) -> pd.DataFrame:
-        pdf_talent_languages_required = pdf_talent_languages[
-            pdf_talent_languages["title"].isin(self.job_language_universe)
-        ]
-
-        pdf_talent_languages_required["index"] = 1
-        pdf_talent_languages_required_wide = (
-            pdf_talent_languages_required.pivot(index="index", columns="title", values="rating_rank")
-            .fillna(0)
-            .reset_index()
-        )
-
-        pdf_talent_languages_required_wide = self._fill_frame(
-            pdf_talent_languages_required_wide, self.job_language_universe
-        )
-
-        pdf_talent_languages_required_wide = pdf_talent_languages_required_wide.rename(
-            columns={"English": "English_TALENT", "German": "German_TALENT"}
-        )
-
-        return pdf_talent_languages_required_wide
-
-    def _engineer_job_language_features(self, pdf_job_languages: pd.DataFrame) -> pd.DataFrame:
-        pdf_job_languages["index"] = 1
-        pdf_job_languages_must_have_wide = (
-            pdf_job_languages[pdf_job_languages["must_have"] == True]
-            .pivot(index="index", columns="title", values="rating_rank")
-            .fillna(0)
-            .reset_index()
-        )
-
-        pdf_job_languages_must_have_wide = self._fill_frame(
-            pdf_job_languages_must_have_wide, self.job_language_universe
-        )
-
-        pdf_job_languages_must_have_wide = pdf_job_languages_must_have_wide.rename(
-            columns={"English": "English_must_have_JOB", "German": "German_must_have_JOB"}
-        )
-
-        pdf_job_languages_should_have_wide = (
-            pdf_job_languages[pdf_job_languages["must_have"] == False]
-            .pivot(index="index", columns="title", values="rating_rank")
-            .fillna(0)
-            .reset_index()
-        )
-
-        pdf_job_languages_should_have_wide = self._fill_frame(
-            pdf_job_languages_should_have_wide, self.job_language_universe
-        ).reset_index()
-
-        pdf_job_languages_should_have_wide = pdf_job_languages_should_have_wide.rename(
-            columns={"English": "English_should_have_JOB", "German": "German_should_have_JOB"}
-        )
-
-        return pd.concat([pdf_job_languages_must_have_wide, pdf_job_languages_should_have_wide], axis=1)
-
-    @staticmethod
-    def _engineer_maturity_features(talent_maturity: dict, job_maturity: dict) -> pd.DataFrame:
-        pdf_talent_maturity = pd.DataFrame(talent_maturity, index=[0])
-        pdf_job_maturity = pd.DataFrame(job_maturity, index=[0])
-        pdf_maturity = pd.concat([pdf_talent_maturity, pdf_job_maturity], axis=1)
-        pdf_maturity["salary_discrepancy"] = pdf_maturity["salary_TALENT"] - pdf_maturity["salary_JOB"]
-        pdf_maturity["degree_discrepancy"] = pdf_maturity["degree_rank_TALENT"] - pdf_maturity["degree_rank_JOB"]
-        pdf_maturity["seniority_rank_discrepancy"] = (
-            pdf_maturity["seniority_rank_TALENT"] - pdf_maturity["seniority_rank_JOB"]
-        )
-        return pdf_maturity
 
-    @staticmethod
-    def _fill_frame(pdf: pd.DataFrame, target_cols: list) -> pd.DataFrame:
+        def talent_side(values: np.ndarray) -> np.ndarray:
+            return values[:, None] if cross else values
+
+        def job_side(values: np.ndarray) -> np.ndarray:
+            return values[None, :] if cross else values
+
+        columns = {}
+        for identifier, maturity in (("TALENT", talent_data["maturity"]), ("JOB", job_data["maturity"])):
+            side = talent_side if identifier == "TALENT" else job_side
+            for name, values in maturity.items():
+                columns[name] = side(values)
+        columns["salary_discrepancy"] = columns["salary_TALENT"] - columns["salary_JOB"]
+        columns["degree_discrepancy"] = columns["degree_rank_TALENT"] - columns["degree_rank_JOB"]
+        columns["seniority_rank_discrepancy"] = columns["seniority_rank_TALENT"] - columns["seniority_rank_JOB"]
+
+        # the rank matrices may be stored as uint8, cast before computing discrepancies
+        for idx, language in enumerate(self.compiled_config.languages):
+            columns[f"{language}_TALENT"] = talent_side(talent_data["languages"][:, idx].astype(np.float64))
+            columns[f"{language}_must_have_JOB"] = job_side(job_data["languages_must_have"][:, idx].astype(np.float64))
+            columns[f"{language}_should_have_JOB"] = job_side(
+                job_data["languages_should_have"][:, idx].astype(np.float64)
+            )
+            columns[f"{language}_must_have_discrepancy"] = (
+                columns[f"{language}_must_have_JOB"] - columns[f"{language}_TALENT"]
+            )
+            columns[f"{language}_should_have_discrepancy"] = (
+                columns[f"{language}_should_have_JOB"] - columns[f"{language}_TALENT"]
+            )
+
+        talent_roles = talent_data["role_mask"]
+        job_roles = job_data["role_mask"]
+        # the role indicators are only unpacked if they are used as features
+        for idx, role in enumerate(self.compiled_config.roles):
+            if f"{role}_TALENT" in self.compiled_config.feature_index:
+                columns[f"{role}_TALENT"] = talent_side(bit(talent_roles, idx))
+            if f"{role}_JOB" in self.compiled_config.feature_index:
+                columns[f"{role}_JOB"] = job_side(bit(job_roles, idx))
+        role_overlap = overlap_count(talent_roles, job_roles, cross=cross)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            columns["p_role_match"] = role_overlap / job_side(popcount(job_roles))
+
+        return columns
+
+    def _stack_columns(self, columns: dict, shape: tuple) -> np.ndarray:
+        """
+        Broadcasts the relevant feature columns to the given pair shape and stacks them in the configured order
+        into a matrix of shape (prod(shape), len(features)).
         """
-        This method extends the input pdf with non-existing columns listed in target-cols.
-        The new columns are filled with zeros.
+        matrix = np.empty(shape + (len(self.compiled_config.features),))
+        for feature, idx in self.compiled_config.feature_index.items():
+            matrix[..., idx] = columns[feature]
+        return matrix.reshape(-1, len(self.relevant_features))
 
-        Args:
-            pdf: The DataFrame to fill missing columns.
-            target_cols: A list of column names that should be present in the DataFrame.
+    def _role_mask(self, pdf_roles: pd.DataFrame) -> np.ndarray:
+        role_index = self.compiled_config.role_index
+        return pack_indices([[role_index[role] for role in pdf_roles["job_role"]]], len(self.compiled_config.roles))
 
+    def _language_ranks(self, pdf_languages: pd.DataFrame, must_have: Optional[bool] = None) -> np.ndarray:
+        """
         Returns:
-            pd.DataFrame: The DataFrame with missing columns filled with zeros.
-
-        Note:
-        - If the input DataFrame is empty, a new DataFrame with zeros is created.
-        - The ordering of the columns in the target_cols list is not guaranteed to be preserved.
+            np.ndarray: A (1, len(job_language_universe)) matrix of the rating ranks of the extracted languages, 0 for
+            languages that are not listed. If must_have is given, only the languages with that must_have flag are
+            included.
         """
-        cols = list(pdf)
-        missing_cols = list(set(target_cols) - set(cols))
-        if len(missing_cols) > 0:
-            if len(pdf) == 0:
-                pdf = pd.DataFrame(np.zeros((1, len(missing_cols))), columns=missing_cols, index=[0])
-            else:
-                pdf[missing_cols] = np.zeros(len(missing_cols))
-
-        return pdf
+        ranks = np.zeros((1, len(self.compiled_config.languages)))
+        flags = pdf_languages["must_have"] if must_have is not None else [None] * len(pdf_languages)
+        for title, rating_rank, flag in zip(pdf_languages["title"], pdf_languages["rating_rank"], flags):
+            column = self.compiled_config.language_index.get(title)
+            if column is not None and (must_have is None or flag == must_have):
+                ranks[0, column] = rating_rank
+        return ranks
+
+    @staticmethod
+    def _maturity(maturity: dict) -> dict:
+        return {
+            name: np.array([np.nan if value is None else value], dtype=np.float64) for name, value in maturity.items()
+        }
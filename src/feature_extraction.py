@@ -2,26 +2,30 @@
 Module for feature extraction
 """
 
-import pandas as pd
+from __future__ import annotations
 
-pd.options.mode.chained_assignment = None
+import numpy as np
+
+from src.bitmask import pack_indices
+from src.compiled_config import CompiledConfig
+from src.lazy_import import LazyModule
+
+# pandas is only needed by the per-pair path and imported on first use, so the batch path can run without it
+pd = LazyModule("pandas", on_import=lambda pandas: setattr(pandas.options.mode, "chained_assignment", None))
 
 
 class FeatureExtractor:
     def __init__(self, config):
         self.config = config
         self.seniority_rank_mapping = self.config.seniority_rank_mapping
-        self.pdf_seniority_rank_mapping = self._create_seniority_rank_mapping()
         self.degree_rank_mapping = self.config.degree_rank_mapping
         self.job_role_universe = self.config.job_role_universe
         self.language_rating_rank_mapping = self.config.language_rating_rank_mapping
-        self.pdf_language_rating_rank_mapping = self._create_language_rank_mapping()
-
-    def _create_seniority_rank_mapping(self):
-        return pd.DataFrame(list(self.seniority_rank_mapping.items()), columns=["seniority", "seniority_rank"])
-
-    def _create_language_rank_mapping(self):
-        return pd.DataFrame(list(self.language_rating_rank_mapping.items()), columns=["rating", "rating_rank"])
+        self.job_language_universe = self.config.job_language_universe
+        self.compiled_config = CompiledConfig.of(self.config)
+        self.role_index = self.compiled_config.role_index
+        self.language_index = self.compiled_config.language_index
+        self.language_rank_dtype = self.compiled_config.rating_rank_dtype
 
     def extract_features(self, talent_data, job_data):
         talent_info = self._extract_talent_info(talent_data)
@@ -29,6 +33,197 @@ class FeatureExtractor:
 
         return {"talent_info": talent_info, "job_info": job_info}
 
+    def extract_batch(self, talents: list[dict], jobs: list[dict]) -> dict:
+        """
+        Batch counterpart of extract_features. The i-th talent is paired with the i-th job.
+
+        Args:
+            talents: List of dicts representing talents with relevant attributes.
+            jobs: List of dicts representing jobs with relevant attributes, aligned with talents.
+
+        Returns:
+            dict: The talent and job side arrays as returned by extract_talent_batch and extract_job_batch.
+        """
+        if len(talents) != len(jobs):
+            raise ValueError(f"Got {len(talents)} talents but {len(jobs)} jobs, expected aligned lists.")
+        return {"talent_info": self.extract_talent_batch(talents), "job_info": self.extract_job_batch(jobs)}
+
+    def extract_talent_batch(self, talents: list[dict]) -> dict:
+        """
+        This method extracts the talent side features of many talents into NumPy arrays.
+
+        Args:
+            talents: List of dicts representing talents with relevant attributes.
+
+        Returns:
+            dict: A dict with the keys
+                - role_mask: (n, words) uint64 bitmask of the roles, bit i stands for role i of the job_role_universe
+                - languages: (n, len(job_language_universe)) matrix of language rating ranks, 0 if not spoken
+                - maturity: dict of (n,) float arrays keyed like the maturity dict of extract_features
+        """
+        role_mask = self._extract_role_masks(talents)
+        languages = np.zeros((len(talents), len(self.job_language_universe)), dtype=self.language_rank_dtype)
+        degree_ranks = np.empty(len(talents))
+        seniority_ranks = np.empty(len(talents))
+        salaries = np.empty(len(talents))
+        for row, talent in enumerate(talents):
+            for language in talent["languages"]:
+                self._set_language_rank(languages, row, language)
+            degree_ranks[row] = self._as_float(self._extract_degree(talent, "degree"))
+            seniority_ranks[row] = self._as_float(self._extract_seniority(talent, multiple=False))
+            salaries[row] = self._as_float(self._extract_salary(talent, key="salary_expectation"))
+
+        return {
+            "role_mask": role_mask,
+            "languages": languages,
+            "maturity": {
+                "degree_rank_TALENT": degree_ranks,
+                "seniority_rank_TALENT": seniority_ranks,
+                "salary_TALENT": salaries,
+            },
+        }
+
+    def extract_job_batch(self, jobs: list[dict]) -> dict:
+        """
+        This method extracts the job side features of many jobs into NumPy arrays.
+
+        Args:
+            jobs: List of dicts representing jobs with relevant attributes.
+
+        Returns:
+            dict: A dict with the keys
+                - role_mask: (m, words) uint64 bitmask of the roles, bit i stands for role i of the job_role_universe
+                - languages_must_have: (m, len(job_language_universe)) matrix of must-have rating ranks
+                - languages_should_have: (m, len(job_language_universe)) matrix of should-have rating ranks
+                - maturity: dict of (m,) float arrays keyed like the maturity dict of extract_features
+        """
+        role_mask = self._extract_role_masks(jobs)
+        languages_must_have = np.zeros((len(jobs), len(self.job_language_universe)), dtype=self.language_rank_dtype)
+        languages_should_have = np.zeros((len(jobs), len(self.job_language_universe)), dtype=self.language_rank_dtype)
+        degree_ranks = np.empty(len(jobs))
+        seniority_ranks = np.empty(len(jobs))
+        salaries = np.empty(len(jobs))
+        for row, job in enumerate(jobs):
+            for language in job["languages"]:
+                must_have = language.get("must_have")
+                if must_have is None:
+                    continue
+                self._set_language_rank(languages_must_have if must_have else languages_should_have, row, language)
+            degree_ranks[row] = self._as_float(self._extract_degree(job, "min_degree"))
+            seniority_ranks[row] = self._mean_seniority_rank(job["seniorities"])
+            salaries[row] = self._as_float(self._extract_salary(job, key="max_salary"))
+
+        return {
+            "role_mask": role_mask,
+            "languages_must_have": languages_must_have,
+            "languages_should_have": languages_should_have,
+            "maturity": {
+                "degree_rank_JOB": degree_ranks,
+                "seniority_rank_JOB": seniority_ranks,
+                "salary_JOB": salaries,
+            },
+        }
+
+    @staticmethod
+    def select_rows(side_data: dict, rows) -> dict:
+        """
+        Selects the given rows (index array or slice) from the talent or job side arrays of a batch extraction.
+        """
+        return {
+            key: FeatureExtractor.select_rows(values, rows) if isinstance(values, dict) else values[rows]
+            for key, values in side_data.items()
+        }
+
+    @staticmethod
+    def flatten_side_data(side_data: dict, prefix: str = "") -> dict:
+        """
+        Flattens the nested talent or job side arrays of a batch extraction into one array per dotted name, e.g.
+        "maturity.salary_TALENT", for storing every array in a file of its own. See unflatten_side_data.
+        """
+        flat = {}
+        for key, values in side_data.items():
+            if isinstance(values, dict):
+                flat.update(FeatureExtractor.flatten_side_data(values, prefix=f"{prefix}{key}."))
+            else:
+                flat[f"{prefix}{key}"] = values
+        return flat
+
+    @staticmethod
+    def unflatten_side_data(flat: dict) -> dict:
+        """
+        Restores the nested side arrays from the output of flatten_side_data.
+        """
+        side_data = {}
+        for name, values in flat.items():
+            *parents, key = name.split(".")
+            target = side_data
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[key] = values
+        return side_data
+
+    @staticmethod
+    def row_bytes(side_data: dict) -> np.ndarray:
+        """
+        Flattens the talent or job side arrays of a batch extraction into one row of bytes per profile, in a fixed key
+        order, so profiles with equal bytes have equal features.
+        """
+        columns = []
+        for key in sorted(side_data):
+            values = side_data[key]
+            if isinstance(values, dict):
+                columns.append(FeatureExtractor.row_bytes(values))
+                continue
+            values = np.ascontiguousarray(values.reshape(len(values), -1))
+            if values.dtype.kind == "f":
+                # adding 0.0 turns -0.0 into 0.0, so equal values have equal bytes
+                values = values.astype(np.float64) + 0.0
+            columns.append(values.view(np.uint8).reshape(len(values), -1))
+        return np.concatenate(columns, axis=1)
+
+    @staticmethod
+    def unique_rows(side_data: dict) -> (np.ndarray, np.ndarray):
+        """
+        Groups the profiles of talent or job side arrays by their extracted features, i.e. by their row bytes.
+
+        Returns:
+            Tuple
+                np.ndarray: The row of one profile per distinct feature signature.
+                np.ndarray: Per profile the position of its signature within the first array.
+        """
+        rows = FeatureExtractor.row_bytes(side_data)
+        signatures = np.ascontiguousarray(rows).view(np.dtype((np.void, rows.shape[1]))).ravel()
+        _, unique_rows, inverse = np.unique(signatures, return_index=True, return_inverse=True)
+        return unique_rows, inverse.ravel()
+
+    def _extract_role_masks(self, profiles: list[dict]) -> np.ndarray:
+        return pack_indices(
+            (
+                [self.role_index[role] for role in profile["job_roles"] if role in self.role_index]
+                for profile in profiles
+            ),
+            len(self.job_role_universe),
+        )
+
+    def _set_language_rank(self, languages: np.ndarray, row: int, language: dict) -> None:
+        """
+        Writes the rating rank of a single language entry into the given matrix. Languages outside the
+        job_language_universe and ratings without a rank are skipped, mirroring _extract_languages.
+        """
+        column = self.language_index.get(language.get("title"))
+        rating_rank = self.compiled_config.rank("rating", language.get("rating"))
+        if column is not None and rating_rank is not None:
+            languages[row, column] = rating_rank
+
+    def _mean_seniority_rank(self, seniorities: list) -> float:
+        seniority_ranks = (self.compiled_config.rank("seniority", seniority) for seniority in seniorities)
+        ranks = [rank for rank in seniority_ranks if rank is not None]
+        return sum(ranks) / len(ranks) if ranks else np.nan
+
+    @staticmethod
+    def _as_float(value) -> float:
+        return np.nan if value is None else value
+
     def _extract_talent_info(self, talent_data: dict) -> dict:
         pdf_roles = self._extract_roles(talent_data)
         pdf_languages = self._extract_languages(talent_data)
@@ -62,26 +257,23 @@ class FeatureExtractor:
     def _extract_languages(self, data: dict) -> pd.DataFrame:
         languages = data["languages"]
         pdf_languages = pd.DataFrame(languages)
-        pdf_languages = pdf_languages.merge(self.pdf_language_rating_rank_mapping, on="rating", how="inner")
-        return pdf_languages
+        pdf_languages["rating_rank"] = pdf_languages["rating"].map(self.compiled_config.ranks_by_name("rating"))
+        return pdf_languages.dropna(subset=["rating_rank"]).reset_index(drop=True)
 
     def _extract_roles(self, data):
-        job_roles = data["job_roles"]
+        job_roles = [role for role in data["job_roles"] if role in self.role_index]
         pdf_job_roles = pd.DataFrame(job_roles, columns=["job_role"])
-        pdf_job_roles = pdf_job_roles[pdf_job_roles["job_role"].isin(self.job_role_universe)]
         pdf_job_roles["indicator"] = 1
         return pdf_job_roles
 
     def _extract_degree(self, data, key) -> float:
-        return self.degree_rank_mapping.get(data[key])
+        return self.compiled_config.rank("degree", data[key])
 
     def _extract_seniority(self, data: dict, multiple: bool = True) -> float:
         if multiple:
-            pdf_seniorities = pd.DataFrame(data["seniorities"], columns=["seniority"])
-            pdf_job_seniorities = pdf_seniorities.merge(self.pdf_seniority_rank_mapping, on="seniority", how="inner")
-            seniority_rank = pdf_job_seniorities["seniority_rank"].mean()
+            seniority_rank = self._mean_seniority_rank(data["seniorities"])
         else:
-            seniority_rank = self.seniority_rank_mapping.get(data["seniority"])
+            seniority_rank = self.compiled_config.rank("seniority", data["seniority"])
 
         return seniority_rank
 
@@ -0,0 +1,234 @@
+"""
+Module for persisting extracted talent and job features in memory-mapped arrays.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from src.feature_extraction import FeatureExtractor
+
+if TYPE_CHECKING:
+    from pyhocon import ConfigTree
+
+logger = logging.getLogger(__name__)
+
+STORE_FORMAT_VERSION = 3
+KEY_DTYPE = np.dtype("S16")
+RELEVANT_CONFIG_KEYS = [
+    "job_role_universe",
+    "job_language_universe",
+    "seniority_rank_mapping",
+    "degree_rank_mapping",
+    "language_rating_rank_mapping",
+]
+
+
+class FeatureStore:
+    def __init__(self, path: str, config: ConfigTree, feature_extractor: FeatureExtractor, kind: str) -> None:
+        """
+        Initialize a new instance of the FeatureStore class, which caches the output of
+        FeatureExtractor.extract_talent_batch or extract_job_batch on disk.
+
+        Every profile is keyed by a 16 byte BLAKE2b hash of its canonical JSON, keyed with a hash of the config
+        entries the extraction depends on. Each field of the extracted side arrays is kept in its own .npy file that
+        is opened memory-mapped, so a new process can use a large catalogue without re-extracting it. Profiles that
+        are not in the store yet (new or changed) are extracted and appended. Entries of profiles that changed are
+        not removed. The store assumes a single writing process.
+
+        The keys are persisted in sorted order together with the row of every key, so a lookup is a binary search on
+        the memory-mapped keys and new keys are merged into them, without sorting or rewriting the whole index.
+
+        Parameters:
+        - path (str): Directory of the store. It is created if it does not exist.
+        - config (ConfigTree): The configuration settings
+        - feature_extractor (FeatureExtractor): An instance of the FeatureExtractor class for extracting features.
+        - kind (str): "talent" or "job".
+
+        Returns:
+        - None
+        """
+        if kind not in ("talent", "job"):
+            raise ValueError(f"kind must be 'talent' or 'job', got {kind!r}")
+        self.path = Path(path)
+        self.kind = kind
+        self.feature_extractor = feature_extractor
+        self._extract = (
+            feature_extractor.extract_talent_batch if kind == "talent" else feature_extractor.extract_job_batch
+        )
+        self.config_hash = self._config_hash(config, kind)
+        self._template = self.feature_extractor.flatten_side_data(self._extract([]))
+        self.count = 0
+        self.capacity = 0
+        self._arrays = {}
+        self._sorted_keys = np.empty(0, dtype=KEY_DTYPE)
+        self._sorted_rows = np.empty(0, dtype=np.int64)
+        self._open()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def get_batch(self, profiles: list[dict]) -> dict:
+        """
+        This method returns the extracted side arrays of the given profiles, extracting only the profiles that are
+        not in the store yet.
+
+        Args:
+            profiles: List of dicts representing talents or jobs, depending on the kind of the store.
+
+        Returns:
+            dict: The side arrays in the layout of FeatureExtractor.extract_talent_batch or extract_job_batch.
+        """
+        keys = self.keys(profiles)
+        rows = self.lookup(keys)
+        missing = np.flatnonzero(rows < 0)
+        if len(missing):
+            missing_keys, first_idx, inverse = np.unique(keys[missing], return_index=True, return_inverse=True)
+            # append new profiles in the order of their first occurrence rather than in hash order
+            appearance_order = np.argsort(first_idx)
+            appearance_rank = np.empty_like(appearance_order)
+            appearance_rank[appearance_order] = np.arange(len(appearance_order))
+            missing_keys, first_idx, inverse = (
+                missing_keys[appearance_order],
+                first_idx[appearance_order],
+                appearance_rank[inverse.ravel()],
+            )
+            new_profiles = [profiles[idx] for idx in missing[first_idx]]
+            logger.info(f"Extracting {len(new_profiles)} {self.kind} profiles missing in the feature store")
+            new_rows = self._append(missing_keys, self._extract(new_profiles))
+            rows[missing] = new_rows[inverse]
+        return self.feature_extractor.select_rows(self.side_data(), rows)
+
+    def side_data(self) -> dict:
+        """
+        Returns:
+            dict: Memory-mapped side arrays of all profiles in the store, in insertion order.
+        """
+        return self.feature_extractor.unflatten_side_data(
+            {name: array[: self.count] for name, array in self._arrays.items()}
+        )
+
+    def keys(self, profiles: list[dict]) -> np.ndarray:
+        key = bytes.fromhex(self.config_hash)
+        return np.array(
+            [
+                hashlib.blake2b(
+                    json.dumps(profile, sort_keys=True, separators=(",", ":")).encode(), digest_size=16, key=key
+                ).digest()
+                for profile in profiles
+            ],
+            dtype=KEY_DTYPE,
+        )
+
+    def lookup(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: The row of every key within the store, or -1 for keys that are not stored.
+        """
+        rows = np.full(len(keys), -1, dtype=np.int64)
+        if not self.count or not len(keys):
+            return rows
+        sorted_keys = self._sorted_keys[: self.count]
+        positions = np.minimum(np.searchsorted(sorted_keys, keys), self.count - 1)
+        found = sorted_keys[positions] == keys
+        rows[found] = self._sorted_rows[positions[found]]
+        return rows
+
+    def _open(self) -> None:
+        meta_path = self.path / "meta.json"
+        if meta_path.exists():
+            with open(meta_path, "r") as file:
+                meta = json.load(file)
+            if meta["version"] == STORE_FORMAT_VERSION and meta["config_hash"] == self.config_hash:
+                self.count, self.capacity = meta["count"], meta["capacity"]
+                self._load_arrays()
+                return
+            logger.info(f"Config or format of the feature store at {self.path} changed, starting an empty store")
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._grow(1024)
+        self._write_meta()
+
+    def _append(self, keys: np.ndarray, side_data: dict) -> np.ndarray:
+        """
+        Appends the rows of keys that are not stored yet and merges the keys into the sorted keys. Only the part of
+        the sorted keys and rows behind the first inserted key is rewritten.
+        """
+        start, stop = self.count, self.count + len(keys)
+        if stop > self.capacity:
+            self._grow(max(stop, 2 * self.capacity))
+        for name, values in self.feature_extractor.flatten_side_data(side_data).items():
+            self._arrays[name][start:stop] = values
+            self._arrays[name].flush()
+
+        order = np.argsort(keys)
+        new_keys, new_rows = keys[order], np.arange(start, stop)[order]
+        positions = np.searchsorted(self._sorted_keys[: self.count], new_keys)
+        first = int(positions[0])
+        merged_keys = np.insert(self._sorted_keys[first : self.count], positions - first, new_keys)
+        merged_rows = np.insert(self._sorted_rows[first : self.count], positions - first, new_rows)
+        self._sorted_keys[first:stop] = merged_keys
+        self._sorted_rows[first:stop] = merged_rows
+        self._sorted_keys.flush()
+        self._sorted_rows.flush()
+        self.count = stop
+        self._write_meta()
+        return np.arange(start, stop)
+
+    def _grow(self, capacity: int) -> None:
+        """
+        Reallocates the index and field files with the given capacity, copying the rows that are stored so far.
+        """
+        arrays = {
+            "sorted_keys": (self._sorted_keys, KEY_DTYPE, ()),
+            "sorted_rows": (self._sorted_rows, np.dtype(np.int64), ()),
+        }
+        for name, template in self._template.items():
+            arrays[name] = (self._arrays.get(name), template.dtype, template.shape[1:])
+
+        for name, (old_array, dtype, tail_shape) in arrays.items():
+            target = self._array_path(name)
+            tmp_path = target.with_suffix(".tmp.npy")
+            new_array = open_memmap(tmp_path, mode="w+", dtype=dtype, shape=(capacity,) + tail_shape)
+            if old_array is not None and self.count:
+                new_array[: self.count] = old_array[: self.count]
+            new_array.flush()
+            del new_array
+            os.replace(tmp_path, target)
+
+        self.capacity = capacity
+        self._load_arrays()
+
+    def _load_arrays(self) -> None:
+        self._sorted_keys = np.load(self._array_path("sorted_keys"), mmap_mode="r+")
+        self._sorted_rows = np.load(self._array_path("sorted_rows"), mmap_mode="r+")
+        self._arrays = {name: np.load(self._array_path(name), mmap_mode="r+") for name in self._template}
+
+    def _write_meta(self) -> None:
+        meta = {
+            "version": STORE_FORMAT_VERSION,
+            "kind": self.kind,
+            "config_hash": self.config_hash,
+            "count": self.count,
+            "capacity": self.capacity,
+        }
+        tmp_path = self.path / "meta.json.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(meta, file)
+        os.replace(tmp_path, self.path / "meta.json")
+
+    def _array_path(self, name: str) -> Path:
+        return self.path / f"{name}.npy"
+
+    @staticmethod
+    def _config_hash(config: ConfigTree, kind: str) -> str:
+        relevant_config = {key: config.get(key) for key in RELEVANT_CONFIG_KEYS}
+        payload = json.dumps({"kind": kind, "config": relevant_config}, sort_keys=True).encode()
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
@@ -0,0 +1,235 @@
+"""
+Module for the cheap first-stage scorer of the two-stage retrieval in Search.match_two_stage, and for measuring the
+recall of the two stages against full scoring.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Iterable
+
+import numpy as np
+
+from src.ranking import top_k_per_row
+
+if TYPE_CHECKING:
+    from src.search import Search
+
+logger = logging.getLogger(__name__)
+
+# Scores of the model are clipped to this distance from 0 and 1 before they are turned into log-odds
+_SCORE_EPSILON = 1e-6
+
+
+class AdditiveScorer:
+    def __init__(
+        self,
+        weights: np.ndarray,
+        intercept: float,
+        fill_values: np.ndarray,
+        thresholds: list[np.ndarray],
+        step_values: list[np.ndarray],
+        feature_names: list[str],
+    ) -> None:
+        """
+        Initialize a new instance of the AdditiveScorer class, an additive model over the engineered features that
+        approximates the log-odds of the trained model: a linear term per feature plus a step function per feature
+        with steps at fixed thresholds. It costs one dot product and one binary search per feature and pair instead
+        of one walk through every tree, so it can rank all jobs of a talent and only the best candidates are
+        re-scored by the model.
+
+        Use AdditiveScorer.distill to fit it to a trained model.
+
+        Parameters:
+        - weights (np.ndarray): (n_features,) linear weight per feature.
+        - intercept (float): Intercept of the model.
+        - fill_values (np.ndarray): (n_features,) value a missing (NaN) feature is replaced with.
+        - thresholds (list[np.ndarray]): Per feature the sorted thresholds of its step function.
+        - step_values (list[np.ndarray]): Per feature the value of its step function below the first threshold
+          (always 0), between the thresholds and above the last threshold, i.e. len(thresholds) + 1 values.
+        - feature_names (list[str]): Names of the features in the expected column order.
+
+        Returns:
+        - None
+        """
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.fill_values = np.asarray(fill_values, dtype=np.float64)
+        self.thresholds = [np.asarray(values, dtype=np.float64) for values in thresholds]
+        self.step_values = [np.asarray(values, dtype=np.float64) for values in step_values]
+        self.feature_names = list(feature_names)
+
+    @classmethod
+    def distill(
+        cls,
+        search: Search,
+        talents: list[dict],
+        jobs: list[dict],
+        max_pairs: int = 1_000_000,
+        n_bins: int = 8,
+        l2_penalty: float = 1e-3,
+        seed: int = 42,
+    ) -> "AdditiveScorer":
+        """
+        This method fits the model by ridge regression on the log-odds the model of the search assigns to
+        combinations of the given talents and jobs. The thresholds of the step functions are the quantiles of the
+        features on these combinations.
+
+        Args:
+            search: The search whose model is approximated.
+            talents: Talents whose combinations with the jobs are used as distillation data.
+            jobs: Jobs whose combinations with the talents are used as distillation data.
+            max_pairs: If there are more combinations, a random subset of the talents is used.
+            n_bins: Number of quantile bins per feature, i.e. at most n_bins - 1 thresholds.
+            l2_penalty: Ridge penalty on the weights of the standardized basis.
+            seed: Seed of the talent subset.
+
+        Returns:
+            AdditiveScorer: The fitted scorer.
+        """
+        n_talents = max(1, min(len(talents), max_pairs // max(len(jobs), 1)))
+        rows = np.sort(np.random.default_rng(seed).choice(len(talents), n_talents, replace=False))
+        talent_data = search.feature_extractor.extract_talent_batch([talents[row] for row in rows.tolist()])
+        features = search.feature_engineer.engineer_cross(talent_data, search.feature_extractor.extract_job_batch(jobs))
+        scores = np.clip(search.predict_scores(features), _SCORE_EPSILON, 1 - _SCORE_EPSILON)
+        log_odds = np.log(scores) - np.log1p(-scores)
+
+        fill_values = np.nan_to_num(np.nanmean(features, axis=0))
+        features = np.where(np.isnan(features), fill_values, features)
+        quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+        thresholds = [np.unique(np.quantile(column, quantiles)) for column in features.T]
+        basis = np.column_stack(
+            [features]
+            + [
+                (column[:, None] > column_thresholds).astype(np.float64)
+                for column, column_thresholds in zip(features.T, thresholds)
+            ]
+        )
+        mean, scale = basis.mean(axis=0), basis.std(axis=0)
+        scale[scale == 0] = 1.0
+        standardized = (basis - mean) / scale
+        gram = standardized.T @ standardized + l2_penalty * len(standardized) * np.eye(standardized.shape[1])
+        coefficients = np.linalg.solve(gram, standardized.T @ (log_odds - log_odds.mean())) / scale
+        intercept = log_odds.mean() - mean @ coefficients
+
+        n_features = features.shape[1]
+        offsets = np.cumsum([n_features] + [len(column_thresholds) for column_thresholds in thresholds])
+        step_values = [
+            np.concatenate([[0.0], np.cumsum(coefficients[start:stop])])
+            for start, stop in zip(offsets[:-1], offsets[1:])
+        ]
+        scorer = cls(
+            coefficients[:n_features],
+            intercept,
+            fill_values,
+            thresholds,
+            step_values,
+            search.feature_engineer.relevant_features,
+        )
+        residual = log_odds - scorer.score(features)
+        r_squared = 1 - np.sum(residual**2) / max(np.sum((log_odds - log_odds.mean()) ** 2), 1e-12)
+        logger.info(
+            f"Distilled additive first-stage scorer from {len(features)} pairs, R^2 of the log-odds {r_squared:.3f}"
+        )
+        return scorer
+
+    def score(self, features: np.ndarray) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: The (n,) approximate log-odds of the (n, n_features) feature matrix. Only the order of the
+            values is meaningful, they are not calibrated.
+        """
+        if np.isnan(features).any():
+            features = np.where(np.isnan(features), self.fill_values, features)
+        scores = features @ self.weights + self.intercept
+        for column, thresholds, step_values in zip(features.T, self.thresholds, self.step_values):
+            # the number of thresholds below a value is the index of its step
+            scores += step_values[np.searchsorted(thresholds, column)]
+        return scores
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            weights=self.weights,
+            intercept=self.intercept,
+            fill_values=self.fill_values,
+            thresholds=np.concatenate(self.thresholds),
+            step_values=np.concatenate(self.step_values),
+            n_thresholds=np.array([len(thresholds) for thresholds in self.thresholds]),
+            feature_names=np.array(self.feature_names),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "AdditiveScorer":
+        with np.load(path) as arrays:
+            splits = np.cumsum(arrays["n_thresholds"])[:-1]
+            return cls(
+                arrays["weights"],
+                float(arrays["intercept"]),
+                arrays["fill_values"],
+                np.split(arrays["thresholds"], splits),
+                np.split(arrays["step_values"], splits + np.arange(1, len(splits) + 1)),
+                arrays["feature_names"].tolist(),
+            )
+
+
+def two_stage_recall(
+    search: Search,
+    first_stage: AdditiveScorer,
+    talents: list[dict],
+    jobs: list[dict],
+    candidate_counts: Iterable[int],
+    top_k: int = 10,
+) -> list[dict]:
+    """
+    This method measures recall@K of the two-stage retrieval: the share of the top_k jobs per talent under full
+    scoring that are also returned by Search.match_two_stage with n_candidates = K, for every K of
+    candidate_counts. A returned job that ties with the k-th best score counts as hit. Since the candidates are
+    re-scored by the model itself, a job is only missed if the first stage does not select it.
+
+    Args:
+        search: The search whose model is the reference.
+        first_stage: The first-stage scorer.
+        talents: Talents of the evaluation sample.
+        jobs: Jobs of the evaluation sample.
+        candidate_counts: The numbers of candidates K per talent to evaluate.
+        top_k: Number of results per talent the recall is measured on.
+
+    Returns:
+        list[dict]: Per K the number of candidates, the share of scored pairs, recall@K and the mean score gap
+        between the full and the two-stage top_k results.
+    """
+    candidate_counts = sorted(set(candidate_counts))
+    top_k = min(top_k, len(jobs))
+    n_hits = np.zeros(len(candidate_counts))
+    score_gaps = np.zeros(len(candidate_counts))
+    talent_data = search.feature_extractor.extract_talent_batch(talents)
+    job_data = search.feature_extractor.extract_job_batch(jobs)
+    talents_per_block = max(1, search.bulk_pair_chunk_size // max(len(jobs), 1))
+    for start in range(0, len(talents), talents_per_block):
+        block_data = search.feature_extractor.select_rows(talent_data, slice(start, start + talents_per_block))
+        features = search.feature_engineer.engineer_cross(block_data, job_data)
+        full_scores = search.predict_scores(features).reshape(-1, len(jobs))
+        first_stage_scores = first_stage.score(features).reshape(-1, len(jobs))
+        reference_scores = np.take_along_axis(full_scores, top_k_per_row(full_scores, top_k), axis=1)
+        for idx, n_candidates in enumerate(candidate_counts):
+            candidates = top_k_per_row(first_stage_scores, n_candidates)
+            reranked_scores = np.full_like(full_scores, -np.inf)
+            np.put_along_axis(reranked_scores, candidates, np.take_along_axis(full_scores, candidates, axis=1), axis=1)
+            retrieved_scores = np.take_along_axis(reranked_scores, top_k_per_row(reranked_scores, top_k), axis=1)
+            # a retrieved job is a hit if it scores at least as high as the k-th best job, so ties are not misses
+            n_hits[idx] += np.count_nonzero(retrieved_scores >= reference_scores[:, -1:])
+            score_gaps[idx] += np.sum(reference_scores - np.where(np.isfinite(retrieved_scores), retrieved_scores, 0.0))
+
+    report = []
+    n_results = max(len(talents) * top_k, 1)
+    for idx, n_candidates in enumerate(candidate_counts):
+        entry = {
+            "n_candidates": n_candidates,
+            "scored_share": min(n_candidates, len(jobs)) / len(jobs),
+            f"recall@{top_k}": float(n_hits[idx] / n_results),
+            "mean_score_gap": float(score_gaps[idx] / n_results),
+        }
+        logger.info(f"Two-stage recall: {entry}")
+        report.append(entry)
+    return report
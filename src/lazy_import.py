@@ -0,0 +1,37 @@
+"""
+Module for deferring the import of heavy dependencies until they are used for the first time.
+"""
+
+import importlib
+from types import ModuleType
+from typing import Callable, Optional
+
+
+class LazyModule:
+    def __init__(self, name: str, on_import: Optional[Callable[[ModuleType], None]] = None) -> None:
+        """
+        Initialize a new instance of the LazyModule class, a stand-in for a module that is imported on the first
+        attribute access, e.g. pd = LazyModule("pandas") followed by pd.DataFrame(...).
+
+        Parameters:
+        - name (str): Name of the module to import.
+        - on_import (Callable): Called once with the module right after it has been imported, e.g. to set options.
+
+        Returns:
+        - None
+        """
+        self._name = name
+        self._on_import = on_import
+        self._module = None
+
+    def __getattr__(self, attribute: str):
+        if self._module is None:
+            module = importlib.import_module(self._name)
+            if self._on_import is not None:
+                self._on_import(module)
+            self._module = module
+        return getattr(self._module, attribute)
+
+    def __repr__(self) -> str:
+        state = "imported" if self._module is not None else "not imported yet"
+        return f"<LazyModule {self._name!r} ({state})>"
@@ -0,0 +1,238 @@
+"""
+Module for an in-process registry of stage timings, counters and gauges, exportable as JSON or Prometheus text.
+"""
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from typing import Optional
+
+# Upper bounds in seconds of the latency histogram buckets, the last bucket (+Inf) is implicit
+LATENCY_BUCKETS = (1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _StageStats:
+    __slots__ = ("unit", "count", "seconds", "min_seconds", "max_seconds", "items", "bucket_counts")
+
+    def __init__(self, unit: str) -> None:
+        self.unit = unit
+        self.count = 0
+        self.seconds = 0.0
+        self.min_seconds = float("inf")
+        self.max_seconds = 0.0
+        self.items = 0
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def to_dict(self) -> dict:
+        cumulative_counts, total = [], 0
+        for bucket_count in self.bucket_counts:
+            total += bucket_count
+            cumulative_counts.append(total)
+        return {
+            "count": self.count,
+            "seconds": self.seconds,
+            "mean_seconds": self.seconds / self.count if self.count else 0.0,
+            "min_seconds": self.min_seconds if self.count else 0.0,
+            "max_seconds": self.max_seconds,
+            "unit": self.unit,
+            "items": self.items,
+            f"{self.unit}_per_second": self.items / self.seconds if self.seconds > 0 else 0.0,
+            "histogram": {str(bound): n for bound, n in zip(LATENCY_BUCKETS + ("+Inf",), cumulative_counts)},
+        }
+
+
+class StageTimer:
+    """
+    Context manager returned by MetricsRegistry.timer. The number of processed items can be set on the timer within
+    the block when it is not known upfront.
+    """
+
+    __slots__ = ("registry", "name", "unit", "items", "start")
+
+    def __init__(self, registry: "MetricsRegistry", name: str, items: int, unit: str) -> None:
+        self.registry = registry
+        self.name = name
+        self.unit = unit
+        self.items = items
+        self.start = None
+
+    def __enter__(self) -> "StageTimer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.registry.observe(self.name, time.perf_counter() - self.start, self.items, self.unit)
+
+
+class _NullTimer:
+    """
+    Shared no-op timer handed out by a disabled registry.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def __setattr__(self, name: str, value) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = True, namespace: str = "search_and_ranking") -> None:
+        """
+        Initialize a new instance of the MetricsRegistry class.
+
+        Stages are timed with the timer context manager, which records a latency histogram, the total time and the
+        number of processed items (pairs or rows) per stage. Counters and gauges hold further numbers such as the
+        number of pruned pairs or the accuracy of a training run. A disabled registry records nothing and its timer
+        returns a shared no-op object, so instrumented code only pays for a method call per stage.
+
+        Parameters:
+        - enabled (bool): Whether anything is recorded.
+        - namespace (str): Prefix of the metric names in the Prometheus text format.
+
+        Returns:
+        - None
+        """
+        self.enabled = enabled
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._counters = {}
+        self._gauges = {}
+
+    def __getstate__(self) -> dict:
+        # the lock cannot be pickled, e.g. when the search is handed to spawned ParallelSearch workers
+        with self._lock:
+            state = {name: value.copy() if isinstance(value, dict) else value for name, value in self.__dict__.items()}
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def timer(self, name: str, items: int = 0, unit: str = "rows"):
+        """
+        Args:
+            name: Name of the stage, e.g. "search.predict".
+            items: Number of items processed by the stage. Can also be set on the returned timer within the block.
+            unit: Unit of the items, e.g. "rows" or "pairs".
+
+        Returns:
+            A context manager that times its block as one observation of the stage.
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return StageTimer(self, name, items, unit)
+
+    def observe(self, name: str, seconds: float, items: int = 0, unit: str = "rows") -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._stages.get(name)
+            if stats is None:
+                stats = self._stages[name] = _StageStats(unit)
+            stats.count += 1
+            stats.seconds += seconds
+            stats.min_seconds = min(stats.min_seconds, seconds)
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.items += items
+            stats.bucket_counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def increment(self, name: str, value: float = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[name] = value
+
+    def merge(self, other: "MetricsRegistry") -> None:
+        """
+        This method adds the stage timings and counters of another registry, e.g. of a worker process, to this one.
+        Gauges are overwritten by the ones of the other registry.
+        """
+        if not self.enabled:
+            return
+        other_state = other.__getstate__()
+        with self._lock:
+            for name, other_stats in other_state["_stages"].items():
+                stats = self._stages.get(name)
+                if stats is None:
+                    stats = self._stages[name] = _StageStats(other_stats.unit)
+                stats.count += other_stats.count
+                stats.seconds += other_stats.seconds
+                stats.min_seconds = min(stats.min_seconds, other_stats.min_seconds)
+                stats.max_seconds = max(stats.max_seconds, other_stats.max_seconds)
+                stats.items += other_stats.items
+                stats.bucket_counts = [a + b for a, b in zip(stats.bucket_counts, other_stats.bucket_counts)]
+            for name, value in other_state["_counters"].items():
+                self._counters[name] = self._counters.get(name, 0) + value
+            self._gauges.update(other_state["_gauges"])
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "stages": {name: stats.to_dict() for name, stats in sorted(self._stages.items())},
+                "counters": dict(sorted(self._counters.items())),
+                "gauges": dict(sorted(self._gauges.items())),
+            }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self) -> str:
+        """
+        Returns:
+            str: The metrics in the Prometheus text exposition format. Stages are exported as the histogram
+            <namespace>_stage_duration_seconds and the counter <namespace>_stage_items_total, labeled by stage.
+        """
+        snapshot = self.to_dict()
+        prefix = self.namespace
+        lines = [
+            f"# HELP {prefix}_stage_duration_seconds Duration of the instrumented stages.",
+            f"# TYPE {prefix}_stage_duration_seconds histogram",
+        ]
+        for name, stats in snapshot["stages"].items():
+            for bound, cumulative_count in stats["histogram"].items():
+                lines.append(
+                    f'{prefix}_stage_duration_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative_count}'
+                )
+            lines.append(f'{prefix}_stage_duration_seconds_sum{{stage="{name}"}} {stats["seconds"]}')
+            lines.append(f'{prefix}_stage_duration_seconds_count{{stage="{name}"}} {stats["count"]}')
+        lines += [
+            f"# HELP {prefix}_stage_items_total Items (pairs or rows) processed by the instrumented stages.",
+            f"# TYPE {prefix}_stage_items_total counter",
+        ]
+        for name, stats in snapshot["stages"].items():
+            lines.append(f'{prefix}_stage_items_total{{stage="{name}",unit="{stats["unit"]}"}} {stats["items"]}')
+        for name, value in snapshot["counters"].items():
+            metric = f"{prefix}_{self._sanitize(name)}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        for name, value in snapshot["gauges"].items():
+            metric = f"{prefix}_{self._sanitize(name)}"
+            lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _sanitize(name: str) -> str:
+        return "".join(char if char.isalnum() or char == "_" else "_" for char in name)
@@ -0,0 +1,131 @@
+"""
+Module for bulk matching of talents and jobs on a pool of worker processes.
+"""
+
+import logging
+import multiprocessing
+import os
+from typing import Optional, Union
+
+from src.metrics import MetricsRegistry
+from src.ranking import TopKAccumulator
+from src.results import MatchResults
+from src.search import Search
+
+logger = logging.getLogger(__name__)
+
+# State shared with the worker processes once per pool, see ParallelSearch.match_bulk
+_worker_state = {}
+
+
+def _init_worker(
+    search: Search,
+    job_data: dict,
+    n_talents: int,
+    top_k: Optional[int],
+    group_by: Optional[str],
+    min_score: Optional[float],
+):
+    _worker_state.update(
+        search=search, job_data=job_data, n_talents=n_talents, top_k=top_k, group_by=group_by, min_score=min_score
+    )
+
+
+def _score_shard(task: tuple[int, list[dict]]) -> tuple[TopKAccumulator, MetricsRegistry]:
+    talent_start, talents = task
+    search, job_data = _worker_state["search"], _worker_state["job_data"]
+    # only the metrics of this shard are sent back, the parent adds them to its registry
+    search.metrics.reset()
+    accumulator = TopKAccumulator(
+        _worker_state["n_talents"],
+        len(job_data["role_mask"]),
+        top_k=_worker_state["top_k"],
+        group_by=_worker_state["group_by"],
+    )
+    talent_data = search.feature_extractor.extract_talent_batch(talents)
+    for block_start, scores in search.iter_extracted_score_blocks(talent_data, job_data, _worker_state["min_score"]):
+        accumulator.add(talent_start + block_start, scores)
+    return accumulator, search.metrics
+
+
+class ParallelSearch:
+    def __init__(
+        self,
+        search: Search,
+        n_workers: Optional[int] = None,
+        talents_per_task: Optional[int] = None,
+        min_pairs: Optional[int] = None,
+        start_method: Optional[str] = None,
+    ):
+        """
+        Initialize a new instance of the ParallelSearch class, which shards the talents of match_bulk across a
+        process pool.
+
+        Workloads of fewer than min_pairs (talent, job) pairs are scored in this process, since the start-up and
+        transfer overhead of the pool outweighs its speedup for them, see src/benchmarks/parallel_search_benchmark.py.
+
+        Parameters:
+        - search (Search): The search used by every worker.
+        - n_workers (int): Number of worker processes. Defaults to parallel_search.n_workers of the config or, if that
+          is null, to the number of CPUs.
+        - talents_per_task (int): Number of talents per shard. Defaults to parallel_search.talents_per_task.
+        - min_pairs (int): Workloads of fewer (talent, job) pairs are scored in this process by the search.
+          Defaults to parallel_search.min_pairs or, if it is not set, to 100,000.
+        - start_method (str): Start method of the worker processes, e.g. "spawn". Defaults to "fork" where it is
+          available and to the platform default otherwise.
+
+        Returns:
+        - None
+        """
+        self.search = search
+        config = self.search.config
+        self.n_workers = n_workers or config.get("parallel_search.n_workers", None) or os.cpu_count()
+        self.talents_per_task = talents_per_task or config.get("parallel_search.talents_per_task", 1000)
+        self.min_pairs = min_pairs if min_pairs is not None else config.get("parallel_search.min_pairs", 100_000)
+        if start_method is None and "fork" in multiprocessing.get_all_start_methods():
+            start_method = "fork"
+        self.start_method = start_method
+
+    def match_bulk(
+        self,
+        talents: list[dict],
+        jobs: list[dict],
+        top_k: Optional[int] = None,
+        group_by: Optional[str] = None,
+        columnar: bool = False,
+        min_score: Optional[float] = None,
+    ) -> Union[list, MatchResults]:
+        """
+        Parallel counterpart of Search.match_bulk with the same arguments and results.
+
+        The jobs are extracted once in the parent process. The search (including the model) and the job features are
+        handed to every worker once when the pool starts: with the fork start method they are inherited without
+        pickling, otherwise they are pickled once per worker instead of once per task. Every task then only carries
+        its shard of talents and returns a top-k accumulator, which are merged by pair id and hence deterministically,
+        and the metrics recorded for the shard, which are added to the metrics of the search.
+        """
+        accumulator = TopKAccumulator(len(talents), len(jobs), top_k=top_k, group_by=group_by)
+        if not talents or not jobs:
+            return self.search.accumulated_results(talents, jobs, accumulator, columnar)
+
+        if len(talents) * len(jobs) < self.min_pairs:
+            return self.search.match_bulk(talents, jobs, top_k, group_by, columnar, min_score)
+
+        job_data = self.search.extract_jobs(jobs)
+        tasks = [
+            (start, talents[start : start + self.talents_per_task])
+            for start in range(0, len(talents), self.talents_per_task)
+        ]
+        context = multiprocessing.get_context(self.start_method)
+        n_workers = min(self.n_workers, len(tasks))
+        logger.info(f"Scoring {len(talents)} talents x {len(jobs)} jobs in {len(tasks)} shards on {n_workers} workers")
+        with context.Pool(
+            n_workers,
+            initializer=_init_worker,
+            initargs=(self.search, job_data, len(talents), top_k, group_by, min_score),
+        ) as pool:
+            for shard_accumulator, shard_metrics in pool.imap(_score_shard, tasks):
+                accumulator.merge(shard_accumulator)
+                self.search.metrics.merge(shard_metrics)
+
+        return self.search.accumulated_results(talents, jobs, accumulator, columnar)
@@ -0,0 +1,270 @@
+"""
+Module for incrementally updatable indexes of extracted job or talent features, searchable against single profiles.
+"""
+
+import logging
+from typing import Hashable, Iterable, Optional
+
+import numpy as np
+
+from src.ranking import top_k_per_row
+from src.search import Search
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileIndex:
+    def __init__(self, search: Search, kind: str, initial_capacity: Optional[int] = None) -> None:
+        """
+        Initialize a new instance of the ProfileIndex class, the common base of JobIndex and TalentIndex.
+
+        The extracted side arrays of the indexed profiles are kept in preallocated arrays whose capacity is doubled
+        when they run full. An upsert of a new id appends a row, an upsert of a known id overwrites its row, and a
+        delete only marks the row as tombstone, which searches skip. Once the share of tombstones exceeds
+        profile_index.max_tombstone_ratio, the live rows are compacted. All operations are therefore O(1) amortized
+        apart from the feature extraction of the upserted profile.
+
+        Parameters:
+        - search (Search): The search providing the feature extractor and the model.
+        - kind (str): "job" or "talent", the kind of the indexed profiles.
+        - initial_capacity (int): Number of rows allocated upfront. Defaults to profile_index.initial_capacity.
+
+        Returns:
+        - None
+        """
+        if kind not in ("talent", "job"):
+            raise ValueError(f"kind must be 'talent' or 'job', got {kind!r}")
+        self._search = search
+        self.kind = kind
+        config = self._search.config
+        self.max_tombstone_ratio = config.get("profile_index.max_tombstone_ratio", 0.25)
+        self.feature_extractor = self._search.feature_extractor
+        self._extract = (
+            self.feature_extractor.extract_job_batch if kind == "job" else self.feature_extractor.extract_talent_batch
+        )
+        capacity = initial_capacity or config.get("profile_index.initial_capacity", 1024)
+        self._arrays = self._allocate(self._extract([]), capacity)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._ids = [None] * capacity
+        self._profiles = [None] * capacity
+        self._row_of = {}
+        self.n_rows = 0
+        self.n_tombstones = 0
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, profile_id: Hashable) -> bool:
+        return profile_id in self._row_of
+
+    @property
+    def capacity(self) -> int:
+        return len(self._alive)
+
+    def upsert(self, profile_id: Hashable, profile: dict) -> None:
+        """
+        Inserts a profile or replaces the profile stored under the given id.
+        """
+        self.upsert_many([(profile_id, profile)])
+
+    def upsert_many(self, items: Iterable[tuple[Hashable, dict]]) -> None:
+        """
+        Batch counterpart of upsert, extracting all profiles with a single call.
+
+        Args:
+            items: Pairs of id and profile. If an id occurs more than once, the last profile wins.
+        """
+        items = dict(items)
+        if not items:
+            return
+        side_data = self._extract(list(items.values()))
+        rows = np.empty(len(items), dtype=np.int64)
+        for idx, profile_id in enumerate(items):
+            row = self._row_of.get(profile_id)
+            if row is None:
+                if self.n_rows == self.capacity:
+                    self._grow(2 * self.capacity)
+                row = self.n_rows
+                self.n_rows += 1
+                self._row_of[profile_id] = row
+                self._ids[row] = profile_id
+                self._alive[row] = True
+            self._profiles[row] = items[profile_id]
+            rows[idx] = row
+        self._assign(self._arrays, rows, side_data)
+
+    def delete(self, profile_id: Hashable) -> None:
+        """
+        Removes the profile with the given id. Raises a KeyError if the id is not indexed.
+        """
+        row = self._row_of.pop(profile_id)
+        self._alive[row] = False
+        self._ids[row] = None
+        self._profiles[row] = None
+        self.n_tombstones += 1
+        if self.n_tombstones > self.max_tombstone_ratio * self.n_rows:
+            self.compact()
+
+    def get(self, profile_id: Hashable) -> dict:
+        return self._profiles[self._row_of[profile_id]]
+
+    def compact(self) -> None:
+        """
+        Moves the live rows to the front of the arrays, in their current order, and drops the tombstones.
+        """
+        live_rows = np.flatnonzero(self._alive[: self.n_rows])
+        self._assign(
+            self._arrays, slice(0, len(live_rows)), self.feature_extractor.select_rows(self._arrays, live_rows)
+        )
+        self._ids[: len(live_rows)] = [self._ids[row] for row in live_rows]
+        self._profiles[: len(live_rows)] = [self._profiles[row] for row in live_rows]
+        self._ids[len(live_rows) : self.n_rows] = [None] * (self.n_rows - len(live_rows))
+        self._profiles[len(live_rows) : self.n_rows] = [None] * (self.n_rows - len(live_rows))
+        self._alive[: self.n_rows] = False
+        self._alive[: len(live_rows)] = True
+        logger.debug(f"Compacted {self.kind} index from {self.n_rows} to {len(live_rows)} rows")
+        self.n_rows = len(live_rows)
+        self.n_tombstones = 0
+        self._row_of = {profile_id: row for row, profile_id in enumerate(self._ids[: self.n_rows])}
+
+    def side_data(self) -> dict:
+        """
+        Returns:
+            dict: Views of the extracted side arrays of all rows, including tombstones, see alive.
+        """
+        return self.feature_extractor.select_rows(self._arrays, slice(0, self.n_rows))
+
+    @property
+    def alive(self) -> np.ndarray:
+        return self._alive[: self.n_rows]
+
+    def _live_rows(self, k: Optional[int]) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: The rows that are not tombstones, empty if no result is requested.
+        """
+        if k is not None and k < 0:
+            raise ValueError(f"k must be a non-negative integer or None, got {k}")
+        if k == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(self.alive)
+
+    def _top_k(self, live_rows: np.ndarray, scores: np.ndarray, k: Optional[int]) -> list[tuple[Hashable, dict, float]]:
+        """
+        Returns:
+            list: Id, profile and score of the best k of the live rows, given their scores.
+        """
+        positions = top_k_per_row(scores[None, :], min(k, len(live_rows)) if k is not None else len(live_rows))[0]
+        return [
+            (self._ids[row], self._profiles[row], score)
+            for row, score in zip(live_rows[positions].tolist(), scores[positions])
+        ]
+
+    def _grow(self, capacity: int) -> None:
+        arrays = self._allocate(self._arrays, capacity)
+        self._assign(arrays, slice(0, self.n_rows), self.side_data())
+        self._arrays = arrays
+        self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+        self._ids.extend([None] * (capacity - len(self._ids)))
+        self._profiles.extend([None] * (capacity - len(self._profiles)))
+
+    @staticmethod
+    def _allocate(template: dict, capacity: int) -> dict:
+        return {
+            key: (
+                ProfileIndex._allocate(values, capacity)
+                if isinstance(values, dict)
+                else np.zeros((capacity,) + values.shape[1:], dtype=values.dtype)
+            )
+            for key, values in template.items()
+        }
+
+    @staticmethod
+    def _assign(arrays: dict, rows, side_data: dict) -> None:
+        for key, values in side_data.items():
+            if isinstance(values, dict):
+                ProfileIndex._assign(arrays[key], rows, values)
+            else:
+                arrays[key][rows] = values
+
+
+class JobIndex(ProfileIndex):
+    def __init__(self, search: Search, initial_capacity: Optional[int] = None) -> None:
+        """
+        Initialize a new instance of the JobIndex class, an updatable index of jobs that talents are searched
+        against. See ProfileIndex.
+
+        Parameters:
+        - search (Search): The search providing the feature extractor and the model.
+        - initial_capacity (int): Number of rows allocated upfront. Defaults to profile_index.initial_capacity.
+
+        Returns:
+        - None
+        """
+        super().__init__(search, kind="job", initial_capacity=initial_capacity)
+
+    def search(self, talent: dict, k: Optional[int] = 10) -> list[dict]:
+        """
+        This method scores the talent against all indexed jobs.
+
+        Args:
+            talent: A dictionary representing a talent with relevant attributes.
+            k: Number of results, at least 0. None returns all jobs.
+
+        Returns:
+            list[dict]: The best k jobs by descending score, each a dict with the job_id, talent, job, predicted
+            label, and score. Ties are broken by the row of the job within the index.
+        """
+        live_rows = self._live_rows(k)
+        if not len(live_rows):
+            return []
+        talent_data = self.feature_extractor.extract_talent_batch([talent])
+        job_data = self.feature_extractor.select_rows(self._arrays, live_rows)
+        scores = np.concatenate(
+            [block.ravel() for _, block in self._search.iter_extracted_score_blocks(talent_data, job_data)]
+        )
+        return [
+            {"job_id": job_id, "talent": talent, "job": job, "label": 0 if score < 0.5 else 1, "score": score}
+            for job_id, job, score in self._top_k(live_rows, scores, k)
+        ]
+
+
+class TalentIndex(ProfileIndex):
+    def __init__(self, search: Search, initial_capacity: Optional[int] = None) -> None:
+        """
+        Initialize a new instance of the TalentIndex class, an updatable index of talents that jobs are searched
+        against. See ProfileIndex.
+
+        Parameters:
+        - search (Search): The search providing the feature extractor and the model.
+        - initial_capacity (int): Number of rows allocated upfront. Defaults to profile_index.initial_capacity.
+
+        Returns:
+        - None
+        """
+        super().__init__(search, kind="talent", initial_capacity=initial_capacity)
+
+    def search(self, job: dict, k: Optional[int] = 10) -> list[dict]:
+        """
+        This method scores all indexed talents against the job.
+
+        Args:
+            job: A dictionary representing a job with relevant attributes.
+            k: Number of results, at least 0. None returns all talents.
+
+        Returns:
+            list[dict]: The best k talents by descending score, each a dict with the talent_id, talent, job,
+            predicted label, and score. Ties are broken by the row of the talent within the index.
+        """
+        live_rows = self._live_rows(k)
+        if not len(live_rows):
+            return []
+        talent_data = self.feature_extractor.select_rows(self._arrays, live_rows)
+        job_data = self.feature_extractor.extract_job_batch([job])
+        scores = np.concatenate(
+            [block.ravel() for _, block in self._search.iter_extracted_score_blocks(talent_data, job_data)]
+        )
+        return [
+            {"talent_id": talent_id, "talent": talent, "job": job, "label": 0 if score < 0.5 else 1, "score": score}
+            for talent_id, talent, score in self._top_k(live_rows, scores, k)
+        ]
@@ -0,0 +1,272 @@
+"""
+Module for profiling the search and training pipelines: the time per function with cProfile, exported as top list and
+as collapsed stacks for flame graphs, and the peak memory per instrumented stage and the allocation hotspots with
+tracemalloc.
+"""
+
+import cProfile
+import json
+import logging
+import pstats
+import sys
+import tracemalloc
+from collections import Counter, defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from src.metrics import MetricsRegistry, StageTimer
+
+logger = logging.getLogger(__name__)
+
+# Allocations of these files are left out of the allocation hotspots
+_IGNORED_ALLOCATION_FILES = ("<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>", "<unknown>")
+
+
+class MemoryTrackingRegistry(MetricsRegistry):
+    def __init__(self, namespace: str = "search_and_ranking") -> None:
+        """
+        Initialize a new instance of the MemoryTrackingRegistry class, an enabled MetricsRegistry that additionally
+        records per stage the peak of the memory traced by tracemalloc above the traced memory at the start of the
+        stage. The peak of a stage includes the stages nested in it. At the end of the stage that reached the highest
+        traced memory of the run so far, a tracemalloc snapshot is taken, which shows the allocations that are alive
+        when that stage ends.
+
+        Memory is only recorded while tracemalloc is tracing. The stages are assumed to run on a single thread.
+
+        Parameters:
+        - namespace (str): Prefix of the metric names in the Prometheus text format.
+
+        Returns:
+        - None
+        """
+        super().__init__(enabled=True, namespace=namespace)
+        self.peak_bytes = {}
+        self.max_traced_bytes = 0
+        self.snapshot = None
+        self.snapshot_stage = None
+        self._snapshot_peak = -1
+        # per open stage the traced memory at its start and its peak so far
+        self._memory_stack = []
+
+    def timer(self, name: str, items: int = 0, unit: str = "rows") -> StageTimer:
+        return _MemoryStageTimer(self, name, items, unit)
+
+    def reset(self) -> None:
+        super().reset()
+        self.peak_bytes = {}
+        self.max_traced_bytes = 0
+        self.snapshot = None
+        self.snapshot_stage = None
+        self._snapshot_peak = -1
+        self._memory_stack = []
+
+    def _enter_stage(self) -> None:
+        if not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        for frame in self._memory_stack:
+            frame[1] = max(frame[1], peak)
+        self.max_traced_bytes = max(self.max_traced_bytes, peak)
+        # the peak is reset per stage, so it was folded into the open stages first
+        tracemalloc.reset_peak()
+        self._memory_stack.append([current, current])
+
+    def _exit_stage(self, name: str) -> None:
+        if not self._memory_stack or not tracemalloc.is_tracing():
+            return
+        _, peak = tracemalloc.get_traced_memory()
+        start, stage_peak = self._memory_stack.pop()
+        stage_peak = max(stage_peak, peak)
+        for frame in self._memory_stack:
+            frame[1] = max(frame[1], stage_peak)
+        self.peak_bytes[name] = max(self.peak_bytes.get(name, 0), stage_peak - start)
+        self.max_traced_bytes = max(self.max_traced_bytes, stage_peak)
+        if stage_peak > self._snapshot_peak:
+            self._snapshot_peak = stage_peak
+            self.snapshot = tracemalloc.take_snapshot()
+            self.snapshot_stage = name
+
+
+class _MemoryStageTimer(StageTimer):
+    __slots__ = ()
+
+    def __enter__(self) -> "_MemoryStageTimer":
+        self.registry._enter_stage()
+        return super().__enter__()
+
+    def __exit__(self, *exc_info) -> None:
+        super().__exit__(*exc_info)
+        self.registry._exit_stage(self.name)
+
+
+class PipelineProfiler:
+    def __init__(self, n_top: int = 25, min_stack_microseconds: int = 10, max_stack_depth: int = 64) -> None:
+        """
+        Initialize a new instance of the PipelineProfiler class.
+
+        A pipeline is run twice, because the tracing of each tool distorts the measurements of the other: once under
+        cProfile for the timings and once under tracemalloc for the memory. Both runs should hence do the same work.
+
+        Parameters:
+        - n_top (int): Number of functions and allocation sites listed in the report.
+        - min_stack_microseconds (int): Call paths with less time are left out of the collapsed stacks.
+        - max_stack_depth (int): Maximum depth of the collapsed stacks, deeper calls are attributed to their ancestor.
+
+        Returns:
+        - None
+        """
+        self.n_top = n_top
+        self.min_stack_microseconds = min_stack_microseconds
+        self.max_stack_depth = max_stack_depth
+        self.stats = None
+        self.report = None
+
+    def run(self, pipeline: Callable[[MetricsRegistry], object]) -> dict:
+        """
+        This method profiles a pipeline.
+
+        Args:
+            pipeline: Runs the pipeline with the given metrics registry, which it has to pass to the Search or Trainer
+                so the stages are recorded.
+
+        Returns:
+            dict: The report with the top functions by cumulative time, the time and peak memory per stage, the
+            peak traced memory and the allocation hotspots.
+        """
+        timing_registry = MetricsRegistry()
+        profiler = cProfile.Profile()
+        profiler.runcall(pipeline, timing_registry)
+        self.stats = pstats.Stats(profiler)
+        # the call that stops the profiler is recorded as well
+        for function in [function for function in self.stats.stats if "_lsprof.Profiler" in function[2]]:
+            del self.stats.stats[function]
+
+        memory_registry = MemoryTrackingRegistry()
+        tracemalloc.start()
+        try:
+            pipeline(memory_registry)
+            # the peak of tracemalloc is reset by every stage, the registry keeps the maximum
+            traced_peak = max(memory_registry.max_traced_bytes, tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+
+        stage_seconds = {name: stage["seconds"] for name, stage in timing_registry.to_dict()["stages"].items()}
+        self.report = {
+            "top_functions": self.top_functions(),
+            "stages": {
+                name: {"seconds": stage_seconds.get(name, 0.0), "peak_bytes": memory_registry.peak_bytes.get(name, 0)}
+                for name in sorted(set(stage_seconds) | set(memory_registry.peak_bytes))
+            },
+            "traced_peak_bytes": traced_peak,
+            "allocation_hotspots": {
+                "stage": memory_registry.snapshot_stage,
+                "allocations": self._allocation_hotspots(memory_registry.snapshot),
+            },
+        }
+        return self.report
+
+    def top_functions(self) -> list[dict]:
+        """
+        Returns:
+            list[dict]: The n_top functions by cumulative time with their number of calls, own and cumulative time.
+        """
+        entries = sorted(self.stats.stats.items(), key=lambda item: item[1][3], reverse=True)[: self.n_top]
+        return [
+            {
+                "function": _label(function),
+                "calls": n_calls,
+                "self_seconds": self_seconds,
+                "cumulative_seconds": cumulative_seconds,
+            }
+            for function, (_, n_calls, self_seconds, cumulative_seconds, _) in entries
+        ]
+
+    def collapsed_stacks(self) -> list[str]:
+        """
+        This method renders the profile in the collapsed stack format of flamegraph.pl, speedscope and similar tools:
+        one line "frame;frame;...;frame microseconds" per call path with the own time of its last frame.
+
+        cProfile only records caller-callee edges, not whole stacks. The stacks are therefore reconstructed by walking
+        the call graph from its roots, and the time of a function that is reached on several paths is split between
+        them in proportion to the time of the edges, which is exact for functions with a single caller. Recursive
+        calls are cut at the first repetition.
+
+        Returns:
+            list[str]: The lines of the collapsed stack file.
+        """
+        entries = self.stats.stats
+        callees = defaultdict(list)
+        for function, (_, _, _, _, callers) in entries.items():
+            for caller, edge in callers.items():
+                callees[caller].append((function, edge[3]))
+        lines = Counter()
+
+        def walk(function: tuple, path: tuple, functions: frozenset, seconds: float) -> None:
+            _, _, self_seconds, cumulative_seconds, _ = entries[function]
+            share = seconds / cumulative_seconds if cumulative_seconds > 0 else 0.0
+            path = path + (_label(function).replace(";", ","),)
+            functions = functions | {function}
+            if len(path) >= self.max_stack_depth:
+                lines[";".join(path)] += round(seconds * 1e6)
+                return
+            lines[";".join(path)] += round(self_seconds * share * 1e6)
+            for callee, edge_seconds in callees[function]:
+                callee_seconds = edge_seconds * share
+                if callee not in functions and callee_seconds * 1e6 >= self.min_stack_microseconds:
+                    walk(callee, path, functions, callee_seconds)
+
+        for function, entry in entries.items():
+            if not entry[4]:
+                walk(function, (), frozenset(), entry[3])
+        return [f"{stack} {microseconds}" for stack, microseconds in lines.items() if microseconds > 0]
+
+    def write(self, output_dir: Union[str, Path], name: str) -> list[Path]:
+        """
+        This method writes the profile of the last run to output_dir: the raw profile as <name>.prof (for pstats or
+        snakeviz), the collapsed stacks as <name>.collapsed and the report as <name>.json.
+
+        Returns:
+            list[Path]: The written files.
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        paths = [output_dir / f"{name}.prof", output_dir / f"{name}.collapsed", output_dir / f"{name}.json"]
+        self.stats.dump_stats(paths[0])
+        paths[1].write_text("\n".join(self.collapsed_stacks()) + "\n")
+        with open(paths[2], "w") as file:
+            json.dump(self.report, file, indent=2)
+        return paths
+
+    def _allocation_hotspots(self, snapshot: Optional[tracemalloc.Snapshot]) -> list[dict]:
+        if snapshot is None:
+            return []
+        filters = [
+            tracemalloc.Filter(False, filename) for filename in _IGNORED_ALLOCATION_FILES + (tracemalloc.__file__,)
+        ]
+        statistics = snapshot.filter_traces(filters).statistics("lineno")[: self.n_top]
+        return [
+            {
+                "location": f"{_short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                "size_bytes": stat.size,
+                "blocks": stat.count,
+            }
+            for stat in statistics
+        ]
+
+
+@lru_cache(maxsize=None)
+def _label(function: tuple) -> str:
+    filename, lineno, name = function
+    if filename == "~":
+        # built-in functions and methods
+        return name
+    return f"{name} ({_short_path(filename)}:{lineno})"
+
+
+@lru_cache(maxsize=None)
+def _short_path(filename: str) -> str:
+    for prefix in sorted((path for path in sys.path if path), key=len, reverse=True):
+        if filename.startswith(prefix.rstrip("/") + "/"):
+            return filename[len(prefix.rstrip("/")) + 1 :]
+    return filename
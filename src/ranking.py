@@ -0,0 +1,141 @@
+"""
+Module for selecting the best scored (talent, job) pairs without sorting the complete score matrix.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+GROUP_BY_OPTIONS = (None, "talent", "job")
+
+
+def top_k_per_row(values: np.ndarray, k: Optional[int] = None) -> np.ndarray:
+    """
+    This method selects the column positions of the k largest values of every row using partial selection.
+
+    Args:
+        values: A (rows, cols) matrix of scores.
+        k: Number of columns to keep per row. If None, all columns are kept.
+
+    Returns:
+        np.ndarray: A (rows, min(k, cols)) matrix of column positions, ordered by descending value. Ties are broken
+        by ascending column position, which reproduces the order of a stable sort.
+
+    Notes:
+        - np.argpartition picks an arbitrary subset of values that tie with the k-th largest value. To stay
+          deterministic, the k-th largest value is used as threshold and the ties are filled up from the left.
+    """
+    n_rows, n_cols = values.shape
+    k = n_cols if k is None else min(k, n_cols)
+    if k == n_cols:
+        cols = np.broadcast_to(np.arange(n_cols), (n_rows, n_cols))
+    else:
+        kth_largest = np.partition(values, n_cols - k, axis=1)[:, n_cols - k, None]
+        greater = values > kth_largest
+        ties = values == kth_largest
+        missing = k - greater.sum(axis=1, keepdims=True)
+        chosen = greater | (ties & (np.cumsum(ties, axis=1) <= missing))
+        cols = np.nonzero(chosen)[1].reshape(n_rows, k)
+
+    selected_values = np.take_along_axis(values, cols, axis=1)
+    order = np.lexsort((cols, -selected_values), axis=1)
+    return np.take_along_axis(cols, order, axis=1)
+
+
+def merge_top_k(ids: list[np.ndarray], scores: list[np.ndarray], k: Optional[int] = None) -> (np.ndarray, np.ndarray):
+    """
+    This method merges several lists of candidates per row into the k best candidates per row.
+
+    Args:
+        ids: (rows, *) matrices of candidate ids, e.g. pair ids or job indices.
+        scores: (rows, *) matrices of the corresponding scores.
+        k: Number of candidates to keep per row. If None, all candidates are kept.
+
+    Returns:
+        Tuple
+            np.ndarray: A (rows, k) matrix of ids, ordered by descending score and ascending id for ties.
+            np.ndarray: A (rows, k) matrix of the corresponding scores.
+    """
+    ids = np.concatenate(ids, axis=1)
+    scores = np.concatenate(scores, axis=1)
+    order = np.lexsort((ids, -scores), axis=1)[:, :k]
+    return np.take_along_axis(ids, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+class TopKAccumulator:
+    """
+    Collects the best scored pairs of a talent x job score matrix that is produced in blocks of talent rows.
+
+    Depending on group_by the accumulator keeps the best top_k pairs overall (None), the best top_k jobs per talent
+    ("talent") or the best top_k talents per job ("job"). Apart from the block that is currently added, memory scales
+    with top_k times the number of groups instead of the number of pairs.
+    """
+
+    def __init__(self, n_talents: int, n_jobs: int, top_k: Optional[int] = None, group_by: Optional[str] = None):
+        if group_by not in GROUP_BY_OPTIONS:
+            raise ValueError(f"group_by must be one of {GROUP_BY_OPTIONS}, got {group_by!r}")
+        if top_k is not None and top_k < 1:
+            raise ValueError(f"top_k must be a positive integer, got {top_k}")
+        self.n_talents = n_talents
+        self.n_jobs = n_jobs
+        self.top_k = top_k
+        self.group_by = group_by
+        self._blocks = []
+
+    @property
+    def n_groups(self) -> int:
+        return {None: 1, "talent": self.n_talents, "job": self.n_jobs}[self.group_by]
+
+    def add(self, talent_start: int, scores: np.ndarray) -> None:
+        """
+        Adds the scores of the talents talent_start, ..., talent_start + len(scores) - 1 against all jobs.
+
+        Args:
+            talent_start: Index of the first talent of the block.
+            scores: A (rows, n_jobs) matrix of scores.
+        """
+        n_rows = scores.shape[0]
+        pair_ids = talent_start * self.n_jobs + np.arange(n_rows * self.n_jobs).reshape(n_rows, self.n_jobs)
+        if self.group_by is None:
+            scores, pair_ids = scores.reshape(1, -1), pair_ids.reshape(1, -1)
+        elif self.group_by == "job":
+            scores, pair_ids = scores.T, pair_ids.T
+
+        if self.top_k is not None or self.group_by == "talent":
+            cols = top_k_per_row(scores, self.top_k)
+            scores = np.take_along_axis(scores, cols, axis=1)
+            pair_ids = np.take_along_axis(pair_ids, cols, axis=1)
+        self._add_block(talent_start, pair_ids, scores)
+
+    def merge(self, other: "TopKAccumulator") -> None:
+        """
+        Merges the blocks collected by another accumulator over the same talents and jobs, e.g. from another shard.
+        """
+        for block in other._blocks:
+            self._add_block(*block)
+
+    def result(self) -> (np.ndarray, np.ndarray):
+        """
+        Returns:
+            Tuple
+                np.ndarray: A (n_groups, k) matrix of pair ids, where pair id = talent index * n_jobs + job index.
+                np.ndarray: A (n_groups, k) matrix of the corresponding scores, ordered by descending score per group.
+        """
+        if not self._blocks:
+            return np.empty((self.n_groups, 0), dtype=np.int64), np.empty((self.n_groups, 0))
+        if self.group_by == "talent":
+            blocks = sorted(self._blocks, key=lambda block: block[0])
+            return np.vstack([block[1] for block in blocks]), np.vstack([block[2] for block in blocks])
+        if len(self._blocks) > 1 or self.top_k is None:
+            self._blocks = [self._reduce(self._blocks, self.top_k)]
+        return self._blocks[0][1], self._blocks[0][2]
+
+    def _add_block(self, talent_start: int, pair_ids: np.ndarray, scores: np.ndarray) -> None:
+        self._blocks.append((talent_start, pair_ids, scores))
+        if self.group_by != "talent" and self.top_k is not None and len(self._blocks) > 1:
+            self._blocks = [self._reduce(self._blocks, self.top_k)]
+
+    @staticmethod
+    def _reduce(blocks: list, top_k: Optional[int]) -> tuple:
+        pair_ids, scores = merge_top_k([block[1] for block in blocks], [block[2] for block in blocks], top_k)
+        return 0, pair_ids, scores
@@ -0,0 +1,340 @@
+"""
+Module for ranking sessions, which keep the sorted result of a ranking so that it can be paged through with opaque
+cursors without scoring or sorting again.
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import logging
+import math
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class StaleCursorError(LookupError):
+    """
+    Raised for a cursor whose ranking session has expired, has been evicted or was ranked against another catalogue.
+    """
+
+
+class RankingSession:
+    __slots__ = (
+        "session_id",
+        "talents",
+        "jobs",
+        "pair_ids",
+        "negated_scores",
+        "page_size",
+        "top_k",
+        "min_score",
+        "expires_at",
+    )
+
+    def __init__(
+        self,
+        talents: list[dict],
+        jobs: list[dict],
+        pair_ids: np.ndarray,
+        scores: np.ndarray,
+        page_size: int,
+        top_k: Optional[int] = None,
+        min_score: Optional[float] = None,
+    ) -> None:
+        """
+        Initialize a new instance of the RankingSession class, the ranked (talent, job) pairs of one
+        Search.open_ranking call.
+
+        The talents and jobs are referenced, not copied. Per pair, only its pair id (talent index * len(jobs) + job
+        index, int32 if all pair ids fit) and its negated score are stored, ordered by descending score and ascending
+        pair id for ties, so a page is a slice of both arrays and positions by score are found by binary search on
+        the ascending negated scores.
+
+        Parameters:
+        - talents (list[dict]): The ranked talents.
+        - jobs (list[dict]): The ranked jobs.
+        - pair_ids (np.ndarray): (n,) pair ids in the order of the ranking.
+        - scores (np.ndarray): (n,) corresponding scores.
+        - page_size (int): Number of results per page.
+        - top_k (int): The top_k the ranking was limited to, if any.
+        - min_score (float): The min_score the ranking was filtered with, if any.
+
+        Returns:
+        - None
+        """
+        self.session_id = secrets.token_hex(8)
+        self.talents = talents
+        self.jobs = jobs
+        self.pair_ids = pair_ids
+        self.negated_scores = np.negative(scores)
+        self.page_size = page_size
+        self.top_k = top_k
+        self.min_score = min_score
+        self.expires_at = None
+
+    def __len__(self) -> int:
+        return len(self.pair_ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self.pair_ids.nbytes + self.negated_scores.nbytes
+
+    @staticmethod
+    def pair_id_dtype(n_talents: int, n_jobs: int) -> np.dtype:
+        return np.dtype(np.int32) if n_talents * n_jobs <= np.iinfo(np.int32).max else np.dtype(np.int64)
+
+    def scores(self, start: int, stop: int) -> np.ndarray:
+        return -self.negated_scores[start:stop]
+
+    def cursor_state(self, offset: int) -> Optional[dict]:
+        """
+        Returns:
+            dict: The state of the cursor of the page starting at offset, or None if the ranking ends before offset.
+        """
+        if offset >= len(self):
+            return None
+        last_score = -float(self.negated_scores[offset - 1]) if offset else None
+        n_ties = 0
+        if offset:
+            # number of served pairs that tie with the last served one, to resume after them
+            n_ties = offset - int(np.searchsorted(self.negated_scores[:offset], -last_score, side="left"))
+        return {
+            "session": self.session_id,
+            "offset": offset,
+            "page_size": self.page_size,
+            "last_score": last_score,
+            "n_ties": n_ties,
+            "top_k": self.top_k,
+            "min_score": self.min_score,
+        }
+
+    def resume_offset(self, last_score: Optional[float], n_ties: int) -> int:
+        """
+        Returns:
+            int: The position of this ranking after all pairs scored above last_score and n_ties of the pairs scored
+            exactly last_score, i.e. where a ranking that served up to last_score continues.
+        """
+        if last_score is None:
+            return 0
+        above = int(np.searchsorted(self.negated_scores, -last_score, side="left"))
+        tied = int(np.searchsorted(self.negated_scores, -last_score, side="right")) - above
+        return above + min(n_ties, tied)
+
+
+class RankingSessionStore:
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        max_bytes: int = 256 * 2**20,
+        ttl_seconds: Optional[float] = 900.0,
+        max_page_size: int = 1000,
+        secret: Optional[str] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize a new instance of the RankingSessionStore class, which holds the ranking sessions of
+        Search.open_ranking and Search.fetch_page.
+
+        A session expires ttl_seconds after it was last accessed. The least recently used sessions are evicted once
+        more than max_sessions sessions are stored or their arrays take more than max_bytes together. Sessions that
+        would exceed max_bytes on their own are limited to max_results before they are ranked.
+
+        The cursors handed out for the sessions are signed with an HMAC of secret, and cursors with an invalid
+        signature or malformed fields are rejected, so clients cannot change the position, page size or ranking
+        settings a cursor resumes with. Stores that should accept each other's cursors, e.g. of several workers
+        behind a load balancer, need the same secret.
+
+        The store is thread-safe.
+
+        Parameters:
+        - max_sessions (int): Maximum number of stored sessions.
+        - max_bytes (int): Maximum size of the pair id and score arrays of all stored sessions.
+        - ttl_seconds (float): Time after the last access after which a session expires, None keeps sessions until
+          they are evicted.
+        - max_page_size (int): Maximum number of results per page.
+        - secret (str): Key of the cursor signatures. Defaults to a random key of this store.
+        - clock (Callable): Source of the current time in seconds, used for the expiry.
+
+        Returns:
+        - None
+        """
+        if max_sessions < 1:
+            raise ValueError(f"max_sessions must be a positive integer, got {max_sessions}")
+        if max_bytes < 1:
+            raise ValueError(f"max_bytes must be a positive integer, got {max_bytes}")
+        if max_page_size < 1:
+            raise ValueError(f"max_page_size must be a positive integer, got {max_page_size}")
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_page_size = max_page_size
+        self._secret = secret.encode() if secret is not None else secrets.token_bytes(32)
+        self.clock = clock
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_config(cls, config) -> "RankingSessionStore":
+        """
+        Returns:
+            RankingSessionStore: A store configured by the ranking_sessions section of the config.
+        """
+        return cls(
+            config.get("ranking_sessions.max_sessions", 1000),
+            config.get("ranking_sessions.max_bytes", 256 * 2**20),
+            config.get("ranking_sessions.ttl_seconds", 900.0),
+            config.get("ranking_sessions.max_page_size", 1000),
+            config.get("ranking_sessions.secret", None),
+        )
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __getstate__(self) -> dict:
+        # the lock cannot be pickled, e.g. when the search is handed to spawned ParallelSearch workers
+        with self._lock:
+            state = {name: value.copy() if isinstance(value, dict) else value for name, value in self.__dict__.items()}
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def max_results(self, pair_id_dtype: np.dtype) -> int:
+        """
+        Returns:
+            int: The number of ranked pairs that fit into max_bytes with pair ids of the given dtype.
+        """
+        return max(1, self.max_bytes // (np.dtype(pair_id_dtype).itemsize + np.dtype(np.float64).itemsize))
+
+    def put(self, session: RankingSession) -> None:
+        with self._lock:
+            session.expires_at = self._expires_at()
+            self._sessions[session.session_id] = session
+            self.nbytes += session.nbytes
+            while len(self._sessions) > self.max_sessions or (self.nbytes > self.max_bytes and len(self._sessions) > 1):
+                _, evicted = self._sessions.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.evictions += 1
+
+    def get(self, session_id: str) -> Optional[RankingSession]:
+        """
+        Returns:
+            RankingSession: The session, whose expiry is extended, or None if it has expired or been evicted.
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if session.expires_at is not None and session.expires_at <= self.clock():
+                self._remove(session_id)
+                self.expirations += 1
+                return None
+            session.expires_at = self._expires_at()
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def remove(self, session_id: str) -> None:
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: The number of evictions and expirations and the current and maximum number of sessions and bytes.
+        """
+        with self._lock:
+            return {
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def encode_cursor(self, state: Optional[dict]) -> Optional[str]:
+        """
+        Returns:
+            str: The signed cursor of the state returned by RankingSession.cursor_state, None for None.
+        """
+        if state is None:
+            return None
+        payload = _b64encode(json.dumps(state, separators=(",", ":")).encode())
+        return f"{payload}.{_b64encode(self._signature(payload))}"
+
+    def decode_cursor(self, cursor: str) -> dict:
+        """
+        Returns:
+            dict: The state of a cursor returned by encode_cursor. Raises a ValueError for cursors that were not
+            signed by a store with the same secret or whose fields are malformed.
+        """
+        try:
+            payload, signature = cursor.split(".")
+            valid = hmac.compare_digest(_b64decode(signature), self._signature(payload))
+            state = json.loads(_b64decode(payload)) if valid else None
+        except (AttributeError, ValueError, binascii.Error, UnicodeDecodeError):
+            state = None
+        if not self._valid_cursor_state(state):
+            raise ValueError(f"Invalid cursor {cursor!r}")
+        return state
+
+    def _valid_cursor_state(self, state) -> bool:
+        def is_int(value, minimum: int, maximum: Optional[int] = None) -> bool:
+            return (
+                isinstance(value, int)
+                and not isinstance(value, bool)
+                and value >= minimum
+                and (maximum is None or value <= maximum)
+            )
+
+        def is_score(value) -> bool:
+            return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+        return (
+            isinstance(state, dict)
+            and set(state) == {"session", "offset", "page_size", "last_score", "n_ties", "top_k", "min_score"}
+            and isinstance(state["session"], str)
+            and is_int(state["offset"], 0)
+            and is_int(state["page_size"], 1, self.max_page_size)
+            and (state["last_score"] is None or is_score(state["last_score"]))
+            and is_int(state["n_ties"], 0, state["offset"])
+            and (state["top_k"] is None or is_int(state["top_k"], 1))
+            and (state["min_score"] is None or is_score(state["min_score"]))
+        )
+
+    def _signature(self, payload: str) -> bytes:
+        return hmac.new(self._secret, payload.encode(), hashlib.sha256).digest()[:16]
+
+    def _remove(self, session_id: str) -> None:
+        self.nbytes -= self._sessions.pop(session_id).nbytes
+
+    def _expires_at(self) -> Optional[float]:
+        return self.clock() + self.ttl_seconds if self.ttl_seconds is not None else None
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
@@ -0,0 +1,196 @@
+"""
+Module for a columnar container of match results that materializes result dicts only on demand.
+"""
+
+import json
+from pathlib import Path
+from typing import Iterator, Optional, TextIO, Union
+
+import numpy as np
+
+
+class MatchResults:
+    def __init__(
+        self,
+        talents: list[dict],
+        jobs: list[dict],
+        talent_idx: np.ndarray,
+        job_idx: np.ndarray,
+        scores: np.ndarray,
+        group_offsets: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Initialize a new instance of the MatchResults class, the columnar counterpart of the list of result dicts
+        returned by Search.match_bulk. Every result is a row of the talent_idx, job_idx and scores arrays, the
+        talents and jobs are only referenced by their position in the input lists.
+
+        Result dicts in the format of Search.match are only created when the results are iterated or indexed with
+        an integer. Indexing with a boolean mask, an index array or a slice returns a new MatchResults.
+
+        Parameters:
+        - talents (list[dict]): The talents the results refer to.
+        - jobs (list[dict]): The jobs the results refer to.
+        - talent_idx (np.ndarray): (n,) position of the talent of every result within talents.
+        - job_idx (np.ndarray): (n,) position of the job of every result within jobs.
+        - scores (np.ndarray): (n,) score of every result.
+        - group_offsets (np.ndarray): Optional (n_groups + 1,) offsets of the groups if the results are grouped by
+          talent or job, group i consists of the rows group_offsets[i], ..., group_offsets[i + 1] - 1.
+
+        Returns:
+        - None
+        """
+        self.talents = talents
+        self.jobs = jobs
+        self.talent_idx = np.asarray(talent_idx, dtype=np.int64)
+        self.job_idx = np.asarray(job_idx, dtype=np.int64)
+        self.scores = np.asarray(scores, dtype=np.float64)
+        self.group_offsets = group_offsets
+
+    @classmethod
+    def from_pair_ids(
+        cls,
+        talents: list[dict],
+        jobs: list[dict],
+        pair_ids: np.ndarray,
+        scores: np.ndarray,
+        group_offsets: Optional[np.ndarray] = None,
+    ) -> "MatchResults":
+        """
+        Creates the results from pair ids, where pair id = talent index * len(jobs) + job index.
+        """
+        talent_idx, job_idx = np.divmod(pair_ids, max(len(jobs), 1))
+        return cls(talents, jobs, talent_idx, job_idx, scores, group_offsets)
+
+    @property
+    def labels(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: (n,) predicted labels as booleans, True where the score is at least 0.5.
+        """
+        return self.scores >= 0.5
+
+    @property
+    def n_groups(self) -> Optional[int]:
+        return None if self.group_offsets is None else len(self.group_offsets) - 1
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def __iter__(self) -> Iterator[dict]:
+        for row in range(len(self)):
+            yield self._materialize(row)
+
+    def __getitem__(self, key) -> Union[dict, "MatchResults"]:
+        if isinstance(key, (int, np.integer)):
+            return self._materialize(key)
+        return MatchResults(self.talents, self.jobs, self.talent_idx[key], self.job_idx[key], self.scores[key])
+
+    def __repr__(self) -> str:
+        groups = f", groups={self.n_groups}" if self.group_offsets is not None else ""
+        return f"MatchResults(n={len(self)}{groups})"
+
+    def group(self, idx: int) -> "MatchResults":
+        """
+        Returns:
+            MatchResults: The results of the idx-th group, i.e. talent or job, depending on the grouping.
+        """
+        if self.group_offsets is None:
+            raise ValueError("The results are not grouped")
+        return self[int(self.group_offsets[idx]) : int(self.group_offsets[idx + 1])]
+
+    def groups(self) -> list["MatchResults"]:
+        return [self.group(idx) for idx in range(self.n_groups)]
+
+    def filter(
+        self, mask: Optional[np.ndarray] = None, min_score: Optional[float] = None, label: Optional[bool] = None
+    ) -> "MatchResults":
+        """
+        This method selects the results matching all given conditions while keeping their order. A grouped result
+        keeps its groups.
+
+        Args:
+            mask: Optional (n,) boolean array of the results to keep.
+            min_score: If given, only results with at least this score are kept.
+            label: If given, only results with this predicted label are kept.
+
+        Returns:
+            MatchResults: The selected results.
+        """
+        keep = np.ones(len(self), dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+        if min_score is not None:
+            keep = keep & (self.scores >= min_score)
+        if label is not None:
+            keep = keep & (self.labels == label)
+        group_offsets = None
+        if self.group_offsets is not None:
+            group_offsets = np.concatenate([[0], np.cumsum(keep)])[self.group_offsets]
+        return MatchResults(
+            self.talents, self.jobs, self.talent_idx[keep], self.job_idx[keep], self.scores[keep], group_offsets
+        )
+
+    def sort(self, descending: bool = True) -> "MatchResults":
+        """
+        This method sorts all results by score, ties are broken by ascending talent and job position. Grouped results
+        are sorted as a whole and lose their groups.
+        """
+        order = np.lexsort((self.job_idx, self.talent_idx, -self.scores if descending else self.scores))
+        return self[order]
+
+    def top_k(self, k: int) -> "MatchResults":
+        return self.sort()[:k]
+
+    def to_dicts(self) -> list[dict]:
+        return list(self)
+
+    def to_npz(self, path: Union[str, Path]) -> None:
+        """
+        This method writes the result columns (without the talents and jobs) to an .npz file.
+        """
+        arrays = {"talent_idx": self.talent_idx, "job_idx": self.job_idx, "scores": self.scores}
+        if self.group_offsets is not None:
+            arrays["group_offsets"] = self.group_offsets
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load_npz(cls, path: Union[str, Path], talents: list[dict], jobs: list[dict]) -> "MatchResults":
+        with np.load(path) as arrays:
+            group_offsets = arrays["group_offsets"] if "group_offsets" in arrays else None
+            return cls(talents, jobs, arrays["talent_idx"], arrays["job_idx"], arrays["scores"], group_offsets)
+
+    def to_jsonl(self, path: Union[str, Path, TextIO], include_profiles: bool = False) -> None:
+        """
+        This method writes one JSON object per result and line, with the keys talent_idx, job_idx, label and score,
+        and with include_profiles also the talent and job. Every talent and job is serialized at most once.
+
+        Args:
+            path: Path of the JSON Lines file, or an open text file the lines are appended to.
+            include_profiles: Whether the talent and job dicts are written, too.
+        """
+        if hasattr(path, "write"):
+            self._write_jsonl(path, include_profiles)
+            return
+        with open(path, "w") as file:
+            self._write_jsonl(file, include_profiles)
+
+    def _write_jsonl(self, file: TextIO, include_profiles: bool) -> None:
+        talent_json, job_json = {}, {}
+        for talent, job, label, score in zip(
+            self.talent_idx.tolist(), self.job_idx.tolist(), self.labels.tolist(), self.scores.tolist()
+        ):
+            line = f'{{"talent_idx": {talent}, "job_idx": {job}, "label": {int(label)}, "score": {score!r}'
+            if include_profiles:
+                if talent not in talent_json:
+                    talent_json[talent] = json.dumps(self.talents[talent])
+                if job not in job_json:
+                    job_json[job] = json.dumps(self.jobs[job])
+                line += f', "talent": {talent_json[talent]}, "job": {job_json[job]}'
+            file.write(line + "}\n")
+
+    def _materialize(self, row: int) -> dict:
+        score = self.scores[row]
+        return {
+            "talent": self.talents[self.talent_idx[row]],
+            "job": self.jobs[self.job_idx[row]],
+            "label": 0 if score < 0.5 else 1,
+            "score": score,
+        }
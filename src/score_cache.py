@@ -0,0 +1,187 @@
+"""
+Module for a bounded LRU cache of pair scores, keyed by the extracted features of the talent and the job.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+
+from src.feature_extraction import FeatureExtractor
+
+logger = logging.getLogger(__name__)
+
+
+class ScoreCache:
+    def __init__(
+        self,
+        max_size: int = 100_000,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize a new instance of the ScoreCache class, which Search.match and Search.match_pairs use to skip
+        engineering and prediction of pairs they have scored before.
+
+        A pair is keyed by a hash of the rows its talent and job take in the batch extraction (role bitmask,
+        language rating ranks, degree, seniority and salary), not by the dicts themselves: profiles that only differ
+        in the order of their roles or languages, in attributes the model does not use, or in object identity share
+        their cache entry. The least recently used entry is evicted once max_size entries are stored, and entries
+        older than ttl_seconds are dropped on access. The cache is cleared whenever it is used with another model or
+        config object than before, see validate.
+
+        The cache is thread-safe.
+
+        Parameters:
+        - max_size (int): Maximum number of cached pairs.
+        - ttl_seconds (float): Optional time after which an entry expires.
+        - clock (Callable): Source of the current time in seconds, used for the expiry.
+
+        Returns:
+        - None
+        """
+        if max_size < 1:
+            raise ValueError(f"max_size must be a positive integer, got {max_size}")
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._dependencies = ()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_config(cls, config) -> Optional["ScoreCache"]:
+        """
+        Returns:
+            ScoreCache: A cache configured by the score_cache section of the config, or None if it is disabled.
+        """
+        if not config.get("score_cache.enabled", False):
+            return None
+        return cls(config.get("score_cache.max_size", 100_000), config.get("score_cache.ttl_seconds", None))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getstate__(self) -> dict:
+        # the lock cannot be pickled, e.g. when the search is handed to spawned ParallelSearch workers, and the
+        # entries are only valid for the identity of the model and config, which is not kept by pickling
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state.update(_entries=OrderedDict(), _dependencies=())
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def pair_keys(extracted_batch: dict) -> list[bytes]:
+        """
+        This method computes the cache keys of aligned pairs.
+
+        Args:
+            extracted_batch: Dict with the aligned talent_info and job_info arrays of n (talent, job) pairs, as
+                returned by FeatureExtractor.extract_batch.
+
+        Returns:
+            list[bytes]: The n keys.
+        """
+        if not len(extracted_batch["talent_info"]["role_mask"]):
+            return []
+        rows = np.concatenate(
+            [
+                FeatureExtractor.row_bytes(extracted_batch["talent_info"]),
+                FeatureExtractor.row_bytes(extracted_batch["job_info"]),
+            ],
+            axis=1,
+        )
+        return [hashlib.blake2b(row, digest_size=16).digest() for row in rows]
+
+    def validate(self, *dependencies) -> None:
+        """
+        Clears the cache if the given objects (e.g. the model and the config) are not the ones the cached scores were
+        computed with. Objects that are modified in place, e.g. a model fitted again, are not detected; call clear in
+        that case.
+        """
+        with self._lock:
+            if len(self._dependencies) == len(dependencies) and all(
+                reference() is dependency for reference, dependency in zip(self._dependencies, dependencies)
+            ):
+                return
+            if self._entries:
+                self.invalidations += 1
+                logger.info(f"Cleared score cache of {len(self._entries)} entries after a model or config change")
+            self._entries.clear()
+            self._dependencies = tuple(self._reference(dependency) for dependency in dependencies)
+
+    def get_many(self, keys: list[bytes]) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: The cached score per key, NaN for keys that are not cached or expired.
+        """
+        scores = np.full(len(keys), np.nan)
+        now = self.clock()
+        with self._lock:
+            for idx, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] is not None and entry[1] <= now:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    continue
+                self._entries.move_to_end(key)
+                scores[idx] = entry[0]
+                self.hits += 1
+        return scores
+
+    def put_many(self, keys: list[bytes], scores: np.ndarray) -> None:
+        expires_at = self.clock() + self.ttl_seconds if self.ttl_seconds is not None else None
+        with self._lock:
+            for key, score in zip(keys, scores.tolist()):
+                self._entries[key] = (score, expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: The number of hits, misses, evictions, expirations and invalidations, the hit rate and the current
+            and maximum size.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+    @staticmethod
+    def _reference(dependency) -> Callable:
+        try:
+            return weakref.ref(dependency)
+        except TypeError:
+            return lambda: dependency
@@ -1,12 +1,42 @@
-from pyhocon import ConfigTree
+from __future__ import annotations
 
+import logging
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, Union
+
+import numpy as np
+
+from src.candidate_index import CandidateIndex
 from src.feature_engineering import FeatureEngineer
 from src.feature_extraction import FeatureExtractor
+from src.feature_store import FeatureStore
+from src.first_stage import AdditiveScorer
+from src.lazy_import import LazyModule
+from src.metrics import MetricsRegistry
+from src.ranking import TopKAccumulator, top_k_per_row
+from src.ranking_session import RankingSession, RankingSessionStore, StaleCursorError
+from src.results import MatchResults
+from src.score_cache import ScoreCache
+
+if TYPE_CHECKING:
+    from pyhocon import ConfigTree
+
+pd = LazyModule("pandas")
+
+logger = logging.getLogger(__name__)
 
 
 class Search:
     def __init__(
-        self, config: ConfigTree, feature_extractor: FeatureExtractor, feature_engineer: FeatureEngineer, model
+        self,
+        config: ConfigTree,
+        feature_extractor: FeatureExtractor,
+        feature_engineer: FeatureEngineer,
+        model,
+        talent_feature_store: Optional[FeatureStore] = None,
+        job_feature_store: Optional[FeatureStore] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        score_cache: Optional[ScoreCache] = None,
+        ranking_sessions: Optional[RankingSessionStore] = None,
     ) -> None:
         """
         Initialize a new instance of the Search class.
@@ -15,6 +45,14 @@ class Search:
         - config (ConfigTree): The configuration settings for the search.
         - feature_extractor (FeatureExtractor): An instance of the FeatureExtractor class for extracting features.
         - feature_engineer (FeatureEngineer): An instance of the FeatureEngineer class for engineering features.
+        - talent_feature_store (FeatureStore): Optional on-disk cache of extracted talent features for bulk matching.
+        - job_feature_store (FeatureStore): Optional on-disk cache of extracted job features for bulk matching.
+        - metrics (MetricsRegistry): Registry the stage timings are recorded in. Defaults to a registry that is
+          enabled by metrics.enabled of the config.
+        - score_cache (ScoreCache): Optional cache of pair scores used by match and match_pairs. Defaults to a cache
+          configured by the score_cache section of the config, which is disabled unless score_cache.enabled is set.
+        - ranking_sessions (RankingSessionStore): Store of the ranking sessions of open_ranking and fetch_page.
+          Defaults to a store configured by the ranking_sessions section of the config.
 
         Returns:
         - None
@@ -23,11 +61,21 @@ class Search:
         self.feature_extractor = feature_extractor
         self.feature_engineer = feature_engineer
         self.model = model
+        self.talent_feature_store = talent_feature_store
+        self.job_feature_store = job_feature_store
+        self.bulk_pair_chunk_size = self.config.get("bulk_pair_chunk_size", 1_000_000)
+        self.dedup_bulk_scoring = self.config.get("dedup_bulk_scoring", True)
+        self.metrics = metrics or MetricsRegistry(enabled=self.config.get("metrics.enabled", False))
+        self.score_cache = score_cache if score_cache is not None else ScoreCache.from_config(self.config)
+        self.ranking_sessions = (
+            ranking_sessions if ranking_sessions is not None else RankingSessionStore.from_config(self.config)
+        )
 
     def match(self, talent: dict, job: dict) -> dict:
         """
         This method takes a talent and job as input and uses the machine learning
-        model to predict the label and a score.
+        model to predict the label and a score. The pair goes through the batch feature pipeline, so pandas is
+        only imported if the model itself needs it.
 
         Args:
             talent: A dictionary representing a talent with relevant attributes.
@@ -37,13 +85,68 @@ class Search:
             A dictionary containing the talent, job, predicted label, and score.
 
         """
-        extracted_features = self.feature_extractor.extract_features(talent, job)
-        features = self.feature_engineer.engineer_features(extracted_features)
-        score = self.model.predict_proba(features)[:, 1][0]
-        label = 0 if score < 0.5 else 1
+        with self.metrics.timer("search.match", items=1, unit="pairs"):
+            with self.metrics.timer("search.match.extract", items=1, unit="pairs"):
+                extracted_batch = self.feature_extractor.extract_batch([talent], [job])
+            if self.score_cache is not None:
+                keys, cached_scores = self._cached_scores(extracted_batch)
+                if not np.isnan(cached_scores[0]):
+                    score = cached_scores[0]
+                    return {"talent": talent, "job": job, "label": 0 if score < 0.5 else 1, "score": score}
+            with self.metrics.timer("search.match.engineer", items=1, unit="pairs"):
+                features = self.feature_engineer.engineer_batch(extracted_batch)
+            score = self.predict_scores(features)[0]
+            if self.score_cache is not None:
+                self.score_cache.put_many(keys, np.array([score]))
+            label = 0 if score < 0.5 else 1
         return {"talent": talent, "job": job, "label": label, "score": score}
 
-    def match_bulk(self, talents: list[dict], jobs: list[dict]) -> list[dict]:
+    def match_pairs(self, talents: list[dict], jobs: list[dict]) -> list[dict]:
+        """
+        This method scores aligned (talent, job) pairs, i.e. the i-th talent with the i-th job, with a single model call.
+
+        Args:
+            talents: List of dicts representing talents with relevant attributes
+            jobs: List of dicts representing jobs with relevant attributes, aligned with talents
+
+        Returns:
+            list[dict]: One result per pair in the input order, in the format of match.
+        """
+        if not talents:
+            return []
+        with self.metrics.timer("search.match_pairs", items=len(talents), unit="pairs"):
+            with self.metrics.timer("search.match_pairs.extract", items=len(talents), unit="pairs"):
+                extracted_batch = self.feature_extractor.extract_batch(talents, jobs)
+            if self.score_cache is not None:
+                keys, scores = self._cached_scores(extracted_batch)
+                missing = np.flatnonzero(np.isnan(scores))
+                if len(missing):
+                    missing_batch = {
+                        side: self.feature_extractor.select_rows(side_data, missing)
+                        for side, side_data in extracted_batch.items()
+                    }
+                    with self.metrics.timer("search.match_pairs.engineer", items=len(missing), unit="pairs"):
+                        features = self.feature_engineer.engineer_batch(missing_batch)
+                    scores[missing] = self.predict_scores(features)
+                    self.score_cache.put_many([keys[idx] for idx in missing.tolist()], scores[missing])
+            else:
+                with self.metrics.timer("search.match_pairs.engineer", items=len(talents), unit="pairs"):
+                    features = self.feature_engineer.engineer_batch(extracted_batch)
+                scores = self.predict_scores(features)
+        return [
+            {"talent": talent, "job": job, "label": 0 if score < 0.5 else 1, "score": score}
+            for talent, job, score in zip(talents, jobs, scores)
+        ]
+
+    def match_bulk(
+        self,
+        talents: list[dict],
+        jobs: list[dict],
+        top_k: Optional[int] = None,
+        group_by: Optional[str] = None,
+        columnar: bool = False,
+        min_score: Optional[float] = None,
+    ) -> Union[list, MatchResults]:
         """
         This method takes a multiple talents and jobs as input and uses the machine
         learning model to predict the label for each combination.
@@ -51,16 +154,540 @@ class Search:
         Args:
             talents: List of dicts representing talents with relevant attributes
             jobs: List of dicts representing jobs with relevant attributes
+            top_k: If given, only the top_k best scored results are returned (per group, if group_by is set).
+            group_by: None to rank all combinations together, "talent" to rank the jobs of every talent or
+                "job" to rank the talents of every job.
+            columnar: Whether the results are returned as MatchResults, which hold the talent and job positions,
+                scores and labels as arrays and only create the result dictionaries when iterated.
+            min_score: If given, only combinations scoring at least min_score are returned, e.g. 0.5 for the
+                combinations with label 1. With a CompiledModel, the trees of a combination stop being evaluated as
+                soon as it cannot reach min_score anymore, see CompiledModel.predict_score_above.
+
+        Returns:
+            list: If group_by is None, a list of dictionaries, sorted by descending order of the score. Each
+            dictionary contains the talent, job, predicted label, and score. Otherwise, one such list per talent
+            (or job) in the order of the input. With columnar, a MatchResults in the same order instead, grouped
+            by talent (or job) if group_by is set.
+        """
+        with self.metrics.timer("search.match_bulk", items=len(talents) * len(jobs), unit="pairs"):
+            score_blocks = self._iter_score_blocks(talents, jobs, min_score)
+            return self.rank(talents, jobs, score_blocks, top_k, group_by, columnar)
+
+    def match_candidates(
+        self,
+        talents: list[dict],
+        candidate_index: CandidateIndex,
+        top_k: Optional[int] = None,
+        group_by: Optional[str] = None,
+        columnar: bool = False,
+    ) -> Union[list, MatchResults]:
+        """
+        This method works like match_bulk for the jobs of the candidate index, but only scores the jobs the index
+        considers plausible for each talent. Pruned pairs are left out of the results.
+
+        Args:
+            talents: List of dicts representing talents with relevant attributes
+            candidate_index: A CandidateIndex built over the jobs to match against.
+            top_k: If given, only the top_k best scored results are returned (per group, if group_by is set).
+            group_by: None, "talent" or "job", see match_bulk.
+            columnar: Whether the results are returned as MatchResults, see match_bulk.
+
+        Returns:
+            list: The results in the same layout as match_bulk.
+        """
+        with self.metrics.timer(
+            "search.match_candidates", items=len(talents) * len(candidate_index.jobs), unit="pairs"
+        ):
+            score_blocks = self._iter_candidate_score_blocks(talents, candidate_index)
+            return self.rank(talents, candidate_index.jobs, score_blocks, top_k, group_by, columnar)
+
+    def match_two_stage(
+        self,
+        talents: list[dict],
+        jobs: list[dict],
+        first_stage: AdditiveScorer,
+        n_candidates: Optional[int] = None,
+        top_k: Optional[int] = None,
+        group_by: Optional[str] = None,
+        columnar: bool = False,
+    ) -> Union[list, MatchResults]:
+        """
+        This method works like match_bulk, but the model only scores the n_candidates jobs per talent that the
+        first-stage scorer ranks highest. The remaining pairs are left out of the results. Use
+        first_stage.two_stage_recall to choose n_candidates for a target recall.
+
+        Args:
+            talents: List of dicts representing talents with relevant attributes
+            jobs: List of dicts representing jobs with relevant attributes
+            first_stage: The cheap scorer that selects the candidates, e.g. a AdditiveScorer distilled from the model.
+            n_candidates: Number of jobs per talent re-scored by the model. Defaults to two_stage.n_candidates.
+            top_k: If given, only the top_k best scored results are returned (per group, if group_by is set).
+            group_by: None, "talent" or "job", see match_bulk.
+            columnar: Whether the results are returned as MatchResults, see match_bulk.
+
+        Returns:
+            list: The results in the same layout as match_bulk.
+        """
+        n_candidates = n_candidates or self.config.get("two_stage.n_candidates", 100)
+        with self.metrics.timer("search.match_two_stage", items=len(talents) * len(jobs), unit="pairs"):
+            score_blocks = self._iter_two_stage_score_blocks(talents, jobs, first_stage, n_candidates)
+            return self.rank(talents, jobs, score_blocks, top_k, group_by, columnar)
+
+    def open_ranking(
+        self,
+        talents: list[dict],
+        jobs: list[dict],
+        page_size: Optional[int] = None,
+        top_k: Optional[int] = None,
+        min_score: Optional[float] = None,
+    ) -> dict:
+        """
+        This method ranks all combinations of talents and jobs once, e.g. a single talent against the job catalogue,
+        keeps the ranking as a session in ranking_sessions and returns its first page. The following pages are
+        served from the session with the cursor of the previous page, see fetch_page.
+
+        Args:
+            talents: List of dicts representing talents with relevant attributes
+            jobs: List of dicts representing jobs with relevant attributes
+            page_size: Number of results per page. Defaults to ranking_sessions.page_size of the config.
+            top_k: If given, only the top_k best scored combinations are ranked. The ranking is also limited to the
+                combinations that fit into ranking_sessions.max_bytes.
+            min_score: If given, only combinations scoring at least min_score are ranked, see match_bulk.
+
+        Returns:
+            dict: The first page, see fetch_page.
+        """
+        page_size = page_size or self.config.get("ranking_sessions.page_size", 20)
+        return self._page(self._open_session(talents, jobs, page_size, top_k, min_score), 0)
+
+    def fetch_page(
+        self,
+        cursor: str,
+        talents: Optional[list[dict]] = None,
+        jobs: Optional[list[dict]] = None,
+        resume: bool = False,
+    ) -> dict:
+        """
+        This method serves the page of a ranking session that starts at the cursor, without scoring or sorting, in
+        O(page size).
+
+        Cursors are signed by ranking_sessions, so a forged or modified cursor raises a ValueError. A cursor is stale
+        once its session has expired or been evicted, or if talents or jobs are passed that are
+        not the ranked lists, i.e. the catalogue has changed. The lists are compared by identity, so lists that are
+        modified in place are not detected. A stale cursor raises a StaleCursorError, unless resume is set: then
+        talents and jobs (by default the ones of the session, if it is still stored) are ranked into a new session
+        with the settings of the old one, which is continued after the last score served through the cursor. Of the
+        combinations tied with that score, as many are skipped as had been served, and combinations scored above
+        it, e.g. of jobs added to the catalogue, are not served.
+
+        Args:
+            cursor: Cursor of the page, as returned by open_ranking or fetch_page.
+            talents: The talents of the ranking, only needed to resume a cursor whose session is no longer stored.
+            jobs: The jobs of the ranking, e.g. the changed catalogue to resume the cursor with.
+            resume: Whether a stale cursor is resumed instead of raising a StaleCursorError.
+
+        Returns:
+            dict: The page, with the results in the format of match_bulk in "results", the position of its first
+            result within the ranking in "offset", the number of ranked combinations in "total" and the cursor of the
+            next page in "cursor", which is None on the last page.
+        """
+        state = self.ranking_sessions.decode_cursor(cursor)
+        with self.metrics.timer("search.fetch_page", unit="pairs") as timer:
+            session = self.ranking_sessions.get(state["session"])
+            if session is None:
+                reason = "has expired or been evicted"
+            elif (talents is not None and talents is not session.talents) or (
+                jobs is not None and jobs is not session.jobs
+            ):
+                reason = "was ranked against other talents or jobs"
+            else:
+                page = self._page(session, state["offset"])
+                timer.items = len(page["results"])
+                return page
+
+            if session is not None:
+                talents = session.talents if talents is None else talents
+                jobs = session.jobs if jobs is None else jobs
+            if not resume:
+                raise StaleCursorError(f"The ranking session of the cursor {reason}, pass resume=True to resume it")
+            if talents is None or jobs is None:
+                raise StaleCursorError(
+                    f"The ranking session of the cursor {reason}, pass talents and jobs to resume it"
+                )
+            if session is not None:
+                self.ranking_sessions.remove(session.session_id)
+            session = self._open_session(talents, jobs, state["page_size"], state["top_k"], state["min_score"])
+            offset = session.resume_offset(state["last_score"], state["n_ties"])
+            self.metrics.increment("search.resumed_rankings")
+            logger.info(
+                f"Resumed ranking cursor at offset {state['offset']}, whose session {reason}, at offset {offset} of "
+                f"{len(session)} in a new session"
+            )
+            page = self._page(session, offset)
+            timer.items = len(page["results"])
+            return page
+
+    def score_cross(self, talents: list[dict], jobs: list[dict]) -> np.ndarray:
+        """
+        This method scores every combination of talents and jobs.
+
+        Args:
+            talents: List of dicts representing talents with relevant attributes
+            jobs: List of dicts representing jobs with relevant attributes
+
+        Returns:
+            np.ndarray: The scores of shape (len(talents) * len(jobs),), where entry i * len(jobs) + j belongs to
+            talent i and job j.
+        """
+        scores = np.empty(len(talents) * len(jobs))
+        for talent_start, block_scores in self._iter_score_blocks(talents, jobs):
+            scores[talent_start * len(jobs) : talent_start * len(jobs) + block_scores.size] = block_scores.ravel()
+        return scores
+
+    def extract_talents(self, talents: list[dict]) -> dict:
+        """
+        Returns:
+            dict: The side arrays of the talents, from the talent feature store if the search has one, as taken by
+            iter_extracted_score_blocks.
+        """
+        with self.metrics.timer("search.extract_talents", items=len(talents), unit="rows"):
+            if self.talent_feature_store is not None:
+                return self.talent_feature_store.get_batch(talents)
+            return self.feature_extractor.extract_talent_batch(talents)
+
+    def extract_jobs(self, jobs: list[dict]) -> dict:
+        """
+        Returns:
+            dict: The side arrays of the jobs, from the job feature store if the search has one, as taken by
+            iter_extracted_score_blocks.
+        """
+        with self.metrics.timer("search.extract_jobs", items=len(jobs), unit="rows"):
+            if self.job_feature_store is not None:
+                return self.job_feature_store.get_batch(jobs)
+            return self.feature_extractor.extract_job_batch(jobs)
+
+    def iter_extracted_score_blocks(
+        self, talent_data: dict, job_data: dict, min_score: Optional[float] = None
+    ) -> Iterator[tuple[int, np.ndarray]]:
+        """
+        This method scores every combination of talents and jobs that have already been extracted, e.g. by
+        extract_talents and extract_jobs, block by block. It is the building block of match_bulk and of the
+        searches that extract once and score many times, like ParallelSearch, StreamingSearch or SharedDeployment.
+        The pairwise features of a block are assembled by broadcasting and the model is called once per block of at
+        most bulk_pair_chunk_size pairs. With min_score, the scores of combinations below it are set to -inf. Nothing
+        is yielded if there are no talents or no jobs.
+
+        If dedup_bulk_scoring is set, talents and jobs with identical extracted features (e.g. profiles that only
+        differ in roles outside the job_role_universe, in other languages or in attributes the model does not use)
+        are grouped: every distinct combination of a talent and a job signature of a block is engineered and scored
+        once, and its score is copied to all pairs of the combination.
+
+        Args:
+            talent_data: Side arrays of the talents.
+            job_data: Side arrays of the jobs.
+            min_score: If given, scores below min_score are set to -inf, see predict_scores.
+
+        Yields:
+            Tuple
+                int: Index of the first talent of the block.
+                np.ndarray: A (talents in block, jobs) matrix of scores.
+        """
+        n_talents, n_jobs = len(talent_data["role_mask"]), len(job_data["role_mask"])
+        if not n_talents or not n_jobs:
+            return
+        talents_per_block = max(1, self.bulk_pair_chunk_size // n_jobs)
+        job_inverse = None
+        if self.dedup_bulk_scoring:
+            with self.metrics.timer("search.dedup", items=n_jobs, unit="rows"):
+                job_rows, job_inverse = self.feature_extractor.unique_rows(job_data)
+            if len(job_rows) < n_jobs:
+                job_data = self.feature_extractor.select_rows(job_data, job_rows)
+            else:
+                job_inverse = None
+        n_unique_jobs = len(job_data["role_mask"])
+        n_scored = 0
+        for start in range(0, n_talents, talents_per_block):
+            stop = min(start + talents_per_block, n_talents)
+            block_data = self.feature_extractor.select_rows(talent_data, slice(start, stop))
+            talent_inverse = None
+            if self.dedup_bulk_scoring:
+                with self.metrics.timer("search.dedup", items=stop - start, unit="rows"):
+                    talent_rows, talent_inverse = self.feature_extractor.unique_rows(block_data)
+                if len(talent_rows) < stop - start:
+                    block_data = self.feature_extractor.select_rows(block_data, talent_rows)
+                else:
+                    talent_inverse = None
+            n_block_talents = len(block_data["role_mask"])
+            with self.metrics.timer("search.engineer", items=n_block_talents * n_unique_jobs, unit="pairs"):
+                features = self.feature_engineer.engineer_cross(block_data, job_data)
+            scores = self.predict_scores(features, min_score).reshape(n_block_talents, n_unique_jobs)
+            n_scored += scores.size
+            if talent_inverse is not None:
+                scores = scores[talent_inverse]
+            if job_inverse is not None:
+                scores = scores[:, job_inverse]
+            yield start, scores
+        if self.dedup_bulk_scoring:
+            n_pairs = n_talents * n_jobs
+            self.metrics.increment("search.distinct_pairs", n_scored)
+            self.metrics.increment("search.deduplicated_pairs", n_pairs - n_scored)
+            self.metrics.set_gauge("search.dedup_ratio", n_pairs / n_scored)
+            logger.info(
+                f"Scored {n_scored} distinct feature combinations for {n_pairs} pairs, "
+                f"dedup ratio {n_pairs / n_scored:.2f}"
+            )
+
+    def predict_scores(self, features: np.ndarray, min_score: Optional[float] = None) -> np.ndarray:
+        """
+        This method scores engineered features with the model of the search.
+
+        Args:
+            features: (n, len(relevant_features)) matrix of engineered features.
+            min_score: If given, the threshold below which scores are not needed.
+
+        Returns:
+            np.ndarray: The score of every row of features. With min_score, scores below min_score are set to -inf,
+            and models with early exit (see CompiledModel.predict_score_above) skip the trees that cannot change that.
+        """
+        with self.metrics.timer("search.predict", items=len(features), unit="pairs"):
+            if min_score is not None and hasattr(self.model, "predict_score_above"):
+                scores, n_evaluations = self.model.predict_score_above(features, min_score)
+                self.metrics.increment("search.tree_evaluations", n_evaluations)
+                self.metrics.increment(
+                    "search.tree_evaluations_saved", len(features) * self.model.n_trees - n_evaluations
+                )
+                return scores
+            if hasattr(self.model, "feature_names_in_"):
+                # sklearn models fitted on a DataFrame expect the feature names
+                features = pd.DataFrame(features, columns=self.feature_engineer.relevant_features)
+            scores = self.model.predict_proba(features)[:, 1]
+            if min_score is not None:
+                scores = np.where(scores >= min_score, scores, -np.inf)
+            return scores
+
+    def rank(
+        self,
+        talents: list[dict],
+        jobs: list[dict],
+        score_blocks: Iterable[tuple[int, np.ndarray]],
+        top_k: Optional[int],
+        group_by: Optional[str],
+        columnar: bool = False,
+    ) -> Union[list, MatchResults]:
+        """
+        This method ranks score blocks, e.g. of iter_extracted_score_blocks, into the results of match_bulk.
+
+        Args:
+            talents: The talents the score blocks belong to.
+            jobs: The jobs the score blocks belong to.
+            score_blocks: Per block the index of its first talent and a (talents in block, len(jobs)) matrix of
+                scores, where -inf marks pairs that are left out of the results.
+            top_k: If given, only the top_k best scored results are returned (per group, if group_by is set).
+            group_by: None, "talent" or "job", see match_bulk.
+            columnar: Whether the results are returned as MatchResults, see match_bulk.
+
+        Returns:
+            list: The results in the same layout as match_bulk.
+        """
+        accumulator = TopKAccumulator(len(talents), len(jobs), top_k=top_k, group_by=group_by)
+        for talent_start, scores in score_blocks:
+            with self.metrics.timer("search.rank", items=scores.size, unit="pairs"):
+                accumulator.add(talent_start, scores)
+        return self.accumulated_results(talents, jobs, accumulator, columnar)
+
+    def accumulated_results(
+        self, talents: list[dict], jobs: list[dict], accumulator: TopKAccumulator, columnar: bool = False
+    ) -> Union[list, MatchResults]:
+        """
+        Counterpart of rank for score blocks that have already been added to a TopKAccumulator, e.g. the merged
+        accumulators of several processes.
 
         Returns:
-            list[dict]: A list of dictionaries, sorted by descending order of the score. Each dictionary
-            contains the talent, job, predicted label, and score.
+            list: The results in the same layout as match_bulk.
+        """
+        with self.metrics.timer("search.collect_results", unit="pairs") as timer:
+            pair_ids, scores = accumulator.result()
+            if columnar:
+                scored = [np.isfinite(group_scores) for group_scores in scores]
+                group_offsets = np.concatenate(
+                    [[0], np.cumsum([np.count_nonzero(mask) for mask in scored], dtype=np.int64)]
+                )
+                results = MatchResults.from_pair_ids(
+                    talents,
+                    jobs,
+                    np.concatenate([np.empty(0, dtype=np.int64)] + [ids[mask] for ids, mask in zip(pair_ids, scored)]),
+                    np.concatenate([np.empty(0)] + [group_scores[mask] for group_scores, mask in zip(scores, scored)]),
+                    group_offsets if accumulator.group_by is not None else None,
+                )
+                timer.items = len(results)
+                return results
+            grouped_results = []
+            for group_pair_ids, group_scores in zip(pair_ids, scores):
+                scored = np.isfinite(group_scores)
+                grouped_results.append(Search._to_results(talents, jobs, group_pair_ids[scored], group_scores[scored]))
+            timer.items = sum(len(results) for results in grouped_results)
+        return grouped_results if accumulator.group_by is not None else grouped_results[0]
+
+    def _iter_score_blocks(
+        self, talents: list[dict], jobs: list[dict], min_score: Optional[float] = None
+    ) -> Iterator[tuple[int, np.ndarray]]:
+        """
+        Counterpart of iter_extracted_score_blocks for talents and jobs that have not been extracted yet. Each
+        talent and job is extracted exactly once.
+
+        Yields:
+            Tuple
+                int: Index of the first talent of the block.
+                np.ndarray: A (talents in block, len(jobs)) matrix of scores.
         """
-        results = []
-        for talent in talents:
-            for job in jobs:
-                result = self.match(talent, job)
-                results.append(result)
+        if not talents or not jobs:
+            return
+        talent_data = self.extract_talents(talents)
+        job_data = self.extract_jobs(jobs)
+        yield from self.iter_extracted_score_blocks(talent_data, job_data, min_score)
 
-        sorted_results = sorted(results, key=lambda x: x["score"], reverse=True)
-        return sorted_results
+    def _iter_candidate_score_blocks(
+        self, talents: list[dict], candidate_index: CandidateIndex
+    ) -> Iterator[tuple[int, np.ndarray]]:
+        """
+        Counterpart of _iter_score_blocks that only scores the candidate pairs of the index. The scores of pruned
+        pairs are set to -inf.
+        """
+        n_jobs = len(candidate_index.jobs)
+        if not talents or not n_jobs:
+            return
+        talent_data = self.extract_talents(talents)
+        talents_per_block = max(1, self.bulk_pair_chunk_size // n_jobs)
+        n_candidates = 0
+        for start in range(0, len(talents), talents_per_block):
+            stop = min(start + talents_per_block, len(talents))
+            candidates = [candidate_index.candidates(talent_data, row) for row in range(start, stop)]
+            talent_idx = np.repeat(np.arange(start, stop), [len(job_idx) for job_idx in candidates])
+            job_idx = np.concatenate(candidates).astype(np.int64)
+            scores = np.full((stop - start, n_jobs), -np.inf)
+            if len(job_idx):
+                extracted_batch = {
+                    "talent_info": self.feature_extractor.select_rows(talent_data, talent_idx),
+                    "job_info": self.feature_extractor.select_rows(candidate_index.job_data, job_idx),
+                }
+                with self.metrics.timer("search.engineer", items=len(job_idx), unit="pairs"):
+                    features = self.feature_engineer.engineer_batch(extracted_batch)
+                scores[talent_idx - start, job_idx] = self.predict_scores(features)
+            n_candidates += len(job_idx)
+            yield start, scores
+        self.metrics.increment("search.candidate_pairs", n_candidates)
+        self.metrics.increment("search.pruned_pairs", len(talents) * n_jobs - n_candidates)
+        logger.info(f"Scored {n_candidates} of {len(talents) * n_jobs} pairs after candidate pruning")
+
+    def _iter_two_stage_score_blocks(
+        self, talents: list[dict], jobs: list[dict], first_stage: AdditiveScorer, n_candidates: int
+    ) -> Iterator[tuple[int, np.ndarray]]:
+        """
+        Counterpart of _iter_score_blocks that scores every pair with the first stage and only the n_candidates best
+        jobs per talent with the model. The features of the candidates are taken from the engineered block, so no
+        pair is engineered twice. The scores of the other pairs are set to -inf.
+        """
+        if not talents or not jobs:
+            return
+        talent_data = self.extract_talents(talents)
+        job_data = self.extract_jobs(jobs)
+        n_jobs = len(jobs)
+        talents_per_block = max(1, self.bulk_pair_chunk_size // n_jobs)
+        n_reranked = 0
+        for start in range(0, len(talents), talents_per_block):
+            stop = min(start + talents_per_block, len(talents))
+            block_data = self.feature_extractor.select_rows(talent_data, slice(start, stop))
+            with self.metrics.timer("search.engineer", items=(stop - start) * n_jobs, unit="pairs"):
+                features = self.feature_engineer.engineer_cross(block_data, job_data)
+            with self.metrics.timer("search.first_stage", items=len(features), unit="pairs"):
+                candidates = top_k_per_row(first_stage.score(features).reshape(stop - start, n_jobs), n_candidates)
+            pair_rows = (np.arange(stop - start)[:, None] * n_jobs + candidates).ravel()
+            scores = np.full((stop - start, n_jobs), -np.inf)
+            np.put_along_axis(
+                scores, candidates, self.predict_scores(features[pair_rows]).reshape(candidates.shape), axis=1
+            )
+            n_reranked += len(pair_rows)
+            yield start, scores
+        self.metrics.increment("search.reranked_pairs", n_reranked)
+        logger.info(f"Re-scored {n_reranked} of {len(talents) * n_jobs} pairs after the first stage")
+
+    def _open_session(
+        self,
+        talents: list[dict],
+        jobs: list[dict],
+        page_size: int,
+        top_k: Optional[int],
+        min_score: Optional[float],
+    ) -> RankingSession:
+        if not 1 <= page_size <= self.ranking_sessions.max_page_size:
+            raise ValueError(
+                f"page_size must be between 1 and ranking_sessions.max_page_size={self.ranking_sessions.max_page_size}, "
+                f"got {page_size}"
+            )
+        n_pairs = len(talents) * len(jobs)
+        pair_id_dtype = RankingSession.pair_id_dtype(len(talents), len(jobs))
+        max_results = self.ranking_sessions.max_results(pair_id_dtype)
+        if min(n_pairs, top_k or n_pairs) > max_results:
+            logger.warning(
+                f"Limiting the ranking session to the top {max_results} of {n_pairs} pairs, which fit into "
+                f"ranking_sessions.max_bytes"
+            )
+            limit = max_results
+        else:
+            limit = top_k
+        with self.metrics.timer("search.open_ranking", items=n_pairs, unit="pairs"):
+            accumulator = TopKAccumulator(len(talents), len(jobs), top_k=limit)
+            for talent_start, scores in self._iter_score_blocks(talents, jobs, min_score):
+                with self.metrics.timer("search.rank", items=scores.size, unit="pairs"):
+                    accumulator.add(talent_start, scores)
+            pair_ids, scores = accumulator.result()
+            scored = np.isfinite(scores[0])
+            session = RankingSession(
+                talents,
+                jobs,
+                pair_ids[0][scored].astype(pair_id_dtype),
+                np.ascontiguousarray(scores[0][scored]),
+                page_size,
+                top_k,
+                min_score,
+            )
+        self.ranking_sessions.put(session)
+        self.metrics.set_gauge("search.ranking_sessions", len(self.ranking_sessions))
+        self.metrics.set_gauge("search.ranking_session_bytes", self.ranking_sessions.nbytes)
+        return session
+
+    def _page(self, session: RankingSession, offset: int) -> dict:
+        stop = min(offset + session.page_size, len(session))
+        return {
+            "results": self._to_results(
+                session.talents, session.jobs, session.pair_ids[offset:stop], session.scores(offset, stop)
+            ),
+            "offset": offset,
+            "total": len(session),
+            "cursor": self.ranking_sessions.encode_cursor(session.cursor_state(stop)),
+        }
+
+    @staticmethod
+    def _to_results(talents: list[dict], jobs: list[dict], pair_ids: np.ndarray, scores: np.ndarray) -> list[dict]:
+        talent_idx, job_idx = np.divmod(pair_ids, len(jobs))
+        return [
+            {"talent": talents[t], "job": jobs[j], "label": 0 if score < 0.5 else 1, "score": score}
+            for t, j, score in zip(talent_idx.tolist(), job_idx.tolist(), scores)
+        ]
+
+    def _cached_scores(self, extracted_batch: dict) -> (list[bytes], np.ndarray):
+        """
+        Looks up aligned pairs in the score cache, after clearing it if the model or config has been replaced.
+
+        Returns:
+            Tuple
+                list[bytes]: The cache key per pair.
+                np.ndarray: The cached score per pair, NaN for pairs that are not cached.
+        """
+        self.score_cache.validate(self.model, self.config)
+        keys = self.score_cache.pair_keys(extracted_batch)
+        scores = self.score_cache.get_many(keys)
+        n_misses = int(np.count_nonzero(np.isnan(scores)))
+        self.metrics.increment("search.score_cache_hits", len(keys) - n_misses)
+        self.metrics.increment("search.score_cache_misses", n_misses)
+        return keys, scores
@@ -0,0 +1,157 @@
+"""
+Module for serving match requests with asyncio, coalescing concurrent requests into micro-batches.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Optional
+
+from src.search import Search
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatchMatcher:
+    def __init__(
+        self,
+        search: Search,
+        max_batch_size: Optional[int] = None,
+        max_wait_us: Optional[float] = None,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        """
+        Initialize a new instance of the MicroBatchMatcher class.
+
+        Concurrent calls of match are queued. A background task takes the first queued request, waits at most
+        max_wait_us for further requests until max_batch_size requests are collected, and scores the whole batch with
+        a single Search.match_pairs call on an executor thread, so the event loop keeps accepting requests meanwhile.
+
+        Parameters:
+        - search (Search): The search used to score the batches.
+        - max_batch_size (int): Maximum number of requests per batch. Defaults to serving.max_batch_size.
+        - max_wait_us (float): Maximum time in microseconds a batch waits for further requests once its first request
+          arrived. Defaults to serving.max_wait_us.
+        - executor (Executor): Executor the batches are scored on. Defaults to a single thread.
+
+        Returns:
+        - None
+        """
+        self.search = search
+        self.max_batch_size = max_batch_size or self.search.config.get("serving.max_batch_size", 64)
+        if max_wait_us is None:
+            max_wait_us = self.search.config.get("serving.max_wait_us", 500)
+        self.max_wait_us = max_wait_us
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="match-batch")
+        self._queue = None
+        self._batch_task = None
+        self.n_requests = 0
+        self.n_batches = 0
+        self.batch_size_counts = Counter()
+
+    async def __aenter__(self) -> "MicroBatchMatcher":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._batch_task = asyncio.create_task(self._batch_loop())
+
+    async def stop(self) -> None:
+        """
+        Stops the background task after all queued requests have been scored.
+        """
+        await self._queue.join()
+        self._batch_task.cancel()
+        try:
+            await self._batch_task
+        except asyncio.CancelledError:
+            pass
+        self._batch_task = None
+
+    async def match(self, talent: dict, job: dict) -> dict:
+        """
+        Asynchronous counterpart of Search.match.
+
+        Args:
+            talent: A dictionary representing a talent with relevant attributes.
+            job: A dictionary representing a job with relevant attributes.
+
+        Returns:
+            A dictionary containing the talent, job, predicted label, and score.
+        """
+        if self._batch_task is None:
+            raise RuntimeError("MicroBatchMatcher has not been started")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((talent, job, future))
+        return await future
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: The current queue depth and statistics of the batch sizes scored so far.
+        """
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "requests": self.n_requests,
+            "batches": self.n_batches,
+            "mean_batch_size": self.n_requests / self.n_batches if self.n_batches else 0.0,
+            "max_batch_size": max(self.batch_size_counts, default=0),
+            "batch_size_histogram": dict(sorted(self.batch_size_counts.items())),
+        }
+
+    def _match_one_by_one(self, talents: tuple[dict], jobs: tuple[dict]) -> list:
+        results = []
+        for talent, job in zip(talents, jobs):
+            try:
+                results.append(self.search.match_pairs([talent], [job])[0])
+            except Exception as exception:
+                results.append(exception)
+        return results
+
+    async def _batch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_us / 1e6
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._score_batch(batch)
+
+    async def _score_batch(self, batch: list[tuple]) -> None:
+        talents, jobs, futures = zip(*batch)
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.search.match_pairs, list(talents), list(jobs)
+            )
+        except Exception:
+            logger.exception(f"Scoring a batch of {len(batch)} match requests failed, scoring them one by one")
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._match_one_by_one, talents, jobs
+            )
+
+        for future, result in zip(futures, results):
+            if future.cancelled():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+        self.n_requests += len(batch)
+        self.n_batches += 1
+        self.batch_size_counts[len(batch)] += 1
+        for _ in batch:
+            self._queue.task_done()
@@ -0,0 +1,389 @@
+"""
+Module for deploying a model together with a precomputed job catalogue into shared, read-only memory-mapped files, so
+many search worker processes use one copy of them and switch to a newly published version without a restart.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import weakref
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from src.artifact import export_artifact, load_artifact
+from src.feature_engineering import FeatureEngineer
+from src.feature_extraction import FeatureExtractor
+from src.results import MatchResults
+from src.search import Search
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+ARTIFACT_DIR = "artifact"
+CATALOGUE_DIR = "catalogue"
+# Workers hold a shared flock on this file of every version they have mapped, so it is not pruned under them
+READERS_LOCK_FILE = "readers.lock"
+# Fields of /proc/self/smaps_rollup reported by memory_usage, summed per key
+_SMAPS_FIELDS = {
+    "rss": ("Rss",),
+    "pss": ("Pss",),
+    "shared": ("Shared_Clean", "Shared_Dirty"),
+    "private": ("Private_Clean", "Private_Dirty"),
+}
+
+
+def publish_deployment(
+    model, config, jobs: list[dict], path: Union[str, Path], keep_versions: Optional[int] = None
+) -> str:
+    """
+    This method publishes a new version of the model and the job catalogue to a deployment directory:
+
+    - versions/<version>/artifact/: the model and the resolved config, see export_artifact,
+    - versions/<version>/catalogue/: one .npy file per side array of FeatureExtractor.extract_job_batch of the jobs,
+      and the JSON of every job, concatenated into one byte array with the offset of every job,
+    - CURRENT: the name of the current version.
+
+    A version is written to a temporary directory and renamed into place before CURRENT is replaced, so workers only
+    ever see complete versions. Older versions are removed once more than keep_versions versions exist, except for
+    versions that a worker still has mapped, which are removed by a later publish. A single publishing process is
+    assumed.
+
+    For memory that is never written back to disk, place the deployment on a tmpfs such as /dev/shm.
+
+    Args:
+        model: A fitted GradientBoostingClassifier (e.g. as returned by Trainer.load_model) or a CompiledModel.
+        config: The configuration settings, a ConfigTree or a ResolvedConfig.
+        jobs: The job catalogue the workers match against.
+        path: Directory of the deployment. It is created if it does not exist.
+        keep_versions: Number of versions kept, including the new one. Defaults to shared_deployment.keep_versions.
+
+    Returns:
+        str: The name of the published version.
+    """
+    path = Path(path)
+    keep_versions = keep_versions or config.get("shared_deployment.keep_versions", 2)
+    versions_path = path / VERSIONS_DIR
+    versions_path.mkdir(parents=True, exist_ok=True)
+    existing_versions = _list_versions(versions_path)
+    version = f"v{int(existing_versions[-1][1:]) + 1 if existing_versions else 1:06d}"
+
+    tmp_path = versions_path / f".{version}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    export_artifact(model, config, tmp_path / ARTIFACT_DIR)
+    _write_catalogue(FeatureExtractor(config), jobs, tmp_path / CATALOGUE_DIR)
+    (tmp_path / READERS_LOCK_FILE).touch()
+    os.replace(tmp_path, versions_path / version)
+
+    tmp_current = path / f"{CURRENT_FILE}.tmp"
+    tmp_current.write_text(version)
+    os.replace(tmp_current, path / CURRENT_FILE)
+    logger.info(f"Published deployment version {version} with {len(jobs)} jobs to {path}")
+
+    for old_version in _list_versions(versions_path)[:-keep_versions]:
+        if _remove_unmapped_version(versions_path / old_version):
+            logger.info(f"Removed deployment version {old_version}")
+        else:
+            logger.info(f"Kept deployment version {old_version}, which is still mapped by a worker")
+    return version
+
+
+def memory_usage() -> dict:
+    """
+    This method reads the memory usage of the current process from /proc/self/smaps_rollup (Linux only).
+
+    Returns:
+        dict: Resident (rss), proportional (pss, shared pages divided by the number of processes mapping them),
+        shared and private memory in bytes, or an empty dict if smaps_rollup is not available.
+    """
+    try:
+        with open("/proc/self/smaps_rollup", "r") as file:
+            lines = file.readlines()
+    except OSError:
+        return {}
+    values = {}
+    for line in lines:
+        parts = line.split()
+        if len(parts) == 3 and parts[2] == "kB":
+            values[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    return {key: sum(values.get(field, 0) for field in fields) for key, fields in _SMAPS_FIELDS.items()}
+
+
+class SharedJobs(Sequence):
+    def __init__(self, data: np.ndarray, offsets: np.ndarray) -> None:
+        """
+        Initialize a new instance of the SharedJobs class, a read-only list of jobs backed by the memory-mapped JSON of
+        a published catalogue. A job is decoded on access, so the catalogue costs no memory per worker until its jobs
+        are returned in results.
+
+        Parameters:
+        - data (np.ndarray): The concatenated UTF-8 JSON of all jobs as uint8 array.
+        - offsets (np.ndarray): (n_jobs + 1,) start of every job within data, followed by the length of data.
+
+        Returns:
+        - None
+        """
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx: Union[int, slice]) -> Union[dict, list[dict]]:
+        if isinstance(idx, slice):
+            return [self[position] for position in range(*idx.indices(len(self)))]
+        idx = int(idx)
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(f"job index {idx} out of range for {len(self)} jobs")
+        return json.loads(self.data[self.offsets[idx] : self.offsets[idx + 1]].tobytes())
+
+
+class DeployedVersion:
+    def __init__(
+        self, version: str, search: Search, jobs: SharedJobs, job_data: dict, lock_fd: Optional[int] = None
+    ) -> None:
+        """
+        Initialize a new instance of the DeployedVersion class, one published version as attached by a worker.
+
+        Parameters:
+        - version (str): Name of the version.
+        - search (Search): A search scoring with the memory-mapped model of the version.
+        - jobs (SharedJobs): The job catalogue of the version.
+        - job_data (dict): The memory-mapped side arrays of the jobs, see FeatureExtractor.extract_job_batch.
+        - lock_fd (int): Descriptor of the readers lock file of the version, closed (and the lock released) when this
+          instance is garbage collected.
+
+        Returns:
+        - None
+        """
+        self.version = version
+        self.search = search
+        self.jobs = jobs
+        self.job_data = job_data
+        if lock_fd is not None:
+            weakref.finalize(self, os.close, lock_fd)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], version: str, **search_kwargs) -> "DeployedVersion":
+        """
+        This method attaches to a published version, memory-mapping its model and catalogue read-only. A shared lock
+        on the readers lock file of the version is taken first and held as long as the version is attached, so
+        publish_deployment does not remove the version in the meantime.
+
+        Args:
+            path: Directory of the deployment.
+            version: Name of the version.
+            search_kwargs: Further keyword arguments of Search, e.g. metrics.
+
+        Returns:
+            DeployedVersion: The attached version.
+        """
+        version_path = Path(path) / VERSIONS_DIR / version
+        lock_fd = os.open(version_path / READERS_LOCK_FILE, os.O_RDONLY)
+        try:
+            # fails while the publisher holds the exclusive lock to remove the version
+            fcntl.flock(lock_fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            return cls._load_locked(version_path, version, lock_fd, **search_kwargs)
+        except BaseException:
+            os.close(lock_fd)
+            raise
+
+    @classmethod
+    def _load_locked(cls, version_path: Path, version: str, lock_fd: int, **search_kwargs) -> "DeployedVersion":
+        config, model = load_artifact(version_path / ARTIFACT_DIR)
+        search = Search(config, FeatureExtractor(config), FeatureEngineer(config), model, **search_kwargs)
+        catalogue_path = version_path / CATALOGUE_DIR
+        with open(catalogue_path / "catalogue.json", "r") as file:
+            array_names = json.load(file)["arrays"]
+        job_data = search.feature_extractor.unflatten_side_data(
+            {name: np.load(catalogue_path / f"{name}.npy", mmap_mode="r") for name in array_names}
+        )
+        jobs = SharedJobs(
+            np.load(catalogue_path / "jobs.npy", mmap_mode="r"), np.load(catalogue_path / "offsets.npy", mmap_mode="r")
+        )
+        return cls(version, search, jobs, job_data, lock_fd)
+
+    def mapped_bytes(self) -> int:
+        """
+        Returns:
+            int: Size of the memory-mapped arrays of the model and the catalogue, which all workers share.
+        """
+        arrays = list(FeatureExtractor.flatten_side_data(self.job_data).values()) + [self.jobs.data, self.jobs.offsets]
+        arrays += [self.search.model.features, self.search.model.thresholds, self.search.model.leaf_values]
+        return int(sum(array.nbytes for array in arrays))
+
+
+class SharedDeployment:
+    def __init__(self, path: Union[str, Path], check_interval_seconds: Optional[float] = None, **search_kwargs) -> None:
+        """
+        Initialize a new instance of the SharedDeployment class, the worker side of publish_deployment.
+
+        The worker attaches to the current version: the arrays of the compiled model, the extracted side arrays of the
+        job catalogue and the JSON of the jobs are memory-mapped read-only, so their pages are shared by all workers
+        instead of being unpickled, extracted or parsed once per worker. Only the small lookup tables of the config
+        are built per worker.
+
+        At most every check_interval_seconds, the next call of current (and hence match_bulk) checks whether a new
+        version was published and, if so, attaches to it and replaces the current version by a single reference
+        swap. Calls that are running keep using the version they started with, and the previous version is unmapped
+        once they finished. If the new version cannot be attached, e.g. because it was removed between reading
+        CURRENT and mapping its files, the error is logged and the current version keeps serving until the next
+        check. A score cache passed in search_kwargs is cleared on the switch, see ScoreCache.validate.
+
+        Parameters:
+        - path (str): Directory of the deployment, see publish_deployment.
+        - check_interval_seconds (float): Minimum time between two checks for a new version. Defaults to
+          shared_deployment.check_interval_seconds of the published config.
+        - search_kwargs: Further keyword arguments of Search, e.g. metrics or score_cache.
+
+        Returns:
+        - None
+        """
+        self.path = Path(path)
+        self.search_kwargs = search_kwargs
+        self.n_swaps = 0
+        self.n_failed_refreshes = 0
+        self._lock = threading.Lock()
+        self._current = None
+        self.refresh()
+        if check_interval_seconds is None:
+            check_interval_seconds = self._current.search.config.get("shared_deployment.check_interval_seconds", 1.0)
+        self.check_interval_seconds = check_interval_seconds
+        self._checked_at = time.monotonic()
+
+    @property
+    def version(self) -> str:
+        return self._current.version
+
+    @property
+    def search(self) -> Search:
+        return self.current().search
+
+    def current(self) -> DeployedVersion:
+        """
+        Returns:
+            DeployedVersion: The current version, after switching to a newly published one if the check is due.
+                Use the returned object for the whole request, so all of it is served by the same version.
+        """
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval_seconds:
+            self._checked_at = now
+            self.refresh()
+        return self._current
+
+    def refresh(self) -> bool:
+        """
+        This method switches to the version named in CURRENT, if it differs from the current one. Errors while
+        attaching to it are only raised if there is no current version yet, i.e. on initialization.
+
+        Returns:
+            bool: Whether the worker switched to another version.
+        """
+        try:
+            version = (self.path / CURRENT_FILE).read_text().strip()
+            if self._current is not None and self._current.version == version:
+                return False
+            with self._lock:
+                previous = self._current
+                if previous is not None and previous.version == version:
+                    return False
+                self._current = DeployedVersion.load(self.path, version, **self.search_kwargs)
+        except Exception as error:
+            if self._current is None:
+                raise
+            self.n_failed_refreshes += 1
+            logger.warning(
+                f"Keeping deployment version {self._current.version}, attaching the published version failed: "
+                f"{error!r}"
+            )
+            return False
+        if previous is not None:
+            self.n_swaps += 1
+            logger.info(f"Switched from deployment version {previous.version} to {version}")
+        return True
+
+    def match_bulk(
+        self,
+        talents: list[dict],
+        top_k: Optional[int] = None,
+        group_by: Optional[str] = None,
+        columnar: bool = False,
+        min_score: Optional[float] = None,
+    ) -> Union[list, MatchResults]:
+        """
+        Counterpart of Search.match_bulk that matches the talents against the shared job catalogue, with the same
+        results as Search.match_bulk(talents, jobs, top_k, group_by, columnar, min_score) for the jobs of the
+        catalogue.
+        """
+        deployed = self.current()
+        search = deployed.search
+        if not talents or not len(deployed.jobs):
+            return search.match_bulk(talents, [], top_k=top_k, group_by=group_by, columnar=columnar)
+        talent_data = search.extract_talents(talents)
+        score_blocks = search.iter_extracted_score_blocks(talent_data, deployed.job_data, min_score)
+        return search.rank(talents, deployed.jobs, score_blocks, top_k, group_by, columnar)
+
+    def memory_report(self) -> dict:
+        """
+        Returns:
+            dict: The current version, the number of version switches, the bytes of the shared memory-mapped arrays
+            and the memory usage of this process, see memory_usage.
+        """
+        deployed = self._current
+        return {
+            "version": deployed.version,
+            "swaps": self.n_swaps,
+            "failed_refreshes": self.n_failed_refreshes,
+            "jobs": len(deployed.jobs),
+            "mapped_bytes": deployed.mapped_bytes(),
+            **memory_usage(),
+        }
+
+
+def _list_versions(versions_path: Path) -> list[str]:
+    return sorted(entry.name for entry in versions_path.iterdir() if entry.is_dir() and entry.name.startswith("v"))
+
+
+def _remove_unmapped_version(version_path: Path) -> bool:
+    """
+    Removes a version unless a worker holds a shared lock on its readers lock file.
+
+    Returns:
+        bool: Whether the version was removed.
+    """
+    try:
+        lock_fd = os.open(version_path / READERS_LOCK_FILE, os.O_RDONLY)
+    except FileNotFoundError:
+        shutil.rmtree(version_path, ignore_errors=True)
+        return True
+    try:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(lock_fd)
+        return False
+    try:
+        shutil.rmtree(version_path, ignore_errors=True)
+    finally:
+        os.close(lock_fd)
+    return True
+
+
+def _write_catalogue(feature_extractor: FeatureExtractor, jobs: list[dict], path: Path) -> None:
+    path.mkdir(parents=True, exist_ok=True)
+    side_data = feature_extractor.flatten_side_data(feature_extractor.extract_job_batch(jobs))
+    for name, values in side_data.items():
+        np.save(path / f"{name}.npy", values)
+    encoded_jobs = [json.dumps(job, separators=(",", ":")).encode() for job in jobs]
+    np.save(path / "jobs.npy", np.frombuffer(b"".join(encoded_jobs), dtype=np.uint8))
+    np.save(path / "offsets.npy", np.cumsum([0] + [len(job) for job in encoded_jobs], dtype=np.int64))
+    with open(path / "catalogue.json", "w") as file:
+        json.dump({"n_jobs": len(jobs), "arrays": list(side_data)}, file, indent=2)
@@ -0,0 +1,304 @@
+"""
+Module for out-of-core bulk scoring of talents and jobs read from JSON Lines files, in tiles of bounded size.
+"""
+
+import json
+import logging
+import tempfile
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+import numpy as np
+
+from src.ranking import GROUP_BY_OPTIONS, merge_top_k, top_k_per_row
+from src.results import MatchResults
+from src.search import Search
+
+logger = logging.getLogger(__name__)
+
+
+def iter_jsonl_chunks(path: Union[str, Path], chunk_size: int) -> Iterator[list[dict]]:
+    """
+    This method streams a JSON Lines file in chunks of chunk_size records, skipping empty lines.
+    """
+    with open(path, "r") as file:
+        records = (json.loads(line) for line in file if line.strip())
+        while chunk := list(islice(records, chunk_size)):
+            yield chunk
+
+
+class ScoreTile:
+    __slots__ = ("talent_start", "job_start", "scores")
+
+    def __init__(self, talent_start: int, job_start: int, scores: np.ndarray) -> None:
+        """
+        Initialize a new instance of the ScoreTile class, the scores of a block of consecutive talents against a
+        block of consecutive jobs, as yielded by StreamingSearch.iter_tiles.
+
+        Talents and jobs are referred to by their position in their file, the profiles themselves are not kept. The
+        rows of a tile are in the order of talent and then job position, i.e. of scores.ravel().
+
+        Parameters:
+        - talent_start (int): Position of the first talent of the tile.
+        - job_start (int): Position of the first job of the tile.
+        - scores (np.ndarray): (talents in tile, jobs in tile) matrix of scores.
+
+        Returns:
+        - None
+        """
+        self.talent_start = talent_start
+        self.job_start = job_start
+        self.scores = scores
+
+    @property
+    def talent_idx(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: (n,) position of the talent of every row of the tile.
+        """
+        return np.repeat(np.arange(self.talent_start, self.talent_start + self.scores.shape[0]), self.scores.shape[1])
+
+    @property
+    def job_idx(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: (n,) position of the job of every row of the tile.
+        """
+        return np.tile(np.arange(self.job_start, self.job_start + self.scores.shape[1]), self.scores.shape[0])
+
+    def __len__(self) -> int:
+        return self.scores.size
+
+    def __iter__(self) -> Iterator[dict]:
+        """
+        Yields:
+            dict: Per row the talent_idx, job_idx, label and score, in the format of MatchResults.to_jsonl.
+        """
+        for talent, job, score in zip(self.talent_idx.tolist(), self.job_idx.tolist(), self.scores.ravel().tolist()):
+            yield {"talent_idx": talent, "job_idx": job, "label": 0 if score < 0.5 else 1, "score": score}
+
+    def __repr__(self) -> str:
+        return f"ScoreTile(talent_start={self.talent_start}, job_start={self.job_start}, shape={self.scores.shape})"
+
+    def to_results(self, talents: list[dict], jobs: list[dict]) -> MatchResults:
+        """
+        Args:
+            talents: All talents of the talents file, indexed by their position.
+            jobs: All jobs of the jobs file, indexed by their position.
+
+        Returns:
+            MatchResults: The results of the tile, referring to the given talents and jobs.
+        """
+        return MatchResults(talents, jobs, self.talent_idx, self.job_idx, self.scores.ravel())
+
+
+class StreamingSearch:
+    def __init__(
+        self,
+        search: Search,
+        talent_chunk_size: Optional[int] = None,
+        job_chunk_size: Optional[int] = None,
+        spill_dir: Optional[Union[str, Path]] = None,
+    ) -> None:
+        """
+        Initialize a new instance of the StreamingSearch class, the out-of-core counterpart of Search.match_bulk.
+
+        The jobs are read once, chunk by chunk, and the extracted side arrays of every job chunk are spilled to a
+        temporary file. The talents are then read chunk by chunk, and every talent chunk is scored against one job
+        chunk after the other. Only one talent chunk, one job chunk and the score tile of both are held in memory at
+        a time, apart from the running top-k results (see score_to_jsonl). Talents and jobs are referred to by their
+        line position among the non-empty lines of their file.
+
+        Parameters:
+        - search (Search): The search providing the feature extractor, the feature engineer and the model.
+        - talent_chunk_size (int): Number of talents per tile. Defaults to streaming.talent_chunk_size.
+        - job_chunk_size (int): Number of jobs per tile. Defaults to streaming.job_chunk_size.
+        - spill_dir (str): Directory the temporary job chunk files are created in. Defaults to the system default.
+
+        Returns:
+        - None
+        """
+        self.search = search
+        config = self.search.config
+        self.talent_chunk_size = talent_chunk_size or config.get("streaming.talent_chunk_size", 1000)
+        self.job_chunk_size = job_chunk_size or config.get("streaming.job_chunk_size", 10_000)
+        self.spill_dir = spill_dir
+
+    def iter_tiles(self, talents_path: Union[str, Path], jobs_path: Union[str, Path]) -> Iterator["ScoreTile"]:
+        """
+        This method scores every combination of the talents and jobs of the given files tile by tile.
+
+        Args:
+            talents_path: JSON Lines file with one talent per line.
+            jobs_path: JSON Lines file with one job per line.
+
+        Yields:
+            ScoreTile: The scores of one tile of consecutive talents and consecutive jobs.
+        """
+        for talent_start, job_start, scores in self._iter_score_tiles(talents_path, jobs_path):
+            yield ScoreTile(talent_start, job_start, scores)
+
+    def score_to_jsonl(
+        self,
+        talents_path: Union[str, Path],
+        jobs_path: Union[str, Path],
+        output_path: Union[str, Path],
+        top_k: Optional[int] = None,
+        group_by: Optional[str] = None,
+        min_score: Optional[float] = None,
+    ) -> dict:
+        """
+        This method scores the talents and jobs of the given files and writes the results to a JSON Lines file with
+        the keys talent_idx, job_idx, label and score, see MatchResults.to_jsonl.
+
+        - Without top_k, all results with at least min_score are appended tile by tile, in tile order.
+        - With group_by "talent", the top_k jobs per talent are written once all jobs of a talent chunk are scored.
+        - With group_by "job" or None, the top_k talents per job (or the top_k results overall) are kept in memory
+          and written at the end, so memory additionally grows with top_k times the number of jobs (or top_k).
+
+        The results of the top_k modes are identical to Search.match_bulk with the same top_k and group_by.
+
+        Args:
+            talents_path: JSON Lines file with one talent per line.
+            jobs_path: JSON Lines file with one job per line.
+            output_path: Path of the JSON Lines output file.
+            top_k: If given, only the top_k best scored results are written (per group, if group_by is set).
+            group_by: None, "talent" or "job", see Search.match_bulk.
+            min_score: If given, only results with at least this score are written.
+
+        Returns:
+            dict: Number of talents, jobs, scored pairs and written results.
+        """
+        if group_by not in GROUP_BY_OPTIONS:
+            raise ValueError(f"group_by must be one of {GROUP_BY_OPTIONS}, got {group_by!r}")
+        if group_by is not None and top_k is None:
+            raise ValueError("group_by requires top_k")
+        summary = {"talents": 0, "jobs": 0, "scored_pairs": 0, "written_results": 0}
+        # running top-k per group, padded with -inf scores: rows of the current talent chunk for "talent", rows of
+        # all jobs for "job" and a single row for None
+        best_ids, best_scores, chunk_start = None, None, None
+
+        with open(output_path, "w") as file:
+
+            def write(talent_idx: np.ndarray, job_idx: np.ndarray, scores: np.ndarray) -> None:
+                results = MatchResults(None, None, talent_idx, job_idx, scores).filter(np.isfinite(scores), min_score)
+                results.to_jsonl(file)
+                summary["written_results"] += len(results)
+
+            def write_best() -> None:
+                if group_by == "talent":
+                    talent_idx = np.repeat(np.arange(chunk_start, chunk_start + len(best_ids)), top_k)
+                    write(talent_idx, best_ids.ravel(), best_scores.ravel())
+                elif group_by == "job":
+                    write(best_ids.ravel(), np.repeat(np.arange(len(best_ids)), top_k), best_scores.ravel())
+                else:
+                    talent_idx, job_idx = np.divmod(best_ids.ravel(), max(summary["jobs"], 1))
+                    write(talent_idx, job_idx, best_scores.ravel())
+
+            for talent_start, job_start, scores in self._iter_score_tiles(talents_path, jobs_path, summary, min_score):
+                n_talents, n_jobs = scores.shape
+                summary["scored_pairs"] += scores.size
+                if top_k is None:
+                    talent_idx, job_idx = np.indices(scores.shape)
+                    write((talent_idx + talent_start).ravel(), (job_idx + job_start).ravel(), scores.ravel())
+                    continue
+
+                if group_by == "talent":
+                    if talent_start != chunk_start:
+                        if best_ids is not None:
+                            write_best()
+                        best_ids, best_scores = self._empty_top_k(n_talents, top_k)
+                        chunk_start = talent_start
+                    rows = slice(0, n_talents)
+                    cols = top_k_per_row(scores, top_k)
+                    tile_ids, tile_scores = cols + job_start, np.take_along_axis(scores, cols, axis=1)
+                elif group_by == "job":
+                    if best_ids is None:
+                        best_ids, best_scores = self._empty_top_k(summary["jobs"], top_k)
+                    rows = slice(job_start, job_start + n_jobs)
+                    cols = top_k_per_row(scores.T, top_k)
+                    tile_ids, tile_scores = cols + talent_start, np.take_along_axis(scores.T, cols, axis=1)
+                else:
+                    if best_ids is None:
+                        best_ids, best_scores = self._empty_top_k(1, top_k)
+                    rows = slice(0, 1)
+                    # pair ids break ties like match_bulk and are decoded into positions when written
+                    pair_ids = (np.arange(talent_start, talent_start + n_talents)[:, None] * summary["jobs"]) + (
+                        np.arange(job_start, job_start + n_jobs)
+                    )
+                    cols = top_k_per_row(scores.reshape(1, -1), top_k)
+                    tile_ids = np.take_along_axis(pair_ids.reshape(1, -1), cols, axis=1)
+                    tile_scores = np.take_along_axis(scores.reshape(1, -1), cols, axis=1)
+                best_ids[rows], best_scores[rows] = merge_top_k(
+                    [best_ids[rows], tile_ids], [best_scores[rows], tile_scores], top_k
+                )
+
+            if best_ids is not None:
+                write_best()
+
+        logger.info(f"Streamed scoring finished: {summary}")
+        return summary
+
+    @staticmethod
+    def _empty_top_k(n_rows: int, top_k: int) -> (np.ndarray, np.ndarray):
+        return np.full((n_rows, top_k), -1, dtype=np.int64), np.full((n_rows, top_k), -np.inf)
+
+    def _iter_score_tiles(
+        self,
+        talents_path: Union[str, Path],
+        jobs_path: Union[str, Path],
+        summary: Optional[dict] = None,
+        min_score: Optional[float] = None,
+    ) -> Iterator[tuple[int, int, np.ndarray]]:
+        """
+        With min_score, the scores of pairs below it are set to -inf, see Search.match_bulk.
+
+        Yields:
+            Tuple
+                int: Position of the first talent of the tile.
+                int: Position of the first job of the tile.
+                np.ndarray: A (talents in tile, jobs in tile) matrix of scores.
+        """
+        summary = summary if summary is not None else {}
+        with tempfile.TemporaryDirectory(prefix="streaming_search_", dir=self.spill_dir) as tmp_dir:
+            job_chunks = self._spill_job_chunks(jobs_path, Path(tmp_dir))
+            summary["jobs"] = sum(n_jobs for _, _, n_jobs in job_chunks)
+            summary["talents"] = 0
+            if not job_chunks:
+                return
+            for talent_chunk in iter_jsonl_chunks(talents_path, self.talent_chunk_size):
+                talent_start = summary["talents"]
+                summary["talents"] += len(talent_chunk)
+                talent_data = self.search.feature_extractor.extract_talent_batch(talent_chunk)
+                del talent_chunk
+                for job_start, chunk_path, n_jobs in job_chunks:
+                    with np.load(chunk_path) as arrays:
+                        job_data = self.search.feature_extractor.unflatten_side_data(dict(arrays))
+                    with self.search.metrics.timer(
+                        "search.stream_tile", items=len(talent_data["role_mask"]) * n_jobs, unit="pairs"
+                    ):
+                        scores = np.empty((len(talent_data["role_mask"]), n_jobs))
+                        for block_start, block_scores in self.search.iter_extracted_score_blocks(
+                            talent_data, job_data, min_score
+                        ):
+                            scores[block_start : block_start + len(block_scores)] = block_scores
+                    yield talent_start, job_start, scores
+
+    def _spill_job_chunks(self, jobs_path: Union[str, Path], tmp_dir: Path) -> list[tuple[int, Path, int]]:
+        """
+        Extracts the jobs chunk by chunk and writes the side arrays of every chunk to its own .npz file.
+
+        Returns:
+            list: Per chunk the position of its first job, the path of its file and its number of jobs.
+        """
+        feature_extractor = self.search.feature_extractor
+        job_chunks = []
+        job_start = 0
+        for chunk in iter_jsonl_chunks(jobs_path, self.job_chunk_size):
+            chunk_path = tmp_dir / f"jobs_{len(job_chunks)}.npz"
+            np.savez(chunk_path, **feature_extractor.flatten_side_data(feature_extractor.extract_job_batch(chunk)))
+            job_chunks.append((job_start, chunk_path, len(chunk)))
+            job_start += len(chunk)
+        logger.info(f"Extracted {job_start} jobs in {len(job_chunks)} chunks")
+        return job_chunks
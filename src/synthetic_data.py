@@ -0,0 +1,145 @@
+"""
+Module for generating synthetic talents, jobs and labeled training examples from the universes of the config.
+"""
+
+import numpy as np
+from pyhocon import ConfigTree
+
+# Languages and job roles outside the universes of the config, used to exercise the filtering of the extraction
+EXTRA_LANGUAGES = ["French", "Spanish", "Turkish", "Russian", "Italian"]
+EXTRA_ROLES = ["data-protection-officer", "game-developer", "recruiter"]
+
+
+class SyntheticProfileGenerator:
+    def __init__(self, config: ConfigTree, seed: int = 42, skew: float = 1.0, noise_rate: float = 0.05) -> None:
+        """
+        Initialize a new instance of the SyntheticProfileGenerator class.
+
+        Parameters:
+        - config (ConfigTree): The configuration settings providing the universes and rank mappings.
+        - seed (int): Seed of the random generator, equal seeds produce equal profiles.
+        - skew (float): Zipf exponent of the role popularity, 0 draws all roles of the job_role_universe uniformly.
+        - noise_rate (float): Probability of adding a role or language outside the universes to a profile.
+
+        Returns:
+        - None
+        """
+        self.rng = np.random.default_rng(seed)
+        self.roles = list(config.job_role_universe)
+        role_weights = 1.0 / np.arange(1, len(self.roles) + 1) ** skew
+        self.role_probabilities = role_weights / role_weights.sum()
+        self.languages = list(config.job_language_universe)
+        self.ratings = list(config.language_rating_rank_mapping)
+        self.rating_ranks = dict(config.language_rating_rank_mapping)
+        self.seniorities = list(config.seniority_rank_mapping)
+        self.seniority_ranks = dict(config.seniority_rank_mapping)
+        self.degrees = list(config.degree_rank_mapping)
+        self.degree_ranks = dict(config.degree_rank_mapping)
+        self.noise_rate = noise_rate
+
+    def talents(self, n: int) -> list[dict]:
+        return [self.talent() for _ in range(n)]
+
+    def jobs(self, n: int) -> list[dict]:
+        return [self.job() for _ in range(n)]
+
+    def talent(self) -> dict:
+        languages = [{"rating": self._choice(self.ratings), "title": language} for language in self._languages()]
+        return {
+            "languages": languages,
+            "job_roles": self._roles(max_roles=5),
+            "seniority": self._choice(self.seniorities),
+            "salary_expectation": int(self.rng.integers(30, 121)) * 1000,
+            "degree": self._choice(self.degrees),
+        }
+
+    def job(self) -> dict:
+        languages = [
+            {"title": language, "rating": self._choice(self.ratings), "must_have": bool(self.rng.random() < 0.7)}
+            for language in self._languages()
+        ]
+        n_seniorities = int(self.rng.integers(1, 3))
+        first_seniority = int(self.rng.integers(0, len(self.seniorities) - n_seniorities + 1))
+        return {
+            "languages": languages,
+            "job_roles": self._roles(max_roles=2),
+            "seniorities": self.seniorities[first_seniority : first_seniority + n_seniorities],
+            "max_salary": int(self.rng.integers(30, 121)) * 1000,
+            "min_degree": self._choice(self.degrees[:3]),
+        }
+
+    def training_data(self, n: int, positive_rate: float = 0.5) -> list[dict]:
+        """
+        This method generates labeled examples in the format of data.json. A share of positive_rate of the jobs is
+        derived from the talent so that it fits, the others are drawn independently. The label states whether the
+        job fits the talent according to is_match.
+
+        Args:
+            n: Number of examples.
+            positive_rate: Share of jobs that are derived from the talent.
+
+        Returns:
+            list[dict]: Examples with the keys talent, job and label.
+        """
+        data = []
+        for _ in range(n):
+            talent = self.talent()
+            job = self._matching_job(talent) if self.rng.random() < positive_rate else self.job()
+            data.append({"talent": talent, "job": job, "label": int(self.is_match(talent, job))})
+        return data
+
+    def is_match(self, talent: dict, job: dict) -> bool:
+        """
+        Rule defining the synthetic labels: the talent covers a role and all must-have languages of the job, fits
+        its seniorities and degree, and does not expect more than the maximum salary.
+        """
+        talent_ratings = {
+            language["title"]: self.rating_ranks.get(language["rating"], 0) for language in talent["languages"]
+        }
+        languages_covered = all(
+            talent_ratings.get(language["title"], 0) >= self.rating_ranks.get(language["rating"], 0)
+            for language in job["languages"]
+            if language["must_have"]
+        )
+        return (
+            bool(set(talent["job_roles"]) & set(job["job_roles"]))
+            and languages_covered
+            and talent["seniority"] in job["seniorities"]
+            and self.degree_ranks[talent["degree"]] >= self.degree_ranks[job["min_degree"]]
+            and talent["salary_expectation"] <= job["max_salary"]
+        )
+
+    def _matching_job(self, talent: dict) -> dict:
+        job = self.job()
+        talent_roles = [role for role in talent["job_roles"] if role in self.roles] or self.roles[:1]
+        job["job_roles"] = [self._choice(talent_roles)]
+        job["seniorities"] = [talent["seniority"]]
+        job["max_salary"] = talent["salary_expectation"] + int(self.rng.integers(0, 20)) * 1000
+        talent_degree_rank = self.degree_ranks[talent["degree"]]
+        job["min_degree"] = self._choice(
+            [degree for degree in self.degrees if self.degree_ranks[degree] <= talent_degree_rank]
+        )
+        job["languages"] = [
+            {"title": language["title"], "rating": language["rating"], "must_have": True}
+            for language in talent["languages"]
+            if language["title"] in self.languages
+        ] or job["languages"]
+        return job
+
+    def _roles(self, max_roles: int) -> list[str]:
+        n_roles = int(self.rng.integers(1, max_roles + 1))
+        roles = self.rng.choice(self.roles, size=n_roles, replace=False, p=self.role_probabilities).tolist()
+        if self.rng.random() < self.noise_rate:
+            roles.append(self._choice(EXTRA_ROLES))
+        return roles
+
+    def _languages(self) -> list[str]:
+        languages = [language for language in self.languages if self.rng.random() < 0.8]
+        if not languages:
+            languages = [self._choice(self.languages)]
+        if self.rng.random() < self.noise_rate:
+            languages.append(self._choice(EXTRA_LANGUAGES))
+        return languages
+
+    def _choice(self, options: list):
+        return options[int(self.rng.integers(0, len(options)))]
@@ -0,0 +1,30 @@
+import json
+import logging
+
+from src.candidate_index import CandidateIndex
+from src.compiled_config import load_config
+from src.feature_extraction import FeatureExtractor
+
+# Set up logging configuration
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Main function to measure how many labeled positives the candidate pruning rules would drop.
+    """
+    config = load_config("../../config")
+    feature_extractor = FeatureExtractor(config)
+    candidate_index = CandidateIndex(config, feature_extractor)
+
+    with open("../../data/data.json", "r") as file:
+        data = json.load(file)
+
+    logger.info(f"Start candidate pruning recall check on {len(data)} examples")
+    candidate_index.recall_check(data)
+    logger.info("Finished candidate pruning recall check")
+
+
+if __name__ == "__main__":
+    main()
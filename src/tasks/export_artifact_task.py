@@ -0,0 +1,25 @@
+import logging
+
+from src.artifact import export_artifact
+from src.compiled_config import load_config
+from src.feature_engineering import FeatureEngineer
+from src.feature_extraction import FeatureExtractor
+from src.training import Trainer
+
+# Set up logging configuration
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Main function to export the trained model and the config into an artifact for search workers.
+    """
+    config = load_config("../../config")
+    trainer = Trainer(config, FeatureExtractor(config), FeatureEngineer(config))
+    model = trainer.load_model("../../model/model.joblib")
+    export_artifact(model, config, "../../model/artifact")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import json
+import logging
+import tempfile
+from itertools import islice
+from pathlib import Path
+from typing import Optional
+
+from src.compiled_config import load_config
+from src.feature_engineering import FeatureEngineer
+from src.feature_extraction import FeatureExtractor
+from src.metrics import MetricsRegistry
+from src.profiling import PipelineProfiler
+from src.search import Search
+from src.synthetic_data import SyntheticProfileGenerator
+from src.training import Trainer
+
+# Set up logging configuration
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+ROOT_PATH = Path(__file__).resolve().parents[2]
+N_LOGGED = 10
+
+
+def load_examples(config, data_path: Optional[str], size: Optional[int], seed: int) -> list[dict]:
+    """
+    Returns:
+        list[dict]: The first size examples of the data file (format of data.json, a JSON array or JSON Lines), or
+        size synthetic examples if no data file is given.
+    """
+    if data_path is None:
+        return SyntheticProfileGenerator(config, seed=seed).training_data(size or 1000)
+    return list(islice(Trainer.iter_records(data_path), size))
+
+
+def main(argv: list[str] = None):
+    """
+    Main function to profile the search or the training pipeline on a data file or on synthetic data, e.g.
+        python -m src.tasks.profile_task search --size 1000
+        python -m src.tasks.profile_task search --data data/data.json --size 300 --method match
+        python -m src.tasks.profile_task training --size 20000
+
+    The pipeline runs once under cProfile and once under tracemalloc. The top functions by cumulative time, the time
+    and peak memory per stage and the allocation hotspots are logged and, together with the raw profile and a
+    collapsed-stack file for flame graphs (e.g. flamegraph.pl profiles/search.collapsed > search.svg), written to the
+    output directory, see PipelineProfiler.write.
+    """
+    parser = argparse.ArgumentParser(description="Profile the search or the training pipeline")
+    parser.add_argument("pipeline", choices=["search", "training"], help="Pipeline to profile")
+    parser.add_argument("--data", default=None, help="Data file in the format of data.json, defaults to synthetic data")
+    parser.add_argument("--size", type=int, default=None, help="Number of examples (all of the data file or 1000)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the synthetic data")
+    parser.add_argument(
+        "--method",
+        choices=["match_bulk", "match"],
+        default="match_bulk",
+        help="Search method: match_bulk scores all talents against all jobs, match scores the examples one by one",
+    )
+    parser.add_argument("--config", default=str(ROOT_PATH / "config"), help="Config directory")
+    parser.add_argument("--model", default=str(ROOT_PATH / "model" / "model.joblib"), help="Model of the search")
+    parser.add_argument("--output-dir", default=str(ROOT_PATH / "profiles"), help="Directory of the profile files")
+    parser.add_argument("--top", type=int, default=25, help="Number of functions and allocation sites reported")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    feature_extractor = FeatureExtractor(config)
+    feature_engineer = FeatureEngineer(config)
+    examples = load_examples(config, args.data, args.size, args.seed)
+    talents = [elem["talent"] for elem in examples]
+    jobs = [elem["job"] for elem in examples]
+    profiler = PipelineProfiler(n_top=args.top)
+
+    with tempfile.TemporaryDirectory(prefix="profile_task_") as tmp_dir:
+        if args.pipeline == "search":
+            model = Trainer(config, feature_extractor, feature_engineer).load_model(args.model)
+
+            def pipeline(metrics: MetricsRegistry) -> None:
+                search = Search(config, feature_extractor, feature_engineer, model, metrics=metrics)
+                if args.method == "match_bulk":
+                    search.match_bulk(talents, jobs)
+                else:
+                    for talent, job in zip(talents, jobs):
+                        search.match(talent, job)
+
+            name = f"search_{args.method}"
+            logger.info(f"Profiling Search.{args.method} on {len(talents)} talents and {len(jobs)} jobs")
+        else:
+            # the model is trained on a copy of the examples and saved to the temporary directory
+            data_path = Path(tmp_dir) / "data.json"
+            with open(data_path, "w") as file:
+                json.dump(examples, file)
+
+            def pipeline(metrics: MetricsRegistry) -> None:
+                trainer = Trainer(config, feature_extractor, feature_engineer, metrics=metrics)
+                trainer.training_pipeline(data_path, Path(tmp_dir) / "model.joblib")
+
+            name = "training"
+            logger.info(f"Profiling the training pipeline on {len(examples)} examples")
+
+        report = profiler.run(pipeline)
+
+    paths = profiler.write(args.output_dir, name)
+    for entry in report["top_functions"][:N_LOGGED]:
+        logger.info(
+            f"{entry['cumulative_seconds']:8.3f} s cumulative, {entry['self_seconds']:8.3f} s own, "
+            f"{entry['calls']:>8} calls  {entry['function']}"
+        )
+    for stage, entry in report["stages"].items():
+        logger.info(f"Stage {stage}: {entry['seconds']:.3f} s, peak memory {entry['peak_bytes'] / 2**20:.1f} MiB")
+    logger.info(f"Peak traced memory {report['traced_peak_bytes'] / 2**20:.1f} MiB")
+    hotspots = report["allocation_hotspots"]
+    logger.info(f"Largest allocations alive at the end of stage {hotspots['stage']}:")
+    for entry in hotspots["allocations"][:N_LOGGED]:
+        logger.info(f"{entry['size_bytes'] / 2**20:8.2f} MiB in {entry['blocks']:>7} blocks  {entry['location']}")
+    logger.info(f"Profile written to {', '.join(str(path) for path in paths)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import json
+import logging
+
+from src.compiled_config import load_config
+from src.feature_engineering import FeatureEngineer
+from src.feature_extraction import FeatureExtractor
+from src.shared_deployment import publish_deployment
+from src.training import Trainer
+
+# Set up logging configuration
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Main function to publish the trained model and the job catalogue as a new version of the shared deployment, which
+    running SharedDeployment workers switch to without a restart.
+    """
+    config = load_config("../../config")
+    trainer = Trainer(config, FeatureExtractor(config), FeatureEngineer(config))
+    model = trainer.load_model("../../model/model.joblib")
+
+    with open("../../data/data.json", "r") as file:
+        data = json.load(file)
+    jobs = [elem["job"] for elem in data]
+
+    publish_deployment(model, config, jobs, "../../model/deployment")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,10 @@ import logging
 
 from test_data.test_data import jobs, talents
 
-from src.create_config import create_config
+from src.compiled_config import load_config
 from src.feature_engineering import FeatureEngineer
 from src.feature_extraction import FeatureExtractor
+from src.feature_store import FeatureStore
 from src.search import Search
 from src.training import Trainer
 
@@ -17,18 +18,22 @@ def main():
     """
     Main function to perform matching of talents with jobs.
     """
-    config = create_config("../../config")
+    config = load_config("../../config")
 
     feature_extractor = FeatureExtractor(config)
     feature_engineer = FeatureEngineer(config)
     trainer = Trainer(config, feature_extractor, feature_engineer)
     model = trainer.load_model("../../model/model.joblib")
 
-    search = Search(config, feature_extractor, feature_engineer, model)
+    job_feature_store = FeatureStore("../../feature_store/jobs", config, feature_extractor, kind="job")
+
+    search = Search(config, feature_extractor, feature_engineer, model, job_feature_store=job_feature_store)
 
     logger.info(f"Start matching of {len(talents)} talents with {len(jobs)} jobs")
     results = search.match_bulk(talents, jobs)
     logger.info(f"Matching results ordered in descending order by score: {results}")
+    if search.metrics.enabled:
+        logger.info(f"Stage metrics: {search.metrics.to_json()}")
 
 
 if __name__ == "__main__":
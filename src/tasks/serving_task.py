@@ -0,0 +1,49 @@
+import asyncio
+import logging
+
+from test_data.test_data import jobs, talents
+
+from src.compiled_config import load_config
+from src.feature_engineering import FeatureEngineer
+from src.feature_extraction import FeatureExtractor
+from src.search import Search
+from src.serving import MicroBatchMatcher
+from src.training import Trainer
+
+# Set up logging configuration
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+N_CONCURRENT_REQUESTS = 1000
+
+
+async def serve(search: Search) -> None:
+    async with MicroBatchMatcher(search) as matcher:
+        requests = [
+            matcher.match(talents[idx % len(talents)], jobs[(idx // len(talents)) % len(jobs)])
+            for idx in range(N_CONCURRENT_REQUESTS)
+        ]
+        results = await asyncio.gather(*requests)
+        logger.info(f"Scored {len(results)} concurrent match requests, first result: {results[0]}")
+        logger.info(f"Micro-batching stats: {matcher.stats()}")
+        if search.score_cache is not None:
+            logger.info(f"Score cache stats: {search.score_cache.stats()}")
+
+
+def main():
+    """
+    Main function to serve concurrent match requests locally through the micro-batching front-end.
+    """
+    config = load_config("../../config")
+
+    feature_extractor = FeatureExtractor(config)
+    feature_engineer = FeatureEngineer(config)
+    trainer = Trainer(config, feature_extractor, feature_engineer)
+    model = trainer.load_model("../../model/model.joblib")
+
+    search = Search(config, feature_extractor, feature_engineer, model)
+    asyncio.run(serve(search))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Scores all talents against all jobs of two JSON Lines files with bounded memory and writes the results, optionally
+only the top k per talent or job, to a JSON Lines file, see StreamingSearch.score_to_jsonl.
+"""
+
+import argparse
+import logging
+
+from src.compiled_config import load_config
+from src.feature_engineering import FeatureEngineer
+from src.feature_extraction import FeatureExtractor
+from src.search import Search
+from src.streaming import StreamingSearch
+from src.training import Trainer
+
+# Set up logging configuration
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def main(argv: list[str] = None):
+    """
+    Main function to score all talents against all jobs of two JSON Lines files with bounded memory, e.g.
+        python streaming_search_task.py --talents talents.jsonl --jobs jobs.jsonl --output top10.jsonl \\
+            --top-k 10 --group-by talent
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--talents", required=True, help="JSON Lines file with one talent per line")
+    parser.add_argument("--jobs", required=True, help="JSON Lines file with one job per line")
+    parser.add_argument("--output", required=True, help="JSON Lines file the results are written to")
+    parser.add_argument("--top-k", type=int, default=None, help="Only write the top k results (per group)")
+    parser.add_argument("--group-by", choices=["talent", "job"], default=None, help="Group of the top k results")
+    parser.add_argument("--min-score", type=float, default=None, help="Only write results with at least this score")
+    parser.add_argument("--talent-chunk-size", type=int, default=None, help="Talents per tile")
+    parser.add_argument("--job-chunk-size", type=int, default=None, help="Jobs per tile")
+    parser.add_argument("--spill-dir", default=None, help="Directory of the temporary job chunk files")
+    args = parser.parse_args(argv)
+
+    config = load_config("../../config")
+    feature_extractor = FeatureExtractor(config)
+    feature_engineer = FeatureEngineer(config)
+    model = Trainer(config, feature_extractor, feature_engineer).load_model("../../model/model.joblib")
+    search = Search(config, feature_extractor, feature_engineer, model)
+    streaming_search = StreamingSearch(search, args.talent_chunk_size, args.job_chunk_size, args.spill_dir)
+
+    logger.info(f"Start streamed scoring of {args.talents} against {args.jobs}")
+    streaming_search.score_to_jsonl(
+        args.talents, args.jobs, args.output, top_k=args.top_k, group_by=args.group_by, min_score=args.min_score
+    )
+    logger.info(f"Finished streamed scoring, results written to {args.output}")
+    if search.metrics.enabled:
+        logger.info(f"Stage metrics: {search.metrics.to_json()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 import logging
 
-from src.create_config import create_config
+from src.compiled_config import load_config
 from src.feature_engineering import FeatureEngineer
 from src.feature_extraction import FeatureExtractor
 from src.training import Trainer
@@ -14,12 +14,14 @@ def main():
     """
     Main function to run the training pipeline.
     """
-    config = create_config("../../config")
+    config = load_config("../../config")
     feature_extractor = FeatureExtractor(config)
     feature_engineer = FeatureEngineer(config)
     trainer = Trainer(config, feature_extractor, feature_engineer)
     logger.info("Started training pipeline")
-    trainer.training_pipeline(data_path="../../data/data.json", model_path="../../model/model.joblib")
+    trainer.training_pipeline(
+        data_path="../../data/data.json", model_path="../../model/model.joblib", feature_cache_dir="../../feature_cache"
+    )
     logger.info("Finished training pipeline")
 
 
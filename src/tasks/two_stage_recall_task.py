@@ -0,0 +1,47 @@
+import json
+import logging
+
+from src.compiled_config import load_config
+from src.feature_engineering import FeatureEngineer
+from src.feature_extraction import FeatureExtractor
+from src.first_stage import AdditiveScorer, two_stage_recall
+from src.search import Search
+from src.training import Trainer
+
+# Set up logging configuration
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+CANDIDATE_COUNTS = [10, 25, 50, 100, 200, 500]
+TOP_K = 10
+# Number of held-out talents the recall is measured on, each is fully scored against all jobs
+N_EVAL_TALENTS = 1000
+
+
+def main():
+    """
+    Main function to distill the first-stage scorer of the two-stage retrieval from the trained model, save it and
+    measure recall@K of the two stages against full scoring for several numbers of candidates K.
+    """
+    config = load_config("../../config")
+    feature_extractor = FeatureExtractor(config)
+    feature_engineer = FeatureEngineer(config)
+    model = Trainer(config, feature_extractor, feature_engineer).load_model("../../model/model.joblib")
+    search = Search(config, feature_extractor, feature_engineer, model)
+
+    with open("../../data/data.json", "r") as file:
+        data = json.load(file)
+    talents = [elem["talent"] for elem in data]
+    jobs = [elem["job"] for elem in data]
+    # distill on the first half of the talents and evaluate on the second half
+    distill_talents, eval_talents = talents[: len(talents) // 2], talents[len(talents) // 2 :][:N_EVAL_TALENTS]
+
+    first_stage = AdditiveScorer.distill(search, distill_talents, jobs)
+    first_stage.save("../../model/first_stage.npz")
+    logger.info(f"Start two-stage recall check on {len(eval_talents)} talents and {len(jobs)} jobs")
+    two_stage_recall(search, first_stage, eval_talents, jobs, CANDIDATE_COUNTS, top_k=TOP_K)
+    logger.info("Finished two-stage recall check")
+
+
+if __name__ == "__main__":
+    main()
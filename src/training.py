@@ -2,7 +2,15 @@
 Module for training and serializing/deserialization of the machine learning model
 """
 
+import hashlib
 import logging
+import os
+import re
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
 
 import numpy as np
 import pandas as pd
@@ -12,24 +20,48 @@ import json
 
 from joblib import dump, load
 from pyhocon import ConfigTree
-from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.ensemble import GradientBoostingClassifier, HistGradientBoostingClassifier
 from sklearn.model_selection import train_test_split
 
+from src.compiled_config import CompiledConfig
 from src.feature_engineering import FeatureEngineer
 from src.feature_extraction import FeatureExtractor
+from src.metrics import MetricsRegistry
 
 logger = logging.getLogger(__name__)
 
+# Models Trainer can train, selected by training.backend and configured by the section of the same name
+BACKENDS = {
+    "gradient_boosting": GradientBoostingClassifier,
+    "hist_gradient_boosting": HistGradientBoostingClassifier,
+}
+DEFAULT_BACKEND_PARAMS = {
+    "gradient_boosting": {"n_estimators": 100, "learning_rate": 0.1, "max_depth": 3, "random_state": 42},
+    "hist_gradient_boosting": {"early_stopping": True, "random_state": 42},
+}
+# Bump when the layout of the cached feature matrices changes, so old cache files are not read anymore
+FEATURE_CACHE_VERSION = 1
+# Whitespace and commas between the examples of a JSON array
+_ARRAY_SEPARATORS = re.compile(r"[\s,]*")
+
 
 class Trainer:
     def __init__(
-        self, config: ConfigTree, feature_extractor: FeatureExtractor, feature_engineer: FeatureEngineer
+        self,
+        config: ConfigTree,
+        feature_extractor: FeatureExtractor,
+        feature_engineer: FeatureEngineer,
+        metrics: Optional[MetricsRegistry] = None,
     ) -> None:
         """
         Initialize a new instance of the Train class.
 
+        The model is created by the backend configured in training.backend, see BACKENDS.
+
         Parameters:
         - config (ConfigTree): The configuration settings
+        - metrics (MetricsRegistry): Registry the step timings are recorded in. Defaults to a registry that is
+          enabled by metrics.enabled of the config.
 
         Returns:
         - None
@@ -38,62 +70,222 @@ class Trainer:
         self.feature_extractor = feature_extractor
         self.feature_engineer = feature_engineer
         self.model = None
+        self.training_chunk_size = self.config.get("training_chunk_size", 10_000)
+        self.backend = self.config.get("training.backend", "gradient_boosting")
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown training backend {self.backend!r}, expected one of {list(BACKENDS)}")
+        self.metrics = metrics or MetricsRegistry(enabled=self.config.get("metrics.enabled", False))
 
-    def training_pipeline(self, data_path: str, model_path: str) -> GradientBoostingClassifier:
+    def training_pipeline(
+        self, data_path: str, model_path: str, feature_cache_dir: Optional[Union[str, Path]] = None
+    ) -> Union[GradientBoostingClassifier, HistGradientBoostingClassifier]:
         """
         This function is responsible for the complete training pipeline. It loads the data,
         creates training data, splits it into training and test sets, trains the model, evaluates it,
         and saves the trained model.
 
         Args:
-            data_path: The path to the JSON file containing the training data.
+            data_path: The path to the training data, either a JSON array or JSON Lines (.jsonl) file.
             model_path: The path where the trained model will be saved.
+            feature_cache_dir: Optional directory in which the feature matrix and labels of the training data are
+                cached, see _load_training_data.
 
         Returns:
-            GradientBoostingClassifier: The trained model.
+            GradientBoostingClassifier or HistGradientBoostingClassifier: The trained model, depending on the backend.
         """
-        logger.info("Start data load")
-        with open(data_path, "r") as file:
-            data = json.load(file)
-        logger.info("Finish data load")
-
-        logger.info("Start creating training data")
-        pdf_features, labels = self._create_training_data(data)
-        logger.info(f"Finished creating training data: {len(pdf_features)} training examples produced ")
-        X_train, X_test, y_train, y_test = self._train_test_split(pdf_features, labels)
-        logger.info(f"Splitted data into {len(X_train)} examples and {len(X_test)} holdout test examples")
-        logger.info("Start model training")
-        self._train_model(X_train, y_train)
-        logger.info("Finished model training")
-        quality_metric = self._evaluate_model(X_test, y_test)
-        logger.info(f"Accuracy measured on holdout test set: {quality_metric}")
-        self._save_model(model_path)
-        logger.info(f"Saved model to {model_path}")
+        with self.metrics.timer("training.pipeline") as pipeline_timer:
+            logger.info("Start creating training data")
+            with self.metrics.timer("training.create_training_data") as timer:
+                pdf_features, labels = self._load_training_data(data_path, feature_cache_dir)
+                timer.items = pipeline_timer.items = len(pdf_features)
+            logger.info(f"Finished creating training data: {len(pdf_features)} training examples produced ")
+            with self.metrics.timer("training.split", items=len(pdf_features)):
+                X_train, X_test, y_train, y_test = self._train_test_split(pdf_features, labels)
+            logger.info(f"Splitted data into {len(X_train)} examples and {len(X_test)} holdout test examples")
+            logger.info(f"Start model training with backend {self.backend}")
+            fit_start = time.perf_counter()
+            with self.metrics.timer("training.fit", items=len(X_train)):
+                self._train_model(X_train, y_train)
+            fit_seconds = time.perf_counter() - fit_start
+            n_iterations = getattr(self.model, "n_iter_", None) or getattr(self.model, "n_estimators_", None)
+            logger.info(
+                f"Finished model training with backend {self.backend} in {fit_seconds:.2f} s, "
+                f"{n_iterations} boosting iterations"
+            )
+            with self.metrics.timer("training.evaluate", items=len(X_test)):
+                quality_metric = self._evaluate_model(X_test, y_test)
+            self.metrics.set_gauge("training.holdout_accuracy", quality_metric)
+            logger.info(f"Accuracy of backend {self.backend} measured on holdout test set: {quality_metric}")
+            with self.metrics.timer("training.save"):
+                self._save_model(model_path)
+            logger.info(f"Saved model to {model_path}")
         return self.model
 
-    def _create_training_data(self, input_data: list[dict]) -> (pd.DataFrame, list):
-        labels = []
-        pdf_features = pd.DataFrame()
-        for elem in input_data:
-            labels.append(elem["label"])
-            extracted_features = self.feature_extractor.extract_features(elem["talent"], elem["job"])
-            features = self.feature_engineer.engineer_features(extracted_features)
-            pdf_features = pd.concat([pdf_features, features], axis=0)
+    def _load_training_data(
+        self, data_path: str, feature_cache_dir: Optional[Union[str, Path]] = None
+    ) -> (pd.DataFrame, np.ndarray):
+        """
+        This method returns the feature matrix and labels of the training data. If a cache directory is given, they
+        are read from the cache file whose key is the SHA-256 hash of the data file and the compiled config (features,
+        role and language universes and rank mappings), so an unchanged data file and feature config skip feature
+        construction entirely. Otherwise, they are created with _create_training_data and written to the cache.
+
+        Args:
+            data_path: The path to the training data.
+            feature_cache_dir: Optional directory of the cache files.
+
+        Returns:
+            Tuple
+                pd.DataFrame: The features with the columns in the order of the features config.
+                np.ndarray: The labels.
+        """
+        if feature_cache_dir is None:
+            return self._create_training_data(self.iter_records(data_path))
+
+        cache_path = Path(feature_cache_dir) / f"training_features_{self._feature_cache_key(data_path)}.npz"
+        if cache_path.exists():
+            with np.load(cache_path) as arrays:
+                features, labels = arrays["features"], arrays["labels"]
+            logger.info(f"Loaded features of {len(labels)} training examples from cache {cache_path}")
+            return pd.DataFrame(features, columns=self.feature_engineer.relevant_features), labels
+
+        pdf_features, labels = self._create_training_data(self.iter_records(data_path))
+        self._write_feature_cache(cache_path, pdf_features.to_numpy(), labels)
         return pdf_features, labels
 
     @staticmethod
-    def _train_test_split(pdf_features: pd.DataFrame, labels: list) -> (pd.DataFrame, pd.DataFrame, list, list):
+    def _write_feature_cache(cache_path: Path, features: np.ndarray, labels: np.ndarray) -> None:
+        """
+        Writes the cache to a temporary file of its own, which is then renamed, so concurrently running trainers
+        never read or replace a partially written cache. Training goes on if the cache cannot be written.
+        """
+        tmp_path = None
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, prefix=f".{cache_path.name}.", suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                np.savez(file, features=features, labels=labels)
+            os.replace(tmp_path, cache_path)
+        except OSError as error:
+            logger.warning(f"Could not write feature cache {cache_path}: {error}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        logger.info(f"Cached features of {len(labels)} training examples in {cache_path}")
+
+    def _feature_cache_key(self, data_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(data_path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+        feature_config = CompiledConfig.of(self.config).to_dict()
+        digest.update(json.dumps({"version": FEATURE_CACHE_VERSION, "config": feature_config}).encode())
+        return digest.hexdigest()
+
+    def _create_training_data(self, input_data: Iterable[dict]) -> (pd.DataFrame, np.ndarray):
+        """
+        This method builds the feature matrix and labels chunk by chunk. Every chunk of training_chunk_size examples
+        goes through the batch feature pipeline and is written into a preallocated matrix, whose capacity is doubled
+        when it runs full. Construction is therefore linear in the number of examples and only one chunk of raw
+        examples is held in memory at a time.
+
+        Args:
+            input_data: Iterable of training examples, each a dict with the keys talent, job and label.
+
+        Returns:
+            Tuple
+                pd.DataFrame: The features with the columns in the order of the features config.
+                np.ndarray: The labels.
+        """
+        records = iter(input_data)
+        features = np.empty((self.training_chunk_size, len(self.feature_engineer.relevant_features)))
+        labels = np.empty(self.training_chunk_size, dtype=np.int64)
+        n_rows = 0
+        while chunk := list(islice(records, self.training_chunk_size)):
+            if n_rows + len(chunk) > len(features):
+                features = np.resize(features, (2 * len(features), features.shape[1]))
+                labels = np.resize(labels, 2 * len(labels))
+            with self.metrics.timer("training.extract", items=len(chunk)):
+                extracted_batch = self.feature_extractor.extract_batch(
+                    [elem["talent"] for elem in chunk], [elem["job"] for elem in chunk]
+                )
+            with self.metrics.timer("training.engineer", items=len(chunk)):
+                features[n_rows : n_rows + len(chunk)] = self.feature_engineer.engineer_batch(extracted_batch)
+            labels[n_rows : n_rows + len(chunk)] = [elem["label"] for elem in chunk]
+            n_rows += len(chunk)
+            logger.debug(f"Created features for {n_rows} training examples")
+
+        pdf_features = pd.DataFrame(features[:n_rows], columns=self.feature_engineer.relevant_features)
+        return pdf_features, labels[:n_rows]
+
+    @staticmethod
+    def iter_records(data_path: str, read_size: int = 1 << 20, max_record_size: int = 64 << 20) -> Iterator[dict]:
+        """
+        This method streams the training examples from a JSON Lines file (.jsonl) or from a file holding a single
+        JSON array, without loading the whole file into memory.
+
+        The array is decoded from a position within a buffer of read_size characters, which is only trimmed to the
+        undecoded rest when it is refilled, so every character is copied a bounded number of times.
+
+        Args:
+            data_path: The path to the training data.
+            read_size: Number of characters read from the file at once.
+            max_record_size: Number of characters after which an example that cannot be decoded is reported as
+                malformed instead of reading on.
+
+        Yields:
+            dict: One training example after the other.
+        """
+        with open(data_path, "r") as file:
+            if str(data_path).endswith(".jsonl"):
+                for line in file:
+                    if line.strip():
+                        yield json.loads(line)
+                return
+
+            decoder = json.JSONDecoder()
+            buffer = file.read(read_size).lstrip()
+            while not buffer and (chunk := file.read(read_size)):
+                buffer = chunk.lstrip()
+            if not buffer.startswith("["):
+                raise ValueError(f"Expected a JSON array or a .jsonl file as training data, got {data_path}")
+            position = 1
+            n_trimmed = 0
+            end_of_file = False
+            while True:
+                position = _ARRAY_SEPARATORS.match(buffer, position).end()
+                if buffer.startswith("]", position):
+                    return
+                try:
+                    record, position = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError as error:
+                    if end_of_file or len(buffer) - position > max_record_size:
+                        raise ValueError(
+                            f"Malformed training example at character {n_trimmed + error.pos} of {data_path}: "
+                            f"{error.msg}"
+                        ) from error
+                    chunk = file.read(read_size)
+                    end_of_file = not chunk
+                    n_trimmed += position
+                    buffer = buffer[position:] + chunk
+                    position = 0
+                    continue
+                yield record
+
+    @staticmethod
+    def _train_test_split(
+        pdf_features: pd.DataFrame, labels: np.ndarray
+    ) -> (pd.DataFrame, pd.DataFrame, np.ndarray, np.ndarray):
         X_train, X_test, y_train, y_test = train_test_split(
             pdf_features, labels, test_size=0.20, random_state=42, stratify=labels, shuffle=True
         )
         return X_train, X_test, y_train, y_test
 
-    def _train_model(self, X_train: pd.DataFrame, y_train: list) -> None:
-        self.model = GradientBoostingClassifier(n_estimators=100, learning_rate=0.1, max_depth=3, random_state=42).fit(
-            X_train, y_train
-        )
+    def _train_model(self, X_train: pd.DataFrame, y_train: np.ndarray) -> None:
+        params = {**DEFAULT_BACKEND_PARAMS[self.backend], **dict(self.config.get(f"training.{self.backend}", {}))}
+        self.model = BACKENDS[self.backend](**params).fit(X_train, y_train)
 
-    def _evaluate_model(self, X_test: pd.DataFrame, y_test: list) -> float:
+    def _evaluate_model(self, X_test: pd.DataFrame, y_test: np.ndarray) -> float:
         accuracy = self.model.score(X_test, y_test)
         return accuracy
 
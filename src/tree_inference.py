@@ -0,0 +1,258 @@
+"""
+Module for fast inference of a trained GradientBoostingClassifier on flat NumPy arrays.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from sklearn.ensemble import GradientBoostingClassifier
+
+# Slack of the early-exit bound of predict_score_above, covering the rounding of the partial sums of leaf values
+_BOUND_TOLERANCE = 1e-9
+
+
+class CompiledModel:
+    def __init__(
+        self,
+        features: np.ndarray,
+        thresholds: np.ndarray,
+        leaf_values: np.ndarray,
+        baseline: float,
+        feature_names: list[str],
+    ) -> None:
+        """
+        Initialize a new instance of the CompiledModel class. Every tree is stored as a complete binary tree of the
+        same depth in breadth-first order, i.e. the children of node i are 2 * i + 1 and 2 * i + 2.
+
+        Parameters:
+        - features (np.ndarray): (n_trees, 2 ** depth - 1) feature index per internal node.
+        - thresholds (np.ndarray): (n_trees, 2 ** depth - 1) split threshold per internal node.
+        - leaf_values (np.ndarray): (n_trees, 2 ** depth) leaf value per leaf, already scaled by the learning rate.
+        - baseline (float): Raw prediction of the init estimator.
+        - feature_names (list[str]): Names of the features in the expected column order.
+
+        Returns:
+        - None
+        """
+        self.features = features
+        self.thresholds = thresholds
+        self.leaf_values = leaf_values
+        self.baseline = baseline
+        self.feature_names = list(feature_names)
+        self.depth = int(np.log2(leaf_values.shape[1]))
+        self.n_trees = leaf_values.shape[0]
+        self.rows_per_chunk = 8192
+        self.trees_per_stage = 10
+        # sklearn compares float32 input against float64 thresholds. Rounding the thresholds down to the next float32
+        # keeps every comparison identical while the evaluation stays in float32.
+        thresholds_float32 = thresholds.astype(np.float32)
+        self._thresholds_float32 = np.where(
+            thresholds_float32 > thresholds, np.nextafter(thresholds_float32, np.float32(-np.inf)), thresholds_float32
+        )
+
+    @classmethod
+    def from_sklearn(cls, model: GradientBoostingClassifier) -> "CompiledModel":
+        """
+        This method flattens the trees of a fitted binary GradientBoostingClassifier into complete-tree arrays.
+
+        Args:
+            model: The fitted model, e.g. as returned by Trainer.load_model.
+
+        Returns:
+            CompiledModel: The compiled model.
+
+        Notes:
+            - Leaves above the maximum depth are padded with dummy splits whose subtrees all carry the leaf value,
+              so every sample walks exactly depth levels regardless of the padding split.
+        """
+        from sklearn.tree import _tree
+
+        if not hasattr(model, "estimators_"):
+            raise ValueError(f"Only GradientBoostingClassifier models can be compiled, got {type(model).__name__}")
+        if model.n_classes_ != 2:
+            raise ValueError(f"Only binary classifiers can be compiled, got {model.n_classes_} classes")
+        trees = [estimator.tree_ for estimator in model.estimators_[:, 0]]
+        depth = max(tree.max_depth for tree in trees)
+        features = np.zeros((len(trees), 2**depth - 1), dtype=np.intp)
+        thresholds = np.zeros((len(trees), 2**depth - 1))
+        leaf_values = np.zeros((len(trees), 2**depth))
+
+        for idx, tree in enumerate(trees):
+            stack = [(0, 0, 0)]
+            while stack:
+                node, position, level = stack.pop()
+                if tree.children_left[node] == _tree.TREE_LEAF:
+                    first_leaf = (position + 1) * 2 ** (depth - level) - 2**depth
+                    leaf_values[idx, first_leaf : first_leaf + 2 ** (depth - level)] = tree.value[node, 0, 0]
+                    continue
+                features[idx, position] = tree.feature[node]
+                thresholds[idx, position] = tree.threshold[node]
+                stack.append((tree.children_left[node], 2 * position + 1, level + 1))
+                stack.append((tree.children_right[node], 2 * position + 2, level + 1))
+
+        baseline = model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32))[0, 0]
+        feature_names = getattr(model, "feature_names_in_", [f"x{idx}" for idx in range(model.n_features_in_)])
+        return cls(features, thresholds, leaf_values * model.learning_rate, baseline, feature_names)
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            features=self.features,
+            thresholds=self.thresholds,
+            leaf_values=self.leaf_values,
+            baseline=self.baseline,
+            feature_names=np.array(self.feature_names),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledModel":
+        with np.load(path) as arrays:
+            return cls(
+                arrays["features"],
+                arrays["thresholds"],
+                arrays["leaf_values"],
+                float(arrays["baseline"]),
+                arrays["feature_names"].tolist(),
+            )
+
+    def decision_function(self, X) -> np.ndarray:
+        """
+        This method evaluates all trees for a whole batch at once, one tree level per step, see _leaf_positions.
+
+        Args:
+            X: A (n, n_features) matrix or DataFrame with the columns in the order of feature_names.
+
+        Returns:
+            np.ndarray: The (n,) raw predictions (log-odds) of the positive class.
+
+        Notes:
+            - Like GradientBoostingClassifier, the model does not handle missing values: input containing NaN or
+              infinity raises a ValueError instead of being routed down an arbitrary branch. An example is the
+              p_role_match feature of a job without a role of the job_role_universe.
+        """
+        X = self._validated_input(X)
+        raw_predictions = np.empty(len(X))
+        all_trees = slice(0, self.n_trees)
+        for start in range(0, len(X), self.rows_per_chunk):
+            X_columns = np.ascontiguousarray(X[start : start + self.rows_per_chunk].T)
+            positions = self._leaf_positions(X_columns, all_trees)
+            raw_predictions[start : start + X_columns.shape[1]] = self.baseline + self._leaf_sum(positions, all_trees)
+        return raw_predictions
+
+    def predict_score(self, X) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: The (n,) probabilities of the positive class, i.e. predict_proba(X)[:, 1].
+        """
+        return 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+
+    def predict_proba(self, X) -> np.ndarray:
+        score = self.predict_score(X)
+        return np.column_stack([1.0 - score, score])
+
+    def predict_score_above(self, X, min_score: float) -> (np.ndarray, int):
+        """
+        Early-exit counterpart of predict_score for callers that only need the samples scoring at least min_score,
+        e.g. min_score = 0.5 for the samples with the positive label.
+
+        The trees are evaluated in stages of trees_per_stage trees. After every stage, a sample is dropped as soon as
+        its raw prediction so far plus the largest leaf value of every remaining tree is below the log-odds of
+        min_score, i.e. as soon as no outcome of the remaining trees can lift it to min_score. The other samples are
+        evaluated to the end, so their scores are exactly the ones of predict_score.
+
+        No sample can be dropped early for min_score 0, which every score reaches, or for min_score 1, which only
+        scores that round to exactly 1 reach. All trees are evaluated for them.
+
+        Args:
+            X: A (n, n_features) matrix or DataFrame with the columns in the order of feature_names.
+            min_score: The minimum probability of the positive class, between 0 and 1.
+
+        Returns:
+            Tuple
+                np.ndarray: The (n,) scores, equal to predict_score for samples scoring at least min_score and -inf
+                    for the others.
+                int: Number of evaluated (tree, sample) combinations, out of n * n_trees for predict_score.
+        """
+        if not 0.0 <= min_score <= 1.0:
+            raise ValueError(f"min_score must be between 0 and 1, got {min_score}")
+        X = self._validated_input(X)
+        if min_score in (0.0, 1.0):
+            scores = self.predict_score(X)
+            return np.where(scores >= min_score, scores, -np.inf), len(X) * self.n_trees
+        scores = np.full(len(X), -np.inf)
+        min_raw_prediction = np.log(min_score) - np.log1p(-min_score)
+        # largest possible sum of the leaf values of the trees from index i onwards, 0 after the last tree
+        remaining_max = np.append(np.cumsum(self.leaf_values.max(axis=1)[::-1])[::-1], 0.0)
+        all_trees = slice(0, self.n_trees)
+        n_evaluations = 0
+        for start in range(0, len(X), self.rows_per_chunk):
+            X_chunk = X[start : start + self.rows_per_chunk]
+            positions = np.zeros((self.n_trees, len(X_chunk)), dtype=np.intp)
+            raw_predictions = np.full(len(X_chunk), self.baseline)
+            active = np.arange(len(X_chunk))
+            for stage_start in range(0, self.n_trees, self.trees_per_stage):
+                trees = slice(stage_start, min(stage_start + self.trees_per_stage, self.n_trees))
+                stage_positions = self._leaf_positions(np.ascontiguousarray(X_chunk[active].T), trees)
+                positions[trees, active] = stage_positions
+                raw_predictions[active] += self._leaf_sum(stage_positions, trees)
+                n_evaluations += stage_positions.size
+                upper_bound = raw_predictions[active] + remaining_max[trees.stop]
+                active = active[upper_bound >= min_raw_prediction - _BOUND_TOLERANCE]
+                if not len(active):
+                    break
+            # the scores of the remaining samples are summed over all trees at once, exactly like decision_function
+            active_scores = 1.0 / (1.0 + np.exp(-(self.baseline + self._leaf_sum(positions[:, active], all_trees))))
+            above = active_scores >= min_score
+            scores[start + active[above]] = active_scores[above]
+        return scores, n_evaluations
+
+    @staticmethod
+    def _validated_input(X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if not np.isfinite(X).all():
+            kind = "NaN" if np.isnan(X).any() else "infinity or a value too large for float32"
+            raise ValueError(
+                f"Input X contains {kind}. CompiledModel, like GradientBoostingClassifier, does not accept it."
+            )
+        return X
+
+    def _leaf_positions(self, X_columns: np.ndarray, trees: slice) -> np.ndarray:
+        """
+        Walks every sample down the given trees, one tree level per step. On every level the splits of all nodes of
+        that level are evaluated as column comparisons, and the branch taken by each sample is then picked from the
+        flattened comparison matrix.
+
+        Args:
+            X_columns: The (n_features, n) transposed float32 input.
+            trees: The range of trees.
+
+        Returns:
+            np.ndarray: The (n_trees in range, n) index of the leaf every sample ends in, per tree.
+        """
+        features, thresholds = self.features[trees], self._thresholds_float32[trees]
+        n_trees = len(features)
+        tree_idx = np.arange(n_trees)[:, None]
+        samples = np.arange(X_columns.shape[1])
+        positions = np.zeros((n_trees, X_columns.shape[1]), dtype=np.intp)
+        for level in range(self.depth):
+            width = 2**level
+            nodes = slice(width - 1, 2 * width - 1)
+            go_right = X_columns[features[:, nodes]] > thresholds[:, nodes, None]
+            go_right = go_right.reshape(n_trees * width, -1)
+            positions = 2 * positions + go_right[tree_idx * width + positions, samples]
+        return positions
+
+    def _leaf_sum(self, positions: np.ndarray, trees: slice) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: Per sample the sum of the leaf values it ends in over the given range of trees.
+        """
+        tree_idx = np.arange(len(positions))[:, None]
+        leaf_values = self.leaf_values[trees].ravel()[tree_idx * 2**self.depth + positions]
+        # summing a C-ordered matrix over axis 0 adds the trees in order, so the sum does not depend on the layout of
+        # positions and equal leaves give bit-identical sums
+        return np.ascontiguousarray(leaf_values).sum(axis=0)
@@ -0,0 +1,52 @@
+"""
+Shared fixtures of the tests: the config, the feature pipeline and the trained model of the repository, and synthetic
+profiles that follow the value distributions of the config.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from src.create_config import create_config
+from src.feature_engineering import FeatureEngineer
+from src.feature_extraction import FeatureExtractor
+from src.synthetic_data import SyntheticProfileGenerator
+from src.training import Trainer
+from src.tree_inference import CompiledModel
+
+ROOT_PATH = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(scope="session")
+def config():
+    return create_config(ROOT_PATH / "config")
+
+
+@pytest.fixture(scope="session")
+def feature_extractor(config):
+    return FeatureExtractor(config)
+
+
+@pytest.fixture(scope="session")
+def feature_engineer(config):
+    return FeatureEngineer(config)
+
+
+@pytest.fixture(scope="session")
+def sklearn_model(config, feature_extractor, feature_engineer):
+    return Trainer(config, feature_extractor, feature_engineer).load_model(ROOT_PATH / "model" / "model.joblib")
+
+
+@pytest.fixture(scope="session")
+def compiled_model(sklearn_model):
+    return CompiledModel.from_sklearn(sklearn_model)
+
+
+@pytest.fixture(scope="session")
+def talents(config):
+    return SyntheticProfileGenerator(config, seed=1).talents(40)
+
+
+@pytest.fixture(scope="session")
+def jobs(config):
+    return SyntheticProfileGenerator(config, seed=2).jobs(60)
@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from src.candidate_index import CandidateIndex
+from src.search import Search
+
+RULES = [
+    {"require_role_overlap": True},
+    {"require_role_overlap": False, "max_must_have_language_discrepancy": 0},
+    {"require_role_overlap": False, "max_seniority_rank_distance": 1},
+    {"require_role_overlap": True, "max_must_have_language_discrepancy": 1, "max_seniority_rank_distance": 2},
+    {"require_role_overlap": False},
+]
+
+
+@pytest.fixture(scope="module")
+def search(config, feature_extractor, feature_engineer, compiled_model):
+    return Search(config, feature_extractor, feature_engineer, compiled_model)
+
+
+def candidate_index(config, feature_extractor, jobs: list[dict], rules: dict) -> CandidateIndex:
+    index = CandidateIndex(config, feature_extractor)
+    for name, value in rules.items():
+        setattr(index, name, value)
+    return index.build(jobs)
+
+
+def keep_matrix(index: CandidateIndex, talents: list[dict], jobs: list[dict]) -> np.ndarray:
+    """
+    Returns:
+        np.ndarray: The (talents, jobs) matrix of keep_pairs, evaluated pair by pair without postings.
+    """
+    keep = index.keep_pairs([talent for talent in talents for _ in jobs], [job for _ in talents for job in jobs])
+    return keep.reshape(len(talents), len(jobs))
+
+
+@pytest.mark.parametrize("rules", RULES)
+def test_candidates_match_keep_pairs(config, feature_extractor, talents, jobs, rules):
+    index = candidate_index(config, feature_extractor, jobs, rules)
+    talent_data = feature_extractor.extract_talent_batch(talents)
+
+    keep = keep_matrix(index, talents, jobs)
+
+    for row in range(len(talents)):
+        np.testing.assert_array_equal(index.candidates(talent_data, row), np.flatnonzero(keep[row]))
+    if rules == {"require_role_overlap": False}:
+        assert keep.all()
+    else:
+        assert 0 < keep.sum() < keep.size
+
+
+@pytest.mark.parametrize("rules", RULES)
+def test_match_candidates_scores_exactly_the_kept_pairs(search, config, feature_extractor, talents, jobs, rules):
+    index = candidate_index(config, feature_extractor, jobs, rules)
+    keep = keep_matrix(index, talents, jobs)
+    unpruned = search.score_cross(talents, jobs).reshape(len(talents), len(jobs))
+
+    results = search.match_candidates(talents, index, columnar=True)
+
+    talent_idx, job_idx = np.nonzero(keep)
+    order = np.lexsort((job_idx, talent_idx, -unpruned[talent_idx, job_idx]))
+    np.testing.assert_array_equal(results.talent_idx, talent_idx[order])
+    np.testing.assert_array_equal(results.job_idx, job_idx[order])
+    np.testing.assert_allclose(results.scores, unpruned[talent_idx, job_idx][order], rtol=0, atol=1e-12)
+
+
+def test_match_candidates_top_k_per_talent(search, config, feature_extractor, talents, jobs):
+    index = candidate_index(config, feature_extractor, jobs, RULES[0])
+    keep = keep_matrix(index, talents, jobs)
+    unpruned = search.score_cross(talents, jobs).reshape(len(talents), len(jobs))
+
+    results = search.match_candidates(talents, index, top_k=3, group_by="talent", columnar=True)
+
+    for row, group in enumerate(results.groups()):
+        kept = np.flatnonzero(keep[row])
+        expected = kept[np.lexsort((kept, -unpruned[row, kept]))][:3]
+        np.testing.assert_array_equal(group.job_idx, expected)
+
+
+def test_talent_without_candidates(search, config, feature_extractor, talents, jobs):
+    index = candidate_index(config, feature_extractor, jobs, RULES[0])
+    talent = dict(talents[0], job_roles=[])
+
+    assert len(index.candidates(feature_extractor.extract_talent_batch([talent]), 0)) == 0
+    results = search.match_candidates([talent, talents[1]], index, group_by="talent", top_k=5, columnar=True)
+    assert len(results.group(0)) == 0 and len(results.group(1)) > 0
+
+
+def test_index_without_jobs(search, config, feature_extractor, talents):
+    index = candidate_index(config, feature_extractor, [], RULES[3])
+
+    assert len(index.candidates(feature_extractor.extract_talent_batch(talents[:1]), 0)) == 0
+    assert search.match_candidates(talents, index) == []
+
+
+def test_recall_check_counts_the_dropped_examples(search, config, feature_extractor, talents, jobs):
+    index = candidate_index(config, feature_extractor, jobs, RULES[3])
+    data = [
+        {"talent": talent, "job": job, "label": int(search.match(talent, job)["score"] >= 0.5)}
+        for talent in talents[:10]
+        for job in jobs[:10]
+    ]
+    labels = np.array([elem["label"] for elem in data], dtype=bool)
+    keep = keep_matrix(index, talents[:10], jobs[:10]).ravel()
+
+    report = index.recall_check(data)
+
+    assert report == {
+        "positives": int(labels.sum()),
+        "dropped_positives": int((labels & ~keep).sum()),
+        "negatives": int((~labels).sum()),
+        "dropped_negatives": int((~labels & ~keep).sum()),
+        "recall": (labels & keep).sum() / labels.sum(),
+    }
+    assert report["dropped_negatives"] > 0
+    assert index.recall_check([elem for elem in data if not elem["label"]])["recall"] == 1.0
@@ -0,0 +1,62 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.search import Search
+from tests.conftest import ROOT_PATH
+
+
+@pytest.fixture(scope="module")
+def frozen():
+    """
+    Profiles and the features the original pandas implementation engineered for them, see the description in the
+    file.
+    """
+    with open(ROOT_PATH / "tests" / "data" / "engineered_features.json", "r") as file:
+        data = json.load(file)
+    data["rows"] = np.array(data["rows"])
+    return data
+
+
+def test_relevant_features_are_unchanged(feature_engineer, frozen):
+    assert feature_engineer.relevant_features == frozen["features"]
+
+
+def test_engineer_features_matches_frozen_features(feature_extractor, feature_engineer, frozen):
+    features = [
+        feature_engineer.engineer_features(feature_extractor.extract_features(talent, job))
+        for talent in frozen["talents"]
+        for job in frozen["jobs"]
+    ]
+
+    assert all(list(frame.columns) == frozen["features"] for frame in features)
+    np.testing.assert_array_equal(np.vstack([frame.to_numpy() for frame in features]), frozen["rows"])
+
+
+def test_engineer_batch_matches_frozen_features(feature_extractor, feature_engineer, frozen):
+    talents = [talent for talent in frozen["talents"] for _ in frozen["jobs"]]
+    jobs = [job for _ in frozen["talents"] for job in frozen["jobs"]]
+
+    features = feature_engineer.engineer_batch(feature_extractor.extract_batch(talents, jobs))
+
+    np.testing.assert_array_equal(features, frozen["rows"])
+
+
+def test_engineer_cross_matches_frozen_features(feature_extractor, feature_engineer, frozen):
+    features = feature_engineer.engineer_cross(
+        feature_extractor.extract_talent_batch(frozen["talents"]), feature_extractor.extract_job_batch(frozen["jobs"])
+    )
+
+    np.testing.assert_array_equal(features, frozen["rows"])
+
+
+def test_match_scores_the_frozen_features(config, feature_extractor, feature_engineer, sklearn_model, frozen):
+    search = Search(config, feature_extractor, feature_engineer, sklearn_model)
+    expected = sklearn_model.predict_proba(pd.DataFrame(frozen["rows"], columns=frozen["features"]))[:, 1]
+
+    scores = [search.match(talent, job)["score"] for talent in frozen["talents"] for job in frozen["jobs"]]
+
+    np.testing.assert_array_equal(scores, expected)
+    np.testing.assert_array_equal(search.score_cross(frozen["talents"], frozen["jobs"]), expected)
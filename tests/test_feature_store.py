@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from src.feature_extraction import FeatureExtractor
+from src.feature_store import FeatureStore
+from src.synthetic_data import SyntheticProfileGenerator
+
+
+def assert_side_data_equal(side_data: dict, expected: dict) -> None:
+    flat, expected_flat = FeatureExtractor.flatten_side_data(side_data), FeatureExtractor.flatten_side_data(expected)
+    assert flat.keys() == expected_flat.keys()
+    for name, values in flat.items():
+        assert values.dtype == expected_flat[name].dtype, name
+        np.testing.assert_array_equal(values, expected_flat[name], err_msg=name)
+
+
+@pytest.mark.parametrize("kind", ["talent", "job"])
+def test_get_batch_equals_extraction(config, feature_extractor, talents, jobs, tmp_path, kind):
+    profiles = talents if kind == "talent" else jobs
+    extract = feature_extractor.extract_talent_batch if kind == "talent" else feature_extractor.extract_job_batch
+    store = FeatureStore(tmp_path, config, feature_extractor, kind)
+
+    assert_side_data_equal(store.get_batch(profiles[:10]), extract(profiles[:10]))
+    # stored, new and repeated profiles in one batch
+    batch = profiles[15:20] + profiles[:10] + profiles[15:20] + profiles[20:]
+
+    assert_side_data_equal(store.get_batch(batch), extract(batch))
+    assert len(store) == len(profiles) - 5
+    assert_side_data_equal(store.side_data(), extract(profiles[:10] + profiles[15:20] + profiles[20:]))
+
+
+def test_reopened_store_serves_stored_profiles_without_extraction(
+    config, feature_extractor, talents, tmp_path, monkeypatch
+):
+    FeatureStore(tmp_path, config, feature_extractor, "talent").get_batch(talents)
+
+    store = FeatureStore(tmp_path, config, feature_extractor, "talent")
+    monkeypatch.setattr(store, "_extract", pytest.fail)
+
+    assert len(store) == len(talents)
+    assert_side_data_equal(store.get_batch(talents[::-1]), feature_extractor.extract_talent_batch(talents[::-1]))
+
+
+def test_lookup_finds_the_row_of_every_key(config, feature_extractor, jobs, tmp_path):
+    store = FeatureStore(tmp_path, config, feature_extractor, "job")
+    store.get_batch(jobs[:20])
+    store.get_batch(jobs[20:30])
+
+    np.testing.assert_array_equal(store.lookup(store.keys(jobs[:30])), np.arange(30))
+    np.testing.assert_array_equal(store.lookup(store.keys(jobs[30:35])), [-1] * 5)
+    assert store.lookup(store.keys([])).shape == (0,)
+
+
+def test_keys_identify_the_profile_content(config, feature_extractor, talents, tmp_path):
+    store = FeatureStore(tmp_path, config, feature_extractor, "talent")
+    talent = talents[0]
+
+    key, reordered_key, changed_key = store.keys(
+        [
+            talent,
+            dict(reversed(list(talent.items()))),
+            dict(talent, salary_expectation=talent["salary_expectation"] + 1),
+        ]
+    )
+
+    assert key == reordered_key and key != changed_key
+    assert store.keys([talent]) != FeatureStore(tmp_path / "jobs", config, feature_extractor, "job").keys([talent])
+
+
+def test_store_grows_past_its_initial_capacity(config, feature_extractor, tmp_path):
+    jobs = SyntheticProfileGenerator(config, seed=3).jobs(1500)
+    store = FeatureStore(tmp_path, config, feature_extractor, "job")
+    store.get_batch(jobs[:1000])
+
+    assert_side_data_equal(store.get_batch(jobs), feature_extractor.extract_job_batch(jobs))
+    assert store.capacity == 2048
+    np.testing.assert_array_equal(store.lookup(store.keys(jobs)), np.arange(len(jobs)))
+
+
+def test_config_change_starts_an_empty_store(config, feature_extractor, talents, tmp_path):
+    FeatureStore(tmp_path, config, feature_extractor, "talent").get_batch(talents)
+    changed_config = config.copy()
+    changed_config.put("seniority_rank_mapping", {**config.get("seniority_rank_mapping"), "junior": 1.5})
+
+    store = FeatureStore(tmp_path, changed_config, FeatureExtractor(changed_config), "talent")
+
+    assert len(store) == 0
+    assert len(FeatureStore(tmp_path, config, feature_extractor, "talent")) == 0
+
+
+def test_unknown_kind_is_rejected(config, feature_extractor, tmp_path):
+    with pytest.raises(ValueError, match="kind must be"):
+        FeatureStore(tmp_path, config, feature_extractor, "company")
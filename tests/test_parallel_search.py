@@ -0,0 +1,58 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from src.metrics import MetricsRegistry
+from src.parallel_search import ParallelSearch
+from src.score_cache import ScoreCache
+from src.search import Search
+
+
+@pytest.fixture(scope="module")
+def search(config, feature_extractor, feature_engineer, compiled_model):
+    return Search(
+        config,
+        feature_extractor,
+        feature_engineer,
+        compiled_model,
+        metrics=MetricsRegistry(),
+        score_cache=ScoreCache(max_size=10),
+    )
+
+
+def test_search_can_be_pickled(search, talents, jobs):
+    search.match(talents[0], jobs[0])
+    search.open_ranking(talents[:2], jobs[:3])
+
+    restored = pickle.loads(pickle.dumps(search))
+
+    assert restored.metrics.to_dict()["counters"] == search.metrics.to_dict()["counters"]
+    assert len(restored.score_cache) == 0
+    assert len(restored.ranking_sessions) == len(search.ranking_sessions)
+    restored.match(talents[1], jobs[1])
+
+
+@pytest.mark.parametrize("start_method", ["spawn", "fork"])
+@pytest.mark.parametrize("group_by", [None, "talent"])
+def test_parallel_match_bulk_matches_match_bulk(search, talents, jobs, start_method, group_by):
+    expected = search.match_bulk(talents, jobs, top_k=5, group_by=group_by, columnar=True)
+    search.metrics.reset()
+    parallel_search = ParallelSearch(search, n_workers=2, talents_per_task=15, min_pairs=0, start_method=start_method)
+
+    results = parallel_search.match_bulk(talents, jobs, top_k=5, group_by=group_by, columnar=True)
+
+    np.testing.assert_array_equal(results.talent_idx, expected.talent_idx)
+    np.testing.assert_array_equal(results.job_idx, expected.job_idx)
+    np.testing.assert_array_equal(results.scores, expected.scores)
+    # the metrics of the workers are added to the ones of the search
+    assert search.metrics.to_dict()["stages"]["search.predict"]["items"] == len(talents) * len(jobs)
+
+
+def test_small_workloads_are_scored_without_pool(search, talents, jobs, monkeypatch):
+    parallel_search = ParallelSearch(search, n_workers=2, min_pairs=len(talents) * len(jobs) + 1)
+    monkeypatch.setattr("multiprocessing.get_context", pytest.fail)
+
+    results = parallel_search.match_bulk(talents, jobs, top_k=3, columnar=True)
+
+    np.testing.assert_array_equal(results.scores, search.match_bulk(talents, jobs, top_k=3, columnar=True).scores)
@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+from src.profile_index import JobIndex, TalentIndex
+from src.search import Search
+
+
+@pytest.fixture(scope="module")
+def search(config, feature_extractor, feature_engineer, compiled_model):
+    return Search(config, feature_extractor, feature_engineer, compiled_model)
+
+
+def expected_results(search, talent_or_job: dict, profiles: dict, kind: str) -> list[tuple]:
+    """
+    Returns:
+        list: (id, score) of the indexed profiles scored one by one with Search.match, by descending score and ties
+        in the order of insertion.
+    """
+    if kind == "job":
+        scored = [(profile_id, search.match(talent_or_job, job)["score"]) for profile_id, job in profiles.items()]
+    else:
+        scored = [(profile_id, search.match(talent, talent_or_job)["score"]) for profile_id, talent in profiles.items()]
+    return sorted(scored, key=lambda item: -item[1])
+
+
+def assert_results_match(results: list[dict], expected: list[tuple], id_key: str) -> None:
+    assert [result[id_key] for result in results] == [profile_id for profile_id, _ in expected]
+    np.testing.assert_allclose([result["score"] for result in results], [score for _, score in expected], atol=1e-12)
+
+
+def test_job_index_search_matches_match(search, talents, jobs):
+    index = JobIndex(search)
+    profiles = {f"job-{idx}": job for idx, job in enumerate(jobs)}
+    index.upsert_many(profiles.items())
+
+    for talent in talents[:3]:
+        results = index.search(talent, k=None)
+        assert_results_match(results, expected_results(search, talent, profiles, "job"), "job_id")
+        assert all(result["talent"] is talent and result["job"] is profiles[result["job_id"]] for result in results)
+        assert index.search(talent, k=5) == results[:5]
+
+
+def test_talent_index_search_matches_match(search, talents, jobs):
+    index = TalentIndex(search)
+    profiles = {f"talent-{idx}": talent for idx, talent in enumerate(talents)}
+    for profile_id, talent in profiles.items():
+        index.upsert(profile_id, talent)
+
+    for job in jobs[:3]:
+        results = index.search(job, k=None)
+        assert_results_match(results, expected_results(search, job, profiles, "talent"), "talent_id")
+        assert index.search(job, k=7) == results[:7]
+
+
+def test_upsert_of_an_existing_id_replaces_the_profile(search, talents, jobs):
+    index = JobIndex(search)
+    index.upsert_many([("a", jobs[0]), ("b", jobs[1])])
+
+    index.upsert("a", jobs[2])
+
+    assert len(index) == 2 and index.n_rows == 2
+    assert index.get("a") is jobs[2]
+    expected = expected_results(search, talents[0], {"a": jobs[2], "b": jobs[1]}, "job")
+    assert_results_match(index.search(talents[0], k=None), expected, "job_id")
+
+
+def test_deleted_profiles_are_not_scored(search, talents, jobs, monkeypatch):
+    index = JobIndex(search)
+    monkeypatch.setattr(index, "max_tombstone_ratio", 1.0)
+    index.upsert_many([("a", jobs[0]), ("b", jobs[1])])
+    # a job whose features are missing values, which the compiled model rejects
+    index.upsert("broken", dict(jobs[2], job_roles=["not-a-role-of-the-universe"]))
+    with pytest.raises(ValueError, match="NaN"):
+        index.search(talents[0])
+
+    index.delete("broken")
+
+    assert "broken" not in index and index.n_tombstones == 1
+    assert [result["job_id"] for result in index.search(talents[0], k=None)] == [
+        profile_id for profile_id, _ in expected_results(search, talents[0], {"a": jobs[0], "b": jobs[1]}, "job")
+    ]
+    with pytest.raises(KeyError):
+        index.delete("broken")
+
+
+def test_deletes_are_compacted_automatically(search, talents, jobs):
+    index = JobIndex(search)
+    profiles = {f"job-{idx}": job for idx, job in enumerate(jobs[:8])}
+    index.upsert_many(profiles.items())
+
+    for profile_id in ["job-1", "job-4"]:
+        index.delete(profile_id)
+        del profiles[profile_id]
+    assert index.n_rows == 8 and index.n_tombstones == 2
+    index.delete("job-6")
+    del profiles["job-6"]
+
+    # 3 of 8 rows exceed max_tombstone_ratio=0.25
+    assert index.n_rows == 5 and index.n_tombstones == 0
+    assert [index.get(profile_id) for profile_id in profiles] == list(profiles.values())
+    assert_results_match(
+        index.search(talents[0], k=None), expected_results(search, talents[0], profiles, "job"), "job_id"
+    )
+
+
+def test_index_grows_past_its_initial_capacity(search, talents, jobs):
+    index = TalentIndex(search, initial_capacity=2)
+    profiles = {idx: talent for idx, talent in enumerate(talents[:7])}
+
+    index.upsert_many(list(profiles.items())[:3])
+    index.upsert_many(list(profiles.items())[3:])
+
+    assert index.capacity == 8 and len(index) == 7
+    assert all(index.get(profile_id) is talent for profile_id, talent in profiles.items())
+    expected = expected_results(search, jobs[0], profiles, "talent")
+    assert_results_match(index.search(jobs[0], k=None), expected, "talent_id")
+
+
+def test_search_validates_k(search, talents, jobs):
+    index = JobIndex(search)
+    assert index.search(talents[0]) == []
+    index.upsert_many([("a", jobs[0]), ("b", jobs[1])])
+
+    assert index.search(talents[0], k=0) == []
+    assert len(index.search(talents[0], k=10)) == 2
+    with pytest.raises(ValueError, match="k must be"):
+        index.search(talents[0], k=-1)
+    np.testing.assert_array_equal(index.alive, [True, True])
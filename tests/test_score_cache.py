@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+from pyhocon import ConfigFactory
+
+from src.metrics import MetricsRegistry
+from src.score_cache import ScoreCache
+from src.search import Search
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ScoreCache(max_size=3)
+    cache.put_many([b"a", b"b", b"c"], np.array([0.1, 0.2, 0.3]))
+
+    np.testing.assert_array_equal(cache.get_many([b"a"]), [0.1])
+    cache.put_many([b"d"], np.array([0.4]))
+
+    np.testing.assert_array_equal(cache.get_many([b"a", b"b", b"c", b"d"]), [0.1, np.nan, 0.3, 0.4])
+    cache.put_many([b"e", b"f"], np.array([0.5, 0.6]))
+    np.testing.assert_array_equal(cache.get_many([b"a", b"c", b"d", b"e", b"f"]), [np.nan, np.nan, 0.4, 0.5, 0.6])
+    assert cache.stats() == {
+        "hits": 7,
+        "misses": 3,
+        "hit_rate": 0.7,
+        "evictions": 3,
+        "expirations": 0,
+        "invalidations": 0,
+        "size": 3,
+        "max_size": 3,
+    }
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = ScoreCache(max_size=10, ttl_seconds=10, clock=clock)
+    cache.put_many([b"a", b"b"], np.array([0.1, 0.2]))
+    clock.now = 5
+    cache.put_many([b"b"], np.array([0.25]))
+
+    clock.now = 9.5
+    np.testing.assert_array_equal(cache.get_many([b"a", b"b"]), [0.1, 0.25])
+    clock.now = 10
+    np.testing.assert_array_equal(cache.get_many([b"a", b"b"]), [np.nan, 0.25])
+    clock.now = 15
+    np.testing.assert_array_equal(cache.get_many([b"b"]), [np.nan])
+
+    stats = cache.stats()
+    assert (stats["expirations"], stats["hits"], stats["misses"], stats["size"]) == (2, 3, 2, 0)
+
+
+def test_validate_clears_the_cache_for_other_dependencies(sklearn_model, compiled_model, config):
+    cache = ScoreCache()
+    cache.validate(sklearn_model, config)
+    cache.put_many([b"a"], np.array([0.1]))
+
+    cache.validate(sklearn_model, config)
+    assert len(cache) == 1
+    cache.validate(compiled_model, config)
+
+    assert len(cache) == 0 and cache.stats()["invalidations"] == 1
+
+
+def test_pair_keys_depend_only_on_the_extracted_features(feature_extractor, talents, jobs):
+    talent, job = talents[0], jobs[0]
+    variants = [
+        talent,
+        dict(talent, job_roles=talent["job_roles"][::-1], id="other-id"),
+        dict(talent, salary_expectation=talent["salary_expectation"] + 1000),
+    ]
+
+    keys = ScoreCache.pair_keys(feature_extractor.extract_batch(variants, [job] * 3))
+
+    assert keys[0] == keys[1] and keys[0] != keys[2]
+    assert ScoreCache.pair_keys(feature_extractor.extract_batch([], [])) == []
+
+
+def test_search_serves_repeated_pairs_from_the_cache(
+    config, feature_extractor, feature_engineer, sklearn_model, talents, jobs
+):
+    metrics = MetricsRegistry()
+    search = Search(
+        config, feature_extractor, feature_engineer, sklearn_model, metrics=metrics, score_cache=ScoreCache(max_size=20)
+    )
+    uncached_search = Search(config, feature_extractor, feature_engineer, sklearn_model)
+    expected = uncached_search.match_pairs(talents[:15], jobs[:15])
+
+    assert search.match_pairs(talents[:15], jobs[:15]) == expected
+    assert search.match_pairs(talents[:15], jobs[:15]) == expected
+    assert search.match(talents[3], jobs[3]) == expected[3]
+
+    counters = metrics.to_dict()["counters"]
+    assert (counters["search.score_cache_hits"], counters["search.score_cache_misses"]) == (16, 15)
+    assert metrics.to_dict()["stages"]["search.predict"]["items"] == 15
+
+
+def test_from_config(config):
+    assert ScoreCache.from_config(config) is None
+
+    enabled_config = ConfigFactory.parse_string("score_cache { enabled = true, max_size = 5, ttl_seconds = 60 }")
+    cache = ScoreCache.from_config(enabled_config.with_fallback(config))
+
+    assert (cache.max_size, cache.ttl_seconds) == (5, 60)
+    with pytest.raises(ValueError, match="max_size must be a positive integer"):
+        ScoreCache(max_size=0)
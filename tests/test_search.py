@@ -0,0 +1,173 @@
+"""
+Parity tests of the batch, bulk, ranking, deduplication and paging paths of Search against scoring every pair on its own
+with Search.match. Search.match itself is checked against features frozen from the original pandas implementation in
+test_feature_engineering.py.
+"""
+
+import numpy as np
+import pytest
+
+from src.search import Search
+
+
+@pytest.fixture(scope="module")
+def small_talents(talents):
+    # duplicates that only differ in attributes the model does not use, so that dedup_bulk_scoring has work to do
+    return talents[:12] + [dict(talent, id=f"copy-{idx}") for idx, talent in enumerate(talents[:4])]
+
+
+@pytest.fixture(scope="module")
+def small_jobs(jobs):
+    return jobs[:15] + [dict(job, id=f"copy-{idx}") for idx, job in enumerate(jobs[:3])]
+
+
+@pytest.fixture(scope="module")
+def search(config, feature_extractor, feature_engineer, sklearn_model):
+    search = Search(config, feature_extractor, feature_engineer, sklearn_model)
+    # several blocks per call, with a last block that is not full
+    search.bulk_pair_chunk_size = 5 * 18
+    return search
+
+
+@pytest.fixture(scope="module")
+def compiled_search(config, feature_extractor, feature_engineer, compiled_model):
+    search = Search(config, feature_extractor, feature_engineer, compiled_model)
+    search.bulk_pair_chunk_size = 5 * 18
+    return search
+
+
+@pytest.fixture(scope="module")
+def baseline_scores(search, small_talents, small_jobs):
+    """
+    The (talents, jobs) matrix of the scores of Search.match, one pair at a time.
+    """
+    return np.array([[search.match(talent, job)["score"] for job in small_jobs] for talent in small_talents])
+
+
+def expected_ranking(scores: np.ndarray, top_k=None, group_by=None, min_score=None) -> list[list[tuple[int, int]]]:
+    """
+    Ranks a (talents, jobs) score matrix by a full sort: by descending score, ties by ascending pair id.
+
+    Returns:
+        list: Per group, i.e. once for group_by None, the (talent, job) positions of the results in ranked order.
+    """
+    n_talents, n_jobs = scores.shape
+    pairs = [(talent, job) for talent in range(n_talents) for job in range(n_jobs)]
+    if min_score is not None:
+        pairs = [pair for pair in pairs if scores[pair] >= min_score]
+    groups = {None: [None], "talent": range(n_talents), "job": range(n_jobs)}[group_by]
+    ranking = []
+    for group in groups:
+        members = [pair for pair in pairs if group is None or pair[0 if group_by == "talent" else 1] == group]
+        members.sort(key=lambda pair: (-scores[pair], pair[0] * n_jobs + pair[1]))
+        ranking.append(members[:top_k])
+    return ranking
+
+
+def positions(results: list[dict], talents: list[dict], jobs: list[dict]) -> list[tuple[int, int]]:
+    talent_positions = {id(talent): idx for idx, talent in enumerate(talents)}
+    job_positions = {id(job): idx for idx, job in enumerate(jobs)}
+    return [(talent_positions[id(result["talent"])], job_positions[id(result["job"])]) for result in results]
+
+
+def test_match_pairs_matches_match(search, small_talents, small_jobs, baseline_scores):
+    talent_idx, job_idx = np.divmod(np.arange(len(small_talents) * len(small_jobs)), len(small_jobs))
+    results = search.match_pairs([small_talents[t] for t in talent_idx], [small_jobs[j] for j in job_idx])
+
+    np.testing.assert_array_equal([result["score"] for result in results], baseline_scores[talent_idx, job_idx])
+    assert [result["label"] for result in results] == [int(score >= 0.5) for score in baseline_scores.ravel()]
+
+
+@pytest.mark.parametrize("search_fixture", ["search", "compiled_search"])
+def test_score_cross_matches_match(search_fixture, small_talents, small_jobs, baseline_scores, request):
+    scores = request.getfixturevalue(search_fixture).score_cross(small_talents, small_jobs)
+
+    np.testing.assert_allclose(scores, baseline_scores.ravel(), rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("dedup", [True, False])
+def test_dedup_bulk_scoring_matches_match(search, small_talents, small_jobs, baseline_scores, dedup, monkeypatch):
+    monkeypatch.setattr(search, "dedup_bulk_scoring", dedup)
+
+    scores = search.score_cross(small_talents, small_jobs)
+
+    np.testing.assert_array_equal(scores, baseline_scores.ravel())
+
+
+@pytest.mark.parametrize("group_by", [None, "talent", "job"])
+@pytest.mark.parametrize("top_k", [None, 1, 4])
+@pytest.mark.parametrize("min_score", [None, 0.5])
+def test_match_bulk_matches_full_sort(
+    search, compiled_search, small_talents, small_jobs, baseline_scores, group_by, top_k, min_score
+):
+    expected = expected_ranking(baseline_scores, top_k, group_by, min_score)
+
+    for bulk_search in [search, compiled_search]:
+        results = bulk_search.match_bulk(small_talents, small_jobs, top_k, group_by, min_score=min_score)
+        grouped_results = results if group_by is not None else [results]
+        assert [positions(group, small_talents, small_jobs) for group in grouped_results] == expected
+        for group, expected_group in zip(grouped_results, expected):
+            np.testing.assert_allclose(
+                [result["score"] for result in group],
+                [baseline_scores[pair] for pair in expected_group],
+                rtol=0,
+                atol=1e-12,
+            )
+
+        columnar = bulk_search.match_bulk(
+            small_talents, small_jobs, top_k, group_by, columnar=True, min_score=min_score
+        )
+        assert list(zip(columnar.talent_idx.tolist(), columnar.job_idx.tolist())) == sum(expected, [])
+
+
+@pytest.mark.parametrize("top_k", [None, 25])
+@pytest.mark.parametrize("min_score", [None, 0.5])
+def test_ranking_pages_match_match_bulk(search, small_talents, small_jobs, baseline_scores, top_k, min_score):
+    expected = expected_ranking(baseline_scores, top_k, None, min_score)[0]
+
+    page = search.open_ranking(small_talents, small_jobs, page_size=7, top_k=top_k, min_score=min_score)
+    served = positions(page["results"], small_talents, small_jobs)
+    while page["cursor"] is not None:
+        page = search.fetch_page(page["cursor"])
+        assert page["offset"] == len(served)
+        served += positions(page["results"], small_talents, small_jobs)
+
+    assert served == expected
+    assert page["total"] == len(expected)
+
+
+def test_resumed_cursor_continues_the_ranking(search, small_talents, small_jobs, baseline_scores):
+    expected = expected_ranking(baseline_scores)[0]
+    page = search.open_ranking(small_talents, small_jobs, page_size=10)
+    served = positions(page["results"], small_talents, small_jobs)
+    page = search.fetch_page(page["cursor"])
+    served += positions(page["results"], small_talents, small_jobs)
+    cursor = page["cursor"]
+    search.ranking_sessions.clear()
+
+    page = search.fetch_page(cursor, small_talents, small_jobs, resume=True)
+    while True:
+        served += positions(page["results"], small_talents, small_jobs)
+        if page["cursor"] is None:
+            break
+        page = search.fetch_page(page["cursor"])
+
+    assert served == expected
+
+
+def test_forged_cursor_is_rejected(search, small_talents, small_jobs):
+    cursor = search.open_ranking(small_talents, small_jobs, page_size=5)["cursor"]
+    payload, signature = cursor.split(".")
+
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        search.fetch_page(f"{payload[:-2]}xx.{signature}")
+
+
+@pytest.mark.parametrize("n_talents, n_jobs", [(0, 5), (5, 0), (0, 0)])
+def test_empty_talents_or_jobs_yield_no_score_blocks(search, small_talents, small_jobs, n_talents, n_jobs):
+    talent_data = search.extract_talents(small_talents[:n_talents])
+    job_data = search.extract_jobs(small_jobs[:n_jobs])
+
+    assert list(search.iter_extracted_score_blocks(talent_data, job_data)) == []
+    assert search.score_cross(small_talents[:n_talents], small_jobs[:n_jobs]).shape == (0,)
+    assert len(search.match_bulk(small_talents[:n_talents], small_jobs[:n_jobs], columnar=True)) == 0
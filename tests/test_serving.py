@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from src.search import Search
+from src.serving import MicroBatchMatcher
+
+
+@pytest.fixture(scope="module")
+def search(config, feature_extractor, feature_engineer, sklearn_model):
+    return Search(config, feature_extractor, feature_engineer, sklearn_model)
+
+
+async def match_concurrently(matcher: MicroBatchMatcher, talents: list[dict], jobs: list[dict]) -> list:
+    async with matcher:
+        return await asyncio.gather(
+            *[matcher.match(talent, job) for talent, job in zip(talents, jobs)], return_exceptions=True
+        )
+
+
+def test_concurrent_requests_are_scored_in_batches(search, talents, jobs):
+    matcher = MicroBatchMatcher(search, max_batch_size=16, max_wait_us=1000)
+
+    results = asyncio.run(match_concurrently(matcher, talents, jobs[:40]))
+
+    assert results == [search.match(talent, job) for talent, job in zip(talents, jobs[:40])]
+    assert all(
+        result["talent"] is talent and result["job"] is job for result, talent, job in zip(results, talents, jobs)
+    )
+    stats = matcher.stats()
+    assert stats["batch_size_histogram"] == {8: 1, 16: 2}
+    assert (stats["requests"], stats["batches"], stats["max_batch_size"], stats["queue_depth"]) == (40, 3, 16, 0)
+
+
+def test_batch_does_not_wait_beyond_max_wait(search, talents, jobs):
+    async def match_sequentially(matcher):
+        async with matcher:
+            return [await matcher.match(talent, job) for talent, job in zip(talents[:3], jobs[:3])]
+
+    matcher = MicroBatchMatcher(search, max_batch_size=16, max_wait_us=0)
+
+    results = asyncio.run(match_sequentially(matcher))
+
+    assert results == [search.match(talent, job) for talent, job in zip(talents[:3], jobs[:3])]
+    assert matcher.stats()["batch_size_histogram"] == {1: 3}
+
+
+def test_failing_request_does_not_fail_its_batch(search, talents, jobs):
+    # a job whose features are missing values, which the model rejects
+    broken_job = dict(jobs[1], job_roles=["not-a-role-of-the-universe"])
+    batch_jobs = [jobs[0], broken_job, jobs[2]]
+    matcher = MicroBatchMatcher(search, max_batch_size=16, max_wait_us=1000)
+
+    results = asyncio.run(match_concurrently(matcher, talents[:3], batch_jobs))
+
+    assert isinstance(results[1], ValueError)
+    assert [results[0], results[2]] == [search.match(talents[0], jobs[0]), search.match(talents[2], jobs[2])]
+    assert matcher.stats()["batch_size_histogram"] == {3: 1}
+
+
+def test_defaults_come_from_the_config(search):
+    matcher = MicroBatchMatcher(search)
+
+    assert (matcher.max_batch_size, matcher.max_wait_us) == (64, 500)
+    assert matcher.stats() == {
+        "queue_depth": 0,
+        "requests": 0,
+        "batches": 0,
+        "mean_batch_size": 0.0,
+        "max_batch_size": 0,
+        "batch_size_histogram": {},
+    }
+
+
+def test_match_requires_a_started_matcher(search, talents, jobs):
+    with pytest.raises(RuntimeError, match="has not been started"):
+        asyncio.run(MicroBatchMatcher(search).match(talents[0], jobs[0]))
@@ -0,0 +1,112 @@
+import gc
+
+import numpy as np
+import pytest
+
+from src.search import Search
+from src.shared_deployment import CURRENT_FILE, VERSIONS_DIR, SharedDeployment, publish_deployment
+
+
+@pytest.fixture(scope="module")
+def search(config, feature_extractor, feature_engineer, compiled_model):
+    return Search(config, feature_extractor, feature_engineer, compiled_model)
+
+
+def published_versions(path) -> list[str]:
+    return sorted(entry.name for entry in (path / VERSIONS_DIR).iterdir())
+
+
+def assert_results_match(results, expected) -> None:
+    np.testing.assert_array_equal(results.talent_idx, expected.talent_idx)
+    np.testing.assert_array_equal(results.job_idx, expected.job_idx)
+    np.testing.assert_allclose(results.scores, expected.scores, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("group_by", [None, "talent", "job"])
+def test_match_bulk_equals_search_match_bulk(search, config, sklearn_model, talents, jobs, tmp_path, group_by):
+    publish_deployment(sklearn_model, config, jobs, tmp_path)
+    deployment = SharedDeployment(tmp_path)
+
+    results = deployment.match_bulk(talents, top_k=5, group_by=group_by, columnar=True, min_score=0.3)
+
+    assert_results_match(results, search.match_bulk(talents, jobs, 5, group_by, columnar=True, min_score=0.3))
+    assert [result["job"] for result in deployment.match_bulk(talents[:2], top_k=3)] == [
+        result["job"] for result in search.match_bulk(talents[:2], jobs, top_k=3)
+    ]
+    assert deployment.memory_report()["jobs"] == len(jobs)
+
+
+def test_refresh_swaps_to_a_newly_published_version(search, config, compiled_model, talents, jobs, tmp_path):
+    publish_deployment(compiled_model, config, jobs[:20], tmp_path)
+    deployment = SharedDeployment(tmp_path, check_interval_seconds=0)
+    in_flight = deployment.current()
+    assert not deployment.refresh()
+
+    assert publish_deployment(compiled_model, config, jobs[20:], tmp_path) == "v000002"
+
+    assert deployment.current().version == "v000002" and deployment.n_swaps == 1
+    assert_results_match(
+        deployment.match_bulk(talents, top_k=3, group_by="talent", columnar=True),
+        search.match_bulk(talents, jobs[20:], 3, "talent", columnar=True),
+    )
+    # a request that started before the swap is still served by its version
+    assert in_flight.version == "v000001" and list(in_flight.jobs) == jobs[:20]
+    talent_data = in_flight.search.extract_talents(talents)
+    scores = np.concatenate(
+        [block for _, block in in_flight.search.iter_extracted_score_blocks(talent_data, in_flight.job_data)]
+    )
+    np.testing.assert_allclose(scores.ravel(), search.score_cross(talents, jobs[:20]), rtol=0, atol=1e-12)
+
+
+def test_check_interval_delays_the_swap(config, compiled_model, jobs, tmp_path):
+    publish_deployment(compiled_model, config, jobs[:5], tmp_path)
+    deployment = SharedDeployment(tmp_path, check_interval_seconds=3600)
+
+    publish_deployment(compiled_model, config, jobs[5:10], tmp_path)
+
+    assert deployment.current().version == "v000001"
+    assert deployment.refresh() and deployment.version == "v000002"
+
+
+def test_failed_refresh_keeps_the_current_version(config, compiled_model, jobs, tmp_path):
+    publish_deployment(compiled_model, config, jobs[:5], tmp_path)
+    deployment = SharedDeployment(tmp_path, check_interval_seconds=0)
+
+    (tmp_path / CURRENT_FILE).write_text("v000099")
+
+    assert deployment.current().version == "v000001"
+    assert deployment.n_failed_refreshes == 1 and deployment.n_swaps == 0
+    with pytest.raises(FileNotFoundError):
+        SharedDeployment(tmp_path)
+
+
+def test_pruning_keeps_versions_that_are_still_mapped(config, compiled_model, jobs, tmp_path):
+    publish_deployment(compiled_model, config, jobs[:5], tmp_path, keep_versions=1)
+    deployment = SharedDeployment(tmp_path, check_interval_seconds=0)
+    in_flight = deployment.current()
+
+    publish_deployment(compiled_model, config, jobs[5:10], tmp_path, keep_versions=1)
+    assert published_versions(tmp_path) == ["v000001", "v000002"]
+
+    assert deployment.current().version == "v000002"
+    publish_deployment(compiled_model, config, jobs[10:15], tmp_path, keep_versions=1)
+    assert published_versions(tmp_path) == ["v000001", "v000002", "v000003"]
+    assert list(in_flight.jobs) == jobs[:5]
+
+    # releasing the last references unmaps v000001 and, after the swap to v000003, v000002
+    del in_flight
+    assert deployment.current().version == "v000003"
+    gc.collect()
+    publish_deployment(compiled_model, config, jobs[15:20], tmp_path, keep_versions=1)
+    assert published_versions(tmp_path) == ["v000003", "v000004"]
+
+
+def test_shared_jobs_decode_jobs_on_access(config, compiled_model, jobs, tmp_path):
+    publish_deployment(compiled_model, config, jobs[:10], tmp_path)
+    shared_jobs = SharedDeployment(tmp_path).current().jobs
+
+    assert len(shared_jobs) == 10
+    assert shared_jobs[3] == jobs[3] and shared_jobs[-1] == jobs[9]
+    assert shared_jobs[2:8:2] == jobs[2:8:2]
+    with pytest.raises(IndexError):
+        shared_jobs[10]
@@ -0,0 +1,99 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.search import Search
+from src.streaming import StreamingSearch
+
+
+@pytest.fixture(scope="module")
+def search(config, feature_extractor, feature_engineer, sklearn_model):
+    return Search(config, feature_extractor, feature_engineer, sklearn_model)
+
+
+@pytest.fixture(scope="module")
+def profile_paths(tmp_path_factory, talents, jobs):
+    tmp_path = tmp_path_factory.mktemp("profiles")
+    paths = tmp_path / "talents.jsonl", tmp_path / "jobs.jsonl"
+    for path, profiles in zip(paths, [talents, jobs]):
+        # blank lines are skipped and do not count as positions
+        path.write_text("\n".join(json.dumps(profile) for profile in profiles[:5]) + "\n\n")
+        with open(path, "a") as file:
+            file.write("\n".join(json.dumps(profile) for profile in profiles[5:]) + "\n")
+    return paths
+
+
+@pytest.fixture(scope="module")
+def streaming_search(search):
+    # chunk sizes that do not divide the numbers of talents and jobs, so the last tiles are smaller
+    return StreamingSearch(search, talent_chunk_size=15, job_chunk_size=25)
+
+
+def read_results(path) -> list[tuple]:
+    with open(path, "r") as file:
+        return [(line["talent_idx"], line["job_idx"], line["label"], line["score"]) for line in map(json.loads, file)]
+
+
+def columnar_results(results) -> list[tuple]:
+    return list(
+        zip(results.talent_idx.tolist(), results.job_idx.tolist(), results.labels.tolist(), results.scores.tolist())
+    )
+
+
+def test_tiles_cover_every_pair_once(search, streaming_search, profile_paths, talents, jobs):
+    scores = np.full((len(talents), len(jobs)), np.nan)
+
+    for tile in streaming_search.iter_tiles(*profile_paths):
+        assert np.isnan(scores[tile.talent_idx, tile.job_idx]).all()
+        scores[tile.talent_idx, tile.job_idx] = tile.scores.ravel()
+
+    np.testing.assert_array_equal(scores.ravel(), search.score_cross(talents, jobs))
+
+
+@pytest.mark.parametrize("min_score", [None, 0.5])
+def test_score_to_jsonl_without_top_k_writes_every_result(
+    search, streaming_search, profile_paths, talents, jobs, tmp_path, min_score
+):
+    summary = streaming_search.score_to_jsonl(*profile_paths, tmp_path / "results.jsonl", min_score=min_score)
+
+    expected = columnar_results(search.match_bulk(talents, jobs, columnar=True, min_score=min_score))
+    assert sorted(read_results(tmp_path / "results.jsonl")) == sorted(expected)
+    assert summary == {
+        "talents": len(talents),
+        "jobs": len(jobs),
+        "scored_pairs": len(talents) * len(jobs),
+        "written_results": len(expected),
+    }
+
+
+@pytest.mark.parametrize("group_by", [None, "talent", "job"])
+@pytest.mark.parametrize("top_k", [1, 4, 100])
+@pytest.mark.parametrize("min_score", [None, 0.5])
+def test_score_to_jsonl_with_top_k_equals_match_bulk(
+    search, streaming_search, profile_paths, talents, jobs, tmp_path, group_by, top_k, min_score
+):
+    streaming_search.score_to_jsonl(
+        *profile_paths, tmp_path / "results.jsonl", top_k=top_k, group_by=group_by, min_score=min_score
+    )
+
+    expected = search.match_bulk(talents, jobs, top_k, group_by, columnar=True, min_score=min_score)
+    assert read_results(tmp_path / "results.jsonl") == columnar_results(expected)
+
+
+def test_score_to_jsonl_of_empty_files(streaming_search, profile_paths, tmp_path):
+    empty_path = tmp_path / "empty.jsonl"
+    empty_path.write_text("\n")
+
+    for paths in [(empty_path, profile_paths[1]), (profile_paths[0], empty_path)]:
+        summary = streaming_search.score_to_jsonl(*paths, tmp_path / "results.jsonl", top_k=3, group_by="job")
+
+        assert summary["scored_pairs"] == summary["written_results"] == 0
+        assert read_results(tmp_path / "results.jsonl") == []
+
+
+def test_score_to_jsonl_validates_group_by(streaming_search, profile_paths, tmp_path):
+    with pytest.raises(ValueError, match="group_by must be one of"):
+        streaming_search.score_to_jsonl(*profile_paths, tmp_path / "results.jsonl", top_k=3, group_by="pair")
+    with pytest.raises(ValueError, match="group_by requires top_k"):
+        streaming_search.score_to_jsonl(*profile_paths, tmp_path / "results.jsonl", group_by="talent")
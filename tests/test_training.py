@@ -0,0 +1,156 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from pyhocon import ConfigFactory
+
+from src.feature_engineering import FeatureEngineer
+from src.feature_extraction import FeatureExtractor
+from src.training import BACKENDS, Trainer
+
+
+@pytest.fixture(scope="module")
+def examples(talents, jobs):
+    return [{"talent": talent, "job": job, "label": idx % 2} for idx, (talent, job) in enumerate(zip(talents, jobs))]
+
+
+@pytest.fixture()
+def array_path(tmp_path, examples):
+    path = tmp_path / "data.json"
+    # whitespace before and between the examples, as left by hand-edited files
+    path.write_text("\n\n  [" + ",\n  ".join(json.dumps(example) for example in examples) + " \n]\n")
+    return path
+
+
+@pytest.fixture()
+def jsonl_path(tmp_path, examples):
+    path = tmp_path / "data.jsonl"
+    path.write_text("\n".join(json.dumps(example) for example in examples) + "\n\n")
+    return path
+
+
+def test_iter_records_of_array_equals_json_load(array_path):
+    with open(array_path, "r") as file:
+        expected = json.load(file)
+
+    assert list(Trainer.iter_records(array_path)) == expected
+
+
+def test_iter_records_of_jsonl_equals_array(array_path, jsonl_path, examples):
+    assert list(Trainer.iter_records(jsonl_path)) == list(Trainer.iter_records(array_path)) == examples
+
+
+@pytest.mark.parametrize("read_size", [1, 7, 100, 4096])
+def test_iter_records_decodes_examples_split_across_reads(array_path, examples, read_size):
+    # every example is longer than read_size except for the largest read size, so most are split across reads
+    assert min(len(json.dumps(example)) for example in examples) > 100
+
+    assert list(Trainer.iter_records(array_path, read_size=read_size)) == examples
+
+
+def test_iter_records_of_empty_array(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text(" [ ]")
+
+    assert list(Trainer.iter_records(path, read_size=2)) == []
+
+
+def test_iter_records_reports_malformed_examples(tmp_path, examples):
+    path = tmp_path / "data.json"
+    text = json.dumps(examples[:3])
+    path.write_text(text[:-20])
+
+    with pytest.raises(ValueError, match="Malformed training example at character"):
+        list(Trainer.iter_records(path, read_size=50))
+    records = Trainer.iter_records(path, read_size=50, max_record_size=10)
+    with pytest.raises(ValueError, match="Malformed training example"):
+        list(records)
+
+
+def test_iter_records_rejects_other_json(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text('{"talent": {}, "job": {}, "label": 1}')
+
+    with pytest.raises(ValueError, match="Expected a JSON array"):
+        list(Trainer.iter_records(path))
+
+
+def override(config, hocon: str):
+    return ConfigFactory.parse_string(hocon).with_fallback(config)
+
+
+def test_feature_cache_is_hit_for_the_same_data_and_config(
+    config, feature_extractor, feature_engineer, array_path, tmp_path, monkeypatch
+):
+    cache_dir = tmp_path / "cache"
+    trainer = Trainer(config, feature_extractor, feature_engineer)
+    features, labels = trainer._load_training_data(array_path, cache_dir)
+    assert [path.name for path in cache_dir.iterdir()] == [
+        f"training_features_{trainer._feature_cache_key(array_path)}.npz"
+    ]
+
+    monkeypatch.setattr(trainer, "_create_training_data", pytest.fail)
+    cached_features, cached_labels = trainer._load_training_data(array_path, cache_dir)
+
+    pd.testing.assert_frame_equal(cached_features, features)
+    np.testing.assert_array_equal(cached_labels, labels)
+    np.testing.assert_array_equal(labels, [idx % 2 for idx in range(len(labels))])
+
+
+def test_feature_cache_is_invalidated_by_data_and_config_changes(
+    config, feature_extractor, feature_engineer, array_path, jsonl_path, tmp_path
+):
+    changed_config = override(config, "seniority_rank_mapping.junior = 1.5")
+    trainer = Trainer(config, feature_extractor, feature_engineer)
+    changed_trainer = Trainer(changed_config, FeatureExtractor(changed_config), FeatureEngineer(changed_config))
+
+    keys = {
+        trainer._feature_cache_key(array_path),
+        trainer._feature_cache_key(jsonl_path),
+        changed_trainer._feature_cache_key(array_path),
+        # training parameters do not change the features
+        Trainer(
+            override(config, "training.backend = hist_gradient_boosting"), feature_extractor, feature_engineer
+        )._feature_cache_key(array_path),
+    }
+    assert len(keys) == 3
+
+    features, _ = trainer._load_training_data(array_path, tmp_path / "cache")
+    changed_features, _ = changed_trainer._load_training_data(array_path, tmp_path / "cache")
+    assert len(list((tmp_path / "cache").iterdir())) == 2
+    assert not np.array_equal(changed_features.to_numpy(), features.to_numpy())
+
+
+def test_failed_feature_cache_write_leaves_no_files(
+    config, feature_extractor, feature_engineer, array_path, tmp_path, monkeypatch
+):
+    def savez(*args, **kwargs):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(np, "savez", savez)
+    trainer = Trainer(config, feature_extractor, feature_engineer)
+
+    features, labels = trainer._load_training_data(array_path, tmp_path / "cache")
+
+    assert len(features) == len(labels) > 0
+    assert list((tmp_path / "cache").iterdir()) == []
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_training_backend_is_selected_by_config(
+    config, feature_extractor, feature_engineer, array_path, tmp_path, backend
+):
+    backend_config = override(config, f"training.backend = {backend}")
+    trainer = Trainer(backend_config, feature_extractor, feature_engineer)
+
+    model = trainer.training_pipeline(str(array_path), str(tmp_path / "model.joblib"))
+
+    assert type(model) is BACKENDS[backend]
+    assert model.get_params()["random_state"] == backend_config.get(f"training.{backend}.random_state")
+    assert type(trainer.load_model(tmp_path / "model.joblib")) is BACKENDS[backend]
+
+
+def test_unknown_training_backend_is_rejected(config, feature_extractor, feature_engineer):
+    with pytest.raises(ValueError, match="Unknown training backend 'xgboost'"):
+        Trainer(override(config, "training.backend = xgboost"), feature_extractor, feature_engineer)
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def engineered_features(feature_extractor, feature_engineer, talents, jobs) -> np.ndarray:
+    return feature_engineer.engineer_cross(
+        feature_extractor.extract_talent_batch(talents), feature_extractor.extract_job_batch(jobs)
+    )
+
+
+def sklearn_scores(sklearn_model, feature_engineer, features: np.ndarray) -> np.ndarray:
+    return sklearn_model.predict_proba(pd.DataFrame(features, columns=feature_engineer.relevant_features))[:, 1]
+
+
+def test_compiled_model_matches_sklearn(
+    sklearn_model, compiled_model, feature_extractor, feature_engineer, talents, jobs
+):
+    features = engineered_features(feature_extractor, feature_engineer, talents, jobs)
+
+    expected = sklearn_scores(sklearn_model, feature_engineer, features)
+    np.testing.assert_allclose(compiled_model.predict_score(features), expected, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(compiled_model.predict_proba(features)[:, 1], expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("min_score", [0.0, 0.1, 0.5, 0.95, 1.0])
+def test_predict_score_above_keeps_exactly_the_scores_above(
+    compiled_model, feature_extractor, feature_engineer, talents, jobs, min_score, monkeypatch
+):
+    features = engineered_features(feature_extractor, feature_engineer, talents, jobs)
+    # a stage size that does not divide the number of trees
+    monkeypatch.setattr(compiled_model, "trees_per_stage", 7)
+
+    scores, n_evaluations = compiled_model.predict_score_above(features, min_score)
+
+    full_scores = compiled_model.predict_score(features)
+    np.testing.assert_array_equal(scores, np.where(full_scores >= min_score, full_scores, -np.inf))
+    assert n_evaluations <= len(features) * compiled_model.n_trees
+
+
+def test_save_and_load_round_trip(compiled_model, feature_extractor, feature_engineer, talents, jobs, tmp_path):
+    features = engineered_features(feature_extractor, feature_engineer, talents, jobs)
+    compiled_model.save(tmp_path / "model.npz")
+
+    loaded = type(compiled_model).load(tmp_path / "model.npz")
+
+    np.testing.assert_array_equal(loaded.predict_score(features), compiled_model.predict_score(features))
+
+
+def test_missing_values_raise_like_sklearn(
+    sklearn_model, compiled_model, feature_extractor, feature_engineer, talents, jobs
+):
+    # p_role_match is NaN for a job without a role of the job_role_universe
+    job = {**jobs[0], "job_roles": ["not-a-role-of-the-universe"]}
+    features = engineered_features(feature_extractor, feature_engineer, talents[:1], [job])
+    assert np.isnan(features).any()
+
+    with pytest.raises(ValueError, match="NaN"):
+        sklearn_scores(sklearn_model, feature_engineer, features)
+    with pytest.raises(ValueError, match="NaN"):
+        compiled_model.predict_score(features)
+    with pytest.raises(ValueError, match="NaN"):
+        compiled_model.predict_score_above(features, 0.5)
+
+
+@pytest.mark.parametrize("min_score", [0.0, 1.0])
+def test_predict_score_above_evaluates_all_trees_at_the_bounds(
+    compiled_model, feature_extractor, feature_engineer, talents, jobs, min_score, monkeypatch
+):
+    features = engineered_features(feature_extractor, feature_engineer, talents[:5], jobs)
+    # raw predictions so large that the scores round to exactly 1
+    monkeypatch.setattr(compiled_model, "baseline", compiled_model.baseline + 50)
+    assert (compiled_model.predict_score(features) == 1.0).all()
+
+    scores, n_evaluations = compiled_model.predict_score_above(features, min_score)
+
+    np.testing.assert_array_equal(scores, np.ones(len(features)))
+    assert n_evaluations == len(features) * compiled_model.n_trees
+
+
+@pytest.mark.parametrize("min_score", [-0.1, 1.5, np.nan])
+def test_predict_score_above_rejects_scores_outside_0_and_1(
+    compiled_model, feature_extractor, feature_engineer, talents, jobs, min_score
+):
+    features = engineered_features(feature_extractor, feature_engineer, talents[:1], jobs[:1])
+
+    with pytest.raises(ValueError, match="min_score must be between 0 and 1"):
+        compiled_model.predict_score_above(features, min_score)